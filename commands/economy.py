@@ -8,15 +8,7 @@ import discord
 from discord import option
 from discord.ext import commands
 
-from web_dashboard.economy_db_sync import get_economy_sync_connection
-from web_dashboard.economy_service import (
-    create_manual_loot_buyback_from_price,
-    create_routed_operation,
-    economy_kpis,
-    ensure_economy_schema,
-    issue_regear_request,
-    list_routing_rules,
-)
+from web_dashboard.economy_repository import AsyncEconomyRepository
 
 
 ROUTE_CATEGORY_FALLBACK = [
@@ -78,6 +70,10 @@ class RegearTicketView(discord.ui.View):
 class EconomyCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.economy_repo = AsyncEconomyRepository()
+
+    def cog_unload(self):
+        asyncio.ensure_future(self.economy_repo.close())
 
     def _guild_allowed(self, ctx: discord.ApplicationContext, *, use_guild2: bool = False) -> bool:
         if not ctx.guild:
@@ -88,15 +84,10 @@ class EconomyCommands(commands.Cog):
         return int(ctx.guild.id) == target
 
     async def _refresh_route_category_cache(self) -> None:
-        def _load_categories() -> list[str]:
-            with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
-                rows = list_routing_rules(conn, backend)
-            db_categories = [str(r.get("category") or "").strip() for r in rows if str(r.get("category") or "").strip()]
-            return list(dict.fromkeys(db_categories + ROUTE_CATEGORY_FALLBACK))
-
         try:
-            cats = await asyncio.to_thread(_load_categories)
+            rows = await self.economy_repo.routing_rules()
+            db_categories = [str(r.get("category") or "").strip() for r in rows if str(r.get("category") or "").strip()]
+            cats = list(dict.fromkeys(db_categories + ROUTE_CATEGORY_FALLBACK))
         except Exception:
             cats = list(ROUTE_CATEGORY_FALLBACK)
         self.bot._econ_route_categories_cache = cats
@@ -230,13 +221,8 @@ class EconomyCommands(commands.Cog):
 
         await ctx.defer(ephemeral=True)
 
-        def _read_kpi():
-            with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
-                return economy_kpis(conn, backend)
-
         try:
-            k = await asyncio.to_thread(_read_kpi)
+            k = await self.economy_repo.kpis()
         except Exception as e:
             await ctx.followup.send(f"❌ KPI read failed: {e}", ephemeral=True)
             return
@@ -277,30 +263,24 @@ class EconomyCommands(commands.Cog):
 
         await ctx.defer(ephemeral=True)
 
-        def _create():
-            with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
-                return create_routed_operation(
-                    conn,
-                    backend,
-                    category=category.strip(),
-                    amount=int(amount),
-                    description=description.strip(),
-                    actor=str(ctx.author.display_name),
-                    source="discord_command",
-                )
+        actor = str(ctx.author.display_name)
 
         try:
-            out = await asyncio.to_thread(_create)
+            out = await self.economy_repo.create_routed_operation(
+                category=category.strip(),
+                amount=int(amount),
+                description=description.strip(),
+                actor=actor,
+                source="discord_command",
+            )
         except Exception as e:
             await ctx.followup.send(f"❌ Operation failed: {e}", ephemeral=True)
             return
         await self._refresh_route_category_cache()
 
-        entry = out.get("entry") or {}
         await ctx.followup.send(
-            f"✅ Posted operation #{entry.get('id', '?')} | "
-            f"category=`{entry.get('category', category)}` amount=`{int(entry.get('amount') or amount):,}`",
+            f"✅ Posted operation #{out.get('entry_id', '?')} | "
+            f"category=`{out.get('category', category)}` amount=`{int(out.get('amount') or amount):,}`",
             ephemeral=True,
         )
 
@@ -318,15 +298,10 @@ class EconomyCommands(commands.Cog):
             await ctx.respond("❌ Economy access required.", ephemeral=True)
             return
         await ctx.defer(ephemeral=True)
+        actor = str(ctx.author.display_name)
+
         try:
-            with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
-                out = create_manual_loot_buyback_from_price(
-                    conn,
-                    backend,
-                    buyback_price=int(buyback_price),
-                    actor=str(ctx.author.display_name),
-                )
+            out = await self.economy_repo.create_loot_buyback(buyback_price=int(buyback_price), actor=actor)
         except Exception as e:
             await ctx.followup.send(f"❌ Loot buyback failed: {e}", ephemeral=True)
             return
@@ -347,17 +322,15 @@ class EconomyCommands(commands.Cog):
             await ctx.respond("❌ Economy access required.", ephemeral=True)
             return
         await ctx.defer(ephemeral=True)
+        actor = str(ctx.author.display_name)
+
         try:
-            with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
-                out = issue_regear_request(
-                    conn,
-                    backend,
-                    request_id=int(request_id),
-                    checked_by=str(ctx.author.display_name),
-                    issued_by=str(ctx.author.display_name),
-                    note=note,
-                )
+            out = await self.economy_repo.issue_regear(
+                request_id=int(request_id),
+                checked_by=actor,
+                issued_by=actor,
+                note=note,
+            )
         except Exception as e:
             await ctx.followup.send(f"❌ Regear issue failed: {e}", ephemeral=True)
             return
@@ -3,11 +3,11 @@ import asyncio
 import hashlib
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
-import aiosqlite
-import asyncpg
 import yaml
 from enum import Enum
 
+import db_engine
+
 class PlayerStatus(str, Enum):
     PENDING = "pending"
     ACTIVE = "active"
@@ -27,25 +27,19 @@ class Database:
         self.is_sqlite = database_url.startswith('sqlite://')
         
     async def connect(self):
+        # Shared with the economy repository when both point at one URL (see db_engine).
         if self.is_sqlite:
-            db_path = self.database_url.replace('sqlite:///', '')
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-            self.conn = await aiosqlite.connect(db_path)
-            await self.conn.execute("PRAGMA foreign_keys = ON")
-            await self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn = await db_engine.open_async(self.database_url)
         else:
-            if self.database_url.startswith("postgres://"):
-                self.database_url = self.database_url.replace("postgres://", "postgresql://", 1)
+            self.database_url = db_engine.normalize_postgres_url(self.database_url)
             
             import ssl
             ctx = ssl.create_default_context(cafile='')
             ctx.check_hostname = False
             ctx.verify_mode = ssl.CERT_NONE
             
-            self.pool = await asyncpg.create_pool(
-                dsn=self.database_url,
-                min_size=1,
+            self.pool = await db_engine.open_async(
+                self.database_url,
                 max_size=10,
                 command_timeout=60,
                 ssl=ctx
@@ -56,9 +50,9 @@ class Database:
     
     async def close(self):
         if self.is_sqlite and self.conn:
-            await self.conn.close()
+            await db_engine.close_async(self.conn)
         elif self.pool:
-            await self.pool.close()
+            await db_engine.close_async(self.pool)
     
     async def execute(self, query: str, *args) -> Optional[int]:
         if len(args) == 1 and isinstance(args[0], (list, tuple)):
@@ -67,10 +61,9 @@ class Database:
             clean_args = args
 
         if self.is_sqlite:
-            placeholders = query.count('$')
-            for i in range(placeholders, 0, -1):
-                query = query.replace(f'${i}', '?')
-            cursor = await self.conn.execute(query, clean_args)
+            sql, bind = db_engine.translate(query, clean_args, "sqlite")
+            with db_engine.track("bot", query):
+                cursor = await self.conn.execute(sql, bind)
             await self.conn.commit()
             return cursor.lastrowid
         else:
@@ -82,9 +75,11 @@ class Database:
                     if "RETURNING" not in query_upper:
                         query_trimmed = query_trimmed.rstrip('; \t\n\r')
                         query_trimmed += " RETURNING id"
-                    return await conn.fetchval(query_trimmed, *clean_args)
+                    with db_engine.track("bot", query):
+                        return await conn.fetchval(query_trimmed, *clean_args)
                 else:
-                    await conn.execute(query, *clean_args)
+                    with db_engine.track("bot", query):
+                        await conn.execute(query, *clean_args)
                     return None
     
     async def fetch(self, query: str, *args) -> list:
@@ -94,16 +89,16 @@ class Database:
             clean_args = args
 
         if self.is_sqlite:
-            placeholders = query.count('$')
-            for i in range(placeholders, 0, -1):
-                query = query.replace(f'${i}', '?')
-            cursor = await self.conn.execute(query, clean_args)
+            sql, bind = db_engine.translate(query, clean_args, "sqlite")
+            with db_engine.track("bot", query):
+                cursor = await self.conn.execute(sql, bind)
             rows = await cursor.fetchall()
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in rows]
         else:
             async with self.pool.acquire() as conn:
-                rows = await conn.fetch(query, *clean_args)
+                with db_engine.track("bot", query):
+                    rows = await conn.fetch(query, *clean_args)
                 return [dict(row) for row in rows]
     
     async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
@@ -113,10 +108,9 @@ class Database:
             clean_args = args
 
         if self.is_sqlite:
-            placeholders = query.count('$')
-            for i in range(placeholders, 0, -1):
-                query = query.replace(f'${i}', '?')
-            cursor = await self.conn.execute(query, clean_args)
+            sql, bind = db_engine.translate(query, clean_args, "sqlite")
+            with db_engine.track("bot", query):
+                cursor = await self.conn.execute(sql, bind)
             row = await cursor.fetchone()
             if row:
                 columns = [desc[0] for desc in cursor.description]
@@ -124,7 +118,8 @@ class Database:
             return None
         else:
             async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(query, *clean_args)
+                with db_engine.track("bot", query):
+                    row = await conn.fetchrow(query, *clean_args)
                 return dict(row) if row else None
     
     async def initialize_schema(self):
@@ -0,0 +1,428 @@
+"""
+Shared database engine for the bot (database.Database), the dashboard
+(web_dashboard/db_sync.py) and the economy DB (web_dashboard/economy_db_sync.py,
+web_dashboard/economy_repository.py).
+
+The dashboard runs inside the bot process (keep_alive starts Flask next to the
+bot), so everything here is process-wide and keyed by database URL:
+
+- placeholder translation: SQL is written with asyncpg-style $1, $2, ...;
+  SQLite wants ?, psycopg2 wants %s (in order of appearance). The rewrite and
+  the parameter index mapping are cached per SQL text;
+- sync Postgres pool (psycopg2), bounded per URL (DB_POOL_MAX, default 5): callers
+  block instead of opening one more server connection per request;
+- async handles (asyncpg pool / aiosqlite connection), one per URL and event loop,
+  reference counted so the bot and the economy repository share them;
+- SQLite connection setup (busy timeout, foreign keys, WAL);
+- instrumentation: query count, errors and latency per source, slow statements,
+  pool checkouts and wait times (see engine_stats()).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Deque, Dict, Generator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+_DOLLAR_PARAM = re.compile(r"\$(\d+)")
+_SAMPLE_WINDOW = 1024
+_SLOW_KEEP = 10
+
+POOL_MAX = max(1, int(os.environ.get("DB_POOL_MAX") or 5))
+POOL_TIMEOUT_S = float(os.environ.get("DB_POOL_TIMEOUT_S") or 30)
+SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS") or 500)
+# Distinct SQL texts kept translated; the app issues a few hundred at most.
+TRANSLATE_CACHE_MAX = 1024
+
+
+def normalize_postgres_url(url: str) -> str:
+    return url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url
+
+
+def backend_for(url: str) -> str:
+    return "sqlite" if url.startswith("sqlite") else "postgres"
+
+
+def sqlite_path(url: str) -> str:
+    path = url.replace("sqlite:///", "").replace("sqlite://", "")
+    # Normalize relative paths to absolute, and ensure parent dir exists.
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    return path
+
+
+def _url_label(url: str) -> str:
+    """Pool name for stats: never the credentials."""
+    if backend_for(url) == "sqlite":
+        return "sqlite:" + os.path.basename(sqlite_path(url))
+    parsed = urlparse(normalize_postgres_url(url))
+    return f"postgres:{parsed.hostname or ''}/{(parsed.path or '/').lstrip('/')}"
+
+
+# --- Placeholder translation -------------------------------------------------
+
+
+@lru_cache(maxsize=TRANSLATE_CACHE_MAX)
+def _compile_placeholders(sql: str, backend: str) -> Tuple[str, Tuple[int, ...]]:
+    """Rewritten SQL plus the 0-based parameter index bound to each placeholder, in order."""
+    mapping = tuple(int(n) - 1 for n in _DOLLAR_PARAM.findall(sql))
+    return _DOLLAR_PARAM.sub("?" if backend == "sqlite" else "%s", sql), mapping
+
+
+def translate(sql: str, params: Sequence[Any], backend: str) -> Tuple[str, tuple]:
+    """
+    Rewrite $N placeholders for the target driver and return (sql, bound params).
+
+    Both drivers bind positionally in order of appearance (? for SQLite, %s for
+    psycopg2), so values are gathered through the cached index mapping: a repeated
+    or out-of-order $N binds the right value. SQL without $N is passed through.
+    """
+    q, mapping = _compile_placeholders(sql, backend)
+    if not mapping:
+        return q, tuple(params)
+    if min(mapping) < 0 or max(mapping) >= len(params):
+        bad = next(i for i in mapping if i < 0 or i >= len(params))
+        raise IndexError(f"SQL placeholder ${bad + 1} out of range for {len(params)} parameter(s)")
+    return q, tuple([params[i] for i in mapping])
+
+
+# --- Instrumentation ---------------------------------------------------------
+
+
+def _percentiles_ms(samples: Deque[float]) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000.0, 2)
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1] * 1000.0, 2)}
+
+
+class _QueryStats:
+    def __init__(self) -> None:
+        self.queries = 0
+        self.errors = 0
+        self.slow = 0
+        self.total_s = 0.0
+        self.latency: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self.slowest: Deque[dict] = deque(maxlen=_SLOW_KEEP)
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "errors": self.errors,
+            "slow": self.slow,
+            "total_ms": round(self.total_s * 1000.0, 1),
+            "latency_ms": _percentiles_ms(self.latency),
+            "recent_slow": list(self.slowest),
+        }
+
+
+_stats_lock = threading.Lock()
+_query_stats: Dict[str, _QueryStats] = {}
+
+
+def record_query(source: str, sql: str, elapsed_s: float, ok: bool) -> None:
+    with _stats_lock:
+        st = _query_stats.get(source)
+        if st is None:
+            st = _query_stats[source] = _QueryStats()
+        st.queries += 1
+        st.total_s += elapsed_s
+        st.latency.append(elapsed_s)
+        if not ok:
+            st.errors += 1
+        if elapsed_s * 1000.0 >= SLOW_QUERY_MS:
+            st.slow += 1
+            st.slowest.append({"ms": round(elapsed_s * 1000.0, 1), "sql": " ".join(sql.split())[:200]})
+
+
+@contextmanager
+def track(source: str, sql: str) -> Generator[None, None, None]:
+    """Time one statement; usable around awaits (``with track(...): await conn.fetch(...)``)."""
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record_query(source, sql, time.perf_counter() - started, ok)
+
+
+# --- SQLite ------------------------------------------------------------------
+
+_wal_paths: set = set()
+_wal_lock = threading.Lock()
+
+
+def connect_sqlite(path: str, *, timeout: float = 5.0) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=timeout)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    if path not in _wal_paths:
+        # journal_mode is persistent in the file: readers no longer block the writer (and vice versa).
+        with _wal_lock:
+            if path not in _wal_paths:
+                conn.execute("PRAGMA journal_mode = WAL")
+                _wal_paths.add(path)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+# --- Sync Postgres pool ------------------------------------------------------
+
+
+# psycopg2.extensions.TRANSACTION_STATUS_INERROR (kept literal: psycopg2 is only imported when connecting).
+_PG_TX_INERROR = 3
+
+
+class _SyncPool:
+    """Bounded LIFO psycopg2 pool; checkout blocks up to POOL_TIMEOUT_S when all connections are busy."""
+
+    def __init__(self, url: str, max_size: int):
+        self._dsn = normalize_postgres_url(url)
+        self.label = _url_label(url)
+        self.max_size = max_size
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.checkouts = 0
+        self.discarded = 0
+        self._wait: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+
+    def checkout(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=POOL_TIMEOUT_S):
+            raise RuntimeError(f"DB pool {self.label} exhausted ({self.max_size} connections busy for {POOL_TIMEOUT_S:g}s)")
+        try:
+            conn = None
+            with self._lock:
+                while self._idle and conn is None:
+                    candidate = self._idle.pop()
+                    if candidate.closed:
+                        self.discarded += 1
+                    else:
+                        conn = candidate
+            if conn is None:
+                import psycopg2
+
+                conn = psycopg2.connect(self._dsn, connect_timeout=10)
+                with self._lock:
+                    self.created += 1
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.checkouts += 1
+            self._wait.append(time.perf_counter() - started)
+        return conn
+
+    def checkin(self, conn) -> None:
+        try:
+            # A caller that failed mid-transaction may also have skipped its cleanup (e.g. a session
+            # advisory unlock); closing drops such session state, a rollback would not.
+            failed = not conn.closed and conn.get_transaction_status() == _PG_TX_INERROR
+            if not conn.closed and not failed:
+                # End whatever the caller left open (reads never commit); same as closing it.
+                conn.rollback()
+                conn.cursor_factory = None
+            keep = not conn.closed and not failed
+        except Exception:
+            keep = False
+        if keep:
+            with self._lock:
+                self._idle.append(conn)
+        else:
+            with self._lock:
+                self.discarded += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "discarded": self.discarded,
+                "checkout_wait_ms": _percentiles_ms(self._wait),
+            }
+
+
+_sync_pools: Dict[str, _SyncPool] = {}
+_sync_pools_lock = threading.Lock()
+
+
+def _sync_pool(url: str) -> _SyncPool:
+    key = normalize_postgres_url(url)
+    with _sync_pools_lock:
+        pool = _sync_pools.get(key)
+        if pool is None:
+            pool = _sync_pools[key] = _SyncPool(url, POOL_MAX)
+        return pool
+
+
+@contextmanager
+def sync_connection(url: str, *, dict_rows: bool = False, sqlite_timeout: float = 5.0) -> Generator[Tuple[Any, str], None, None]:
+    """
+    Yields (connection, backend). SQLite opens a connection per call (cheap, and
+    sqlite3 connections are thread-bound); Postgres borrows from the shared pool.
+    dict_rows sets RealDictCursor as the connection's default cursor (dashboard style).
+    """
+    if backend_for(url) == "sqlite":
+        conn = connect_sqlite(sqlite_path(url), timeout=sqlite_timeout)
+        try:
+            yield conn, "sqlite"
+        finally:
+            conn.close()
+        return
+
+    pool = _sync_pool(url)
+    conn = pool.checkout()
+    try:
+        if dict_rows:
+            import psycopg2.extras
+
+            conn.cursor_factory = psycopg2.extras.RealDictCursor
+        yield conn, "postgres"
+    finally:
+        pool.checkin(conn)
+
+
+def fetch_all(conn, backend: str, sql: str, params: Optional[tuple] = None, *, source: str = "sync") -> List[dict]:
+    if backend == "postgres":
+        import psycopg2.extras
+
+        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    else:
+        cur = conn.cursor()
+    q, bind = translate(sql, params or (), backend)
+    with track(source, sql):
+        cur.execute(q, bind)
+        rows = cur.fetchall()
+    if backend == "sqlite":
+        cols = [d[0] for d in cur.description] if cur.description else []
+        return [dict(zip(cols, row)) for row in rows]
+    return [dict(r) for r in rows]
+
+
+def fetch_one(conn, backend: str, sql: str, params: Optional[tuple] = None, *, source: str = "sync") -> Optional[dict]:
+    if backend == "postgres":
+        import psycopg2.extras
+
+        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    else:
+        cur = conn.cursor()
+    q, bind = translate(sql, params or (), backend)
+    with track(source, sql):
+        cur.execute(q, bind)
+        row = cur.fetchone()
+    if not row:
+        return None
+    if backend == "sqlite":
+        cols = [d[0] for d in cur.description] if cur.description else []
+        return dict(zip(cols, row))
+    return dict(row)
+
+
+# --- Async handles -----------------------------------------------------------
+
+_async_handles: Dict[Tuple[str, int], list] = {}  # key -> [handle, refs, opening future]
+_async_keys: Dict[int, Tuple[str, int]] = {}
+
+
+async def open_async(
+    url: str,
+    *,
+    max_size: int = 10,
+    command_timeout: float = 60,
+    ssl: Any = None,
+    sqlite_timeout: float = 5.0,
+) -> Any:
+    """
+    Shared asyncpg pool (Postgres) or aiosqlite connection (SQLite, Row factory) for
+    this URL on the running event loop. The first opener's sizing wins; release with
+    close_async(). Callers must not close the handle themselves.
+    """
+    key = (normalize_postgres_url(url), id(asyncio.get_running_loop()))
+    entry = _async_handles.get(key)
+    if entry is not None:
+        entry[1] += 1
+        if entry[2] is not None:
+            await asyncio.shield(entry[2])
+        return entry[0]
+    opening = asyncio.get_running_loop().create_future()
+    entry = _async_handles[key] = [None, 1, opening]
+    try:
+        if backend_for(url) == "sqlite":
+            import aiosqlite
+
+            handle = await aiosqlite.connect(sqlite_path(url), timeout=sqlite_timeout)
+            handle.row_factory = aiosqlite.Row
+            # Close the pragma cursors: an open statement keeps a read lock on the file.
+            async with handle.execute("PRAGMA foreign_keys = ON"):
+                pass
+            async with handle.execute("PRAGMA journal_mode = WAL"):
+                pass
+        else:
+            import asyncpg
+
+            handle = await asyncpg.create_pool(
+                dsn=key[0],
+                min_size=1,
+                max_size=max_size,
+                command_timeout=command_timeout,
+                ssl=ssl,
+            )
+    except BaseException as e:
+        _async_handles.pop(key, None)
+        opening.set_exception(e)
+        opening.exception()  # waiters re-raise it; do not log "never retrieved"
+        raise
+    entry[0], entry[2] = handle, None
+    _async_keys[id(handle)] = key
+    opening.set_result(None)
+    return handle
+
+
+async def close_async(handle: Any) -> None:
+    key = _async_keys.get(id(handle))
+    entry = _async_handles.get(key) if key else None
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] > 0:
+        return
+    _async_handles.pop(key, None)
+    _async_keys.pop(id(handle), None)
+    await handle.close()
+
+
+def engine_stats() -> dict:
+    with _stats_lock:
+        queries = {source: st.as_dict() for source, st in _query_stats.items()}
+    with _sync_pools_lock:
+        pools = dict(_sync_pools)
+    info = _compile_placeholders.cache_info()
+    return {
+        "slow_query_ms": SLOW_QUERY_MS,
+        "translate_cache": {"size": info.currsize, "max": info.maxsize, "hits": info.hits, "misses": info.misses},
+        "queries": queries,
+        "sync_pools": {p.label: p.stats() for p in pools.values()},
+        "async_handles": [
+            {"name": _url_label(key[0]), "refs": entry[1]} for key, entry in list(_async_handles.items())
+        ],
+    }
@@ -206,6 +206,16 @@ def run():
     except ValueError:
         threads = 10
     threads = max(4, min(threads, 32))
+    # Alert thresholds are evaluated off the request path (see web_dashboard/economy_alerts.py).
+    from web_dashboard.economy_alerts import start_alert_evaluator
+    from web_dashboard.price_history import install_price_history_recorder
+    from web_dashboard.price_prefetch import start_price_prefetcher
+
+    start_alert_evaluator()
+    # Every fetched market price is appended to econ_price_history (charts, point-in-time valuation).
+    install_price_history_recorder()
+    # Keeps armory / recent request item prices warm so quotes are answered from cache.
+    start_price_prefetcher()
     logger.info(
         "Starting HTTP server on port %s (health + dashboard), waitress threads=%s",
         port,
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Verify (default) or rebuild econ_account_balances from posted journal lines.
+
+Run from repo root with the same ECON_DATABASE_URL as the dashboard
+(unset = data/economy.db), e.g.:
+
+  python scripts/econ_account_balances.py            # report mismatches, exit 1 if any
+  python scripts/econ_account_balances.py --rebuild  # recompute from econ_journal_lines
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main() -> int:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    except ImportError:
+        pass
+
+    from web_dashboard.economy_db_sync import get_economy_sync_connection
+    from web_dashboard.economy_service import (
+        ensure_economy_schema,
+        rebuild_account_balances,
+        verify_account_balances,
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recompute balances from journal lines")
+    args = parser.parse_args()
+
+    with get_economy_sync_connection() as (conn, backend):
+        ensure_economy_schema(conn, backend)
+        if args.rebuild:
+            print(json.dumps(rebuild_account_balances(conn, backend, actor="cli_rebuild")))
+        report = verify_account_balances(conn, backend)
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+"""
+Cash forecasting for the guild treasury (account 1000).
+
+Input is a dense daily net-cash series (one value per UTC day, oldest first, zero
+on days without postings). Three models are fitted with NumPy:
+
+- ewma: exponentially weighted level of the daily net flow;
+- linear_trend: least-squares line over the history;
+- weekday_seasonal: mean net flow per weekday.
+
+Each model projects the cash balance for every horizon with a band of
+``z * residual_std * sqrt(days)`` (daily errors assumed independent), and is
+backtested on the most recent days of history. The model with the lowest backtest
+MAE is reported as the headline forecast.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+FORECAST_HORIZONS: Tuple[int, ...] = (7, 30, 90)
+BAND_Z = 1.96
+EWMA_ALPHA = 0.3
+_MIN_BACKTEST_HISTORY = 14
+_MAX_BACKTEST_DAYS = 28
+
+# fit(history, weekdays_of_history) -> (in-sample one-step predictions, predict(future_weekdays))
+_Model = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]]
+
+
+def _ewma_levels(y: np.ndarray, alpha: float) -> np.ndarray:
+    """level[t] = alpha*y[t] + (1-alpha)*level[t-1], level[-1] = y[0]; closed form, no Python loop."""
+    n = y.size
+    decay = 1.0 - alpha
+    powers = decay ** np.arange(n, dtype=float)
+    return powers * (y[0] * decay + alpha * np.cumsum(y / powers))
+
+
+def _fit_ewma(y: np.ndarray, weekdays: np.ndarray):
+    if y.size == 0:
+        return y, lambda wd: np.zeros(wd.size)
+    levels = _ewma_levels(y, EWMA_ALPHA)
+    fitted = np.concatenate(([y[0]], levels[:-1]))
+    last = float(levels[-1])
+    return fitted, lambda wd: np.full(wd.size, last)
+
+
+def _fit_linear_trend(y: np.ndarray, weekdays: np.ndarray):
+    n = y.size
+    if n < 2:
+        mean = float(y.mean()) if n else 0.0
+        return np.full(n, mean), lambda wd: np.full(wd.size, mean)
+    t = np.arange(n, dtype=float)
+    slope, intercept = np.polyfit(t, y, 1)
+    fitted = intercept + slope * t
+    return fitted, lambda wd: intercept + slope * (n + np.arange(wd.size, dtype=float))
+
+
+def _fit_weekday_seasonal(y: np.ndarray, weekdays: np.ndarray):
+    counts = np.bincount(weekdays, minlength=7).astype(float)
+    sums = np.bincount(weekdays, weights=y, minlength=7)
+    overall = float(y.mean()) if y.size else 0.0
+    means = np.where(counts > 0, sums / np.maximum(counts, 1.0), overall)
+    return means[weekdays], lambda wd: means[wd]
+
+
+MODELS: Dict[str, _Model] = {
+    "ewma": _fit_ewma,
+    "linear_trend": _fit_linear_trend,
+    "weekday_seasonal": _fit_weekday_seasonal,
+}
+
+
+def _residual_std(y: np.ndarray, fitted: np.ndarray) -> float:
+    if y.size < 2:
+        return 0.0
+    return float(np.std(y - fitted, ddof=1))
+
+
+def _backtest(fit: _Model, y: np.ndarray, weekdays: np.ndarray) -> dict:
+    if y.size < _MIN_BACKTEST_HISTORY:
+        return {"days": 0, "mae_daily": None, "cumulative_error": None}
+    k = min(_MAX_BACKTEST_DAYS, y.size // 4)
+    _, predict = fit(y[:-k], weekdays[:-k])
+    pred = predict(weekdays[-k:])
+    actual = y[-k:]
+    return {
+        "days": int(k),
+        "mae_daily": round(float(np.mean(np.abs(pred - actual))), 2),
+        # Projected minus realised cash change over the holdout window.
+        "cumulative_error": int(round(float(pred.sum() - actual.sum()))),
+    }
+
+
+def forecast_cash(
+    daily_net: Sequence[float],
+    *,
+    first_day: date,
+    cash_now: int,
+    horizons: Sequence[int] = FORECAST_HORIZONS,
+) -> dict:
+    """Project cash_now forward with every model; see the module docstring for the method."""
+    y = np.asarray(daily_net, dtype=float)
+    n = y.size
+    weekdays = (first_day.weekday() + np.arange(n)) % 7
+    max_h = max(horizons) if horizons else 0
+    future_weekdays = (first_day.weekday() + n + np.arange(max_h)) % 7
+
+    models: Dict[str, dict] = {}
+    for name, fit in MODELS.items():
+        fitted, predict = fit(y, weekdays)
+        sigma = _residual_std(y, fitted)
+        cumulative = np.cumsum(predict(future_weekdays)) if max_h else np.zeros(0)
+        projections = []
+        for h in horizons:
+            flow = float(cumulative[h - 1]) if h > 0 else 0.0
+            band = BAND_Z * sigma * float(np.sqrt(h))
+            projections.append(
+                {
+                    "days": int(h),
+                    "net_flow": int(round(flow)),
+                    "cash": int(round(cash_now + flow)),
+                    "low": int(round(cash_now + flow - band)),
+                    "high": int(round(cash_now + flow + band)),
+                }
+            )
+        models[name] = {
+            "projections": projections,
+            "residual_std": round(sigma, 2),
+            "backtest": _backtest(fit, y, weekdays),
+        }
+
+    scored = [(m["backtest"]["mae_daily"], name) for name, m in models.items() if m["backtest"]["mae_daily"] is not None]
+    best = min(scored)[1] if scored else "ewma"
+    return {
+        "cash_now": int(cash_now),
+        "history_days": int(n),
+        "series_start": first_day.isoformat(),
+        "series_end": (first_day + timedelta(days=max(n - 1, 0))).isoformat(),
+        "band_z": BAND_Z,
+        "best_model": best,
+        "projections": models[best]["projections"],
+        "models": models,
+    }
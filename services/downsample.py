@@ -0,0 +1,74 @@
+"""
+Time-series downsampling for dashboard charts.
+
+``bucket_stats`` aggregates points into equal-width time buckets (min/max/mean/
+count): exact envelopes, suited to tables and range bands. ``lttb`` keeps a
+subset of the original points chosen by Largest-Triangle-Three-Buckets, which
+preserves the visual shape of a line with a fixed number of points.
+
+Points are ``(t, value)`` pairs with ``t`` in seconds, sorted by ``t``.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def bucket_stats(points: Sequence[Point], buckets: int, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+    """Non-empty buckets of [start, end] as {"t" (bucket start), "min", "max", "mean", "count"}."""
+    if not points or buckets < 1:
+        return []
+    lo = points[0][0] if start is None else float(start)
+    hi = points[-1][0] if end is None else float(end)
+    width = (hi - lo) / buckets if hi > lo else 1.0
+    acc: dict = {}
+    for t, v in points:
+        if t < lo or t > hi:
+            continue
+        i = min(buckets - 1, int((t - lo) / width))
+        b = acc.get(i)
+        if b is None:
+            acc[i] = [v, v, v, 1]
+        else:
+            b[0] = min(b[0], v)
+            b[1] = max(b[1], v)
+            b[2] += v
+            b[3] += 1
+    return [
+        {"t": lo + i * width, "min": b[0], "max": b[1], "mean": b[2] / b[3], "count": b[3]}
+        for i, b in sorted(acc.items())
+    ]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Largest-Triangle-Three-Buckets; first and last points are always kept."""
+    n = len(points)
+    if threshold <= 0 or threshold >= n:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:threshold]
+    out: List[Point] = [points[0]]
+    every = (n - 2) / float(threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex.
+        nxt_start = int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        span = points[nxt_start:nxt_end] or [points[-1]]
+        avg_t = sum(p[0] for p in span) / len(span)
+        avg_v = sum(p[1] for p in span) / len(span)
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        at, av = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            t, v = points[j]
+            area = abs((at - avg_t) * (v - av) - (at - t) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(points[best])
+        a = best
+    out.append(points[-1])
+    return out
@@ -0,0 +1,322 @@
+"""
+Shared outbound HTTP client (Albion Data, Discord REST, Google Sheets export).
+
+- Per-host keep-alive pools of ``http.client`` connections, so repeated calls
+  skip the TCP/TLS handshake; a pooled connection the server already closed is
+  transparently replaced once.
+- Timeouts per request, retries with exponential backoff for idempotent
+  requests on connection errors and 429/502/503/504, honouring ``Retry-After``.
+  An optional ``slot`` (e.g. a semaphore capping calls to one API) is held for
+  each attempt only, never while backing off.
+- Redirects are followed (Google Sheets export answers with a 307).
+- Per-host counters and latency histogram (plus recent samples for p50/p95).
+
+Failures are raised as ``urllib.error.HTTPError`` / ``URLError`` so callers
+written against ``urlopen`` keep their error handling.
+"""
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import os
+import random
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from email.message import Message
+from email.utils import parsedate_to_datetime
+from typing import Any, ContextManager, Deque, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_USER_AGENT = "albion-analytics-bot/1.0"
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS"})
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+_RECENT_SAMPLES = 200
+
+
+class HttpResponse(NamedTuple):
+    status: int
+    headers: Message
+    body: bytes
+    url: str
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as delta-seconds or HTTP-date; None when absent or unparsable."""
+    s = str(value or "").strip()
+    if not s:
+        return None
+    try:
+        return max(0.0, float(s))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(s).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostStats:
+    __slots__ = ("requests", "errors", "retries", "reused", "opened", "buckets", "recent")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.reused = 0
+        self.opened = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent: Deque[float] = deque(maxlen=_RECENT_SAMPLES)
+
+    def observe(self, ms: float) -> None:
+        i = 0
+        while i < len(LATENCY_BUCKETS_MS) and ms > LATENCY_BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.recent.append(ms)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.recent)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))], 2)
+
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["gt_10000"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "reused_connections": self.reused,
+            "opened_connections": self.opened,
+            "latency_ms": {
+                "histogram": dict(zip(labels, self.buckets)),
+                "p50": pct(0.5),
+                "p95": pct(0.95),
+                "recent": [round(x, 2) for x in list(self.recent)[-30:]],
+            },
+        }
+
+
+class HttpClient:
+    def __init__(
+        self,
+        *,
+        pool_size: int = 4,
+        timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = float(timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = max(0.0, float(backoff_base))
+        self.backoff_cap = max(0.0, float(backoff_cap))
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._stats: Dict[str, _HostStats] = {}
+        self._ssl = ssl.create_default_context()
+
+    # -- connection pool ------------------------------------------------------------------
+
+    def _checkout(self, key: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+            st = self._host(key[1])
+            if conn is None:
+                st.opened += 1
+            else:
+                st.reused += 1
+        if conn is None:
+            scheme, host, port = key
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl)
+            else:
+                conn = http.client.HTTPConnection(host, port, timeout=timeout)
+            return conn, False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _checkin(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _host(self, host: str) -> _HostStats:
+        st = self._stats.get(host)
+        if st is None:
+            st = self._stats[host] = _HostStats()
+        return st
+
+    # -- requests -------------------------------------------------------------------------
+
+    def _send_once(
+        self, key: Tuple[str, str, int], method: str, target: str, body: Optional[bytes], headers: Dict[str, str], timeout: float, url: str
+    ) -> HttpResponse:
+        # A pooled connection may have been closed by the server while idle: retry once on a fresh one.
+        for fresh_attempt in range(2):
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused and fresh_attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return HttpResponse(resp.status, resp.headers, data, url)
+        raise http.client.RemoteDisconnected("connection closed")  # pragma: no cover - loop always returns/raises
+
+    def _backoff(self, attempt: int, retry_after: Optional[float], max_wait: float) -> float:
+        if retry_after is not None:
+            return min(retry_after, max_wait)
+        base = self.backoff_base * (2 ** attempt)
+        return min(base + random.uniform(0, base / 2.0), max_wait)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        max_retry_wait: Optional[float] = None,
+        max_redirects: int = 5,
+        slot: Optional[ContextManager[Any]] = None,
+    ) -> HttpResponse:
+        method = method.upper()
+        parts = urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise URLError(f"unsupported URL: {url}")
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        hdrs = {"User-Agent": self.user_agent, "Accept-Encoding": "identity", "Connection": "keep-alive"}
+        hdrs.update(headers or {})
+        tmo = self.timeout if timeout is None else float(timeout)
+        budget = (self.max_retries if retries is None else max(0, int(retries))) if method in _IDEMPOTENT else 0
+        max_wait = self.backoff_cap if max_retry_wait is None else float(max_retry_wait)
+        host = parts.hostname
+
+        attempt = 0
+        while True:
+            with slot if slot is not None else nullcontext():
+                started = time.perf_counter()
+                try:
+                    resp = self._send_once(key, method, target, body, hdrs, tmo, url)
+                    err: Optional[BaseException] = None
+                except (OSError, http.client.HTTPException) as e:
+                    resp, err = None, e
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with self._lock:
+                st = self._host(host)
+                st.requests += 1
+                st.observe(elapsed_ms)
+                if err is not None or resp.status >= 400:
+                    st.errors += 1
+
+            retryable = err is not None or resp.status in RETRY_STATUSES
+            if retryable and attempt < budget:
+                retry_after = None if resp is None else parse_retry_after(resp.headers.get("Retry-After"))
+                with self._lock:
+                    self._host(host).retries += 1
+                time.sleep(self._backoff(attempt, retry_after, max_wait))
+                attempt += 1
+                continue
+            if err is not None:
+                reason = "timed out" if isinstance(err, socket.timeout) else err
+                raise URLError(reason) from err
+            if resp.status >= 400:
+                raise HTTPError(url, resp.status, http.client.responses.get(resp.status, ""), resp.headers, io.BytesIO(resp.body))
+            location = resp.headers.get("Location")
+            if resp.status in _REDIRECT_STATUSES and location and max_redirects > 0:
+                # Same rules as urllib: 303 (and 301/302 after POST) continue as a body-less GET.
+                keep = resp.status in (307, 308) or method in ("GET", "HEAD")
+                return self.request(
+                    method if keep else "GET",
+                    urljoin(url, location),
+                    headers=headers,
+                    body=body if keep else None,
+                    timeout=timeout,
+                    retries=retries,
+                    max_retry_wait=max_retry_wait,
+                    max_redirects=max_redirects - 1,
+                    slot=slot,
+                )
+            return resp
+
+    def get_json(self, url: str, **kwargs: Any) -> Any:
+        headers = {"Accept": "application/json"}
+        headers.update(kwargs.pop("headers", None) or {})
+        return self.request("GET", url, headers=headers, **kwargs).json()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hosts": {h: st.snapshot() for h, st in sorted(self._stats.items())},
+                "idle_connections": {f"{k[0]}://{k[1]}:{k[2]}": len(v) for k, v in self._idle.items()},
+                "pool_size": self.pool_size,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+_client = HttpClient(
+    pool_size=int(_env_float("HTTP_CLIENT_POOL_SIZE", 4)),
+    timeout=_env_float("HTTP_CLIENT_TIMEOUT_SEC", 10.0),
+    max_retries=int(_env_float("HTTP_CLIENT_MAX_RETRIES", 2)),
+    backoff_base=_env_float("HTTP_CLIENT_BACKOFF_SEC", 0.5),
+)
+
+
+def http_client() -> HttpClient:
+    return _client
+
+
+def http_client_stats() -> dict:
+    return _client.stats()
@@ -0,0 +1,231 @@
+"""
+Offline Albion item catalog for autocomplete.
+
+Built from an ao-bin-dumps items dump (``formatted/items.txt`` or ``items.json``)
+at ALBION_ITEMS_DUMP_PATH. Two compact in-memory indexes answer suggestions
+without network calls:
+
+- a sorted list of casefolded full item ids and English names, searched by
+  prefix with ``bisect``;
+- a token inverted index (plus a sorted token vocabulary) for word-order-free
+  queries such as "bag adept" or "t6 cape".
+
+Ranking: exact id/name, then full-string prefix (alphabetical, so shorter
+extensions come first), then all-tokens matches (exact tokens before prefix
+tokens; ties go to shorter names, then id). Every stage stops once ``limit``
+results are collected, so short prefixes cost no more than long ones.
+
+The index is built off the request path (``load_item_catalog``, called by the
+price prefetch thread); requests only read the last loaded catalog.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from services.http_client import http_client
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+_TXT_LINE_RE = re.compile(r"^\s*\d+:\s*(\S+)\s*(?::\s*(.*))?$")
+_DEFAULT_DUMP_URL = "https://raw.githubusercontent.com/ao-data/ao-bin-dumps/master/formatted/items.txt"
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Iterator[int]:
+    """Positions of ``keys`` (sorted) starting with ``prefix``, in order."""
+    i = bisect_left(keys, prefix)
+    while i < len(keys) and keys[i].startswith(prefix):
+        yield i
+        i += 1
+
+
+class ItemCatalog:
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        seen: Set[str] = set()
+        for unique_name, name in entries:
+            unique_name = str(unique_name or "").strip()
+            if not unique_name or unique_name in seen:
+                continue
+            seen.add(unique_name)
+            self.ids.append(unique_name)
+            self.names.append(str(name or "").strip())
+
+        # Tie-break position of each item (shorter name, then id); posting lists are kept in this order.
+        order = sorted(range(len(self.ids)), key=lambda i: (len(self.names[i]) or len(self.ids[i]), self.ids[i]))
+        self._rank = [0] * len(order)
+        for pos, i in enumerate(order):
+            self._rank[i] = pos
+
+        full: List[Tuple[str, int]] = []
+        inverted: Dict[str, List[int]] = {}
+        self._item_tokens: List[Tuple[str, ...]] = [()] * len(order)
+        for idx in order:
+            unique_name, name = self.ids[idx], self.names[idx]
+            for key in {unique_name.casefold(), name.casefold()} - {""}:
+                full.append((key, idx))
+            toks = tuple(sorted(set(_tokens(unique_name) + _tokens(name))))
+            self._item_tokens[idx] = toks
+            for tok in toks:
+                inverted.setdefault(tok, []).append(idx)
+        full.sort()
+        self._full_keys = [k for k, _ in full]
+        self._full_ids = [i for _, i in full]
+        self._vocab = sorted(inverted)
+        self._postings = [inverted[t] for t in self._vocab]
+        self._posting_sets: Dict[str, Set[int]] = {}
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_dump(cls, text: str) -> "ItemCatalog":
+        """ao-bin-dumps ``formatted/items.json`` (list of {UniqueName, LocalizedNames}) or ``items.txt`` lines."""
+        stripped = text.lstrip()
+        entries: List[Tuple[str, str]] = []
+        if stripped.startswith("["):
+            for row in json.loads(stripped):
+                if not isinstance(row, dict):
+                    continue
+                names = row.get("LocalizedNames") or {}
+                entries.append((row.get("UniqueName") or "", (names.get("EN-US") if isinstance(names, dict) else "") or ""))
+        else:
+            for line in text.splitlines():
+                m = _TXT_LINE_RE.match(line)
+                if m:
+                    entries.append((m.group(1), m.group(2) or ""))
+        return cls(entries)
+
+    def _posting(self, tok: str) -> List[int]:
+        i = bisect_left(self._vocab, tok)
+        return self._postings[i] if i < len(self._vocab) and self._vocab[i] == tok else []
+
+    def _posting_set(self, tok: str) -> Set[int]:
+        # Membership tests for multi-token queries; only tokens actually queried get a set.
+        out = self._posting_sets.get(tok)
+        if out is None:
+            out = self._posting_sets[tok] = set(self._posting(tok))
+        return out
+
+    def _token_candidates(self, toks: List[str], last_is_prefix: bool) -> Iterator[int]:
+        """Items holding every token (the last one possibly as a prefix), in rank order."""
+        full, last = (toks[:-1], toks[-1]) if last_is_prefix else (toks, None)
+        if full:
+            drive = min(full, key=lambda t: len(self._posting(t)))
+            others = [self._posting_set(t) for t in full if t != drive]
+            for i in self._posting(drive):
+                if all(i in s for s in others) and (last is None or any(t.startswith(last) for t in self._item_tokens[i])):
+                    yield i
+            return
+        # Single prefix token: lazily merge the ranked posting lists of every matching token.
+        merged = heapq.merge(*(self._postings[v] for v in _prefix_range(self._vocab, last)), key=self._rank.__getitem__)
+        prev = -1
+        for i in merged:
+            if i != prev:
+                yield i
+                prev = i
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        q = str(query or "").strip().casefold()
+        lim = max(1, int(limit))
+        if not q:
+            return []
+        picked: List[int] = []
+        seen: Set[int] = set()
+
+        def take(ids: Iterable[int]) -> bool:
+            for i in ids:
+                if i not in seen:
+                    seen.add(i)
+                    picked.append(i)
+                    if len(picked) >= lim:
+                        return True
+            return False
+
+        exact: List[int] = []
+        for p in _prefix_range(self._full_keys, q):
+            if self._full_keys[p] != q:
+                break
+            exact.append(self._full_ids[p])
+        stages: List[Iterable[int]] = [sorted(exact, key=self._rank.__getitem__), (self._full_ids[p] for p in _prefix_range(self._full_keys, q))]
+        toks = _tokens(q)
+        if toks:
+            stages += [self._token_candidates(toks, False), self._token_candidates(toks, True)]
+        for ids in stages:
+            if take(ids):
+                break
+        return [{"item_id": self.ids[i], "name": self.names[i]} for i in picked]
+
+
+def _dump_path() -> str:
+    default = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "items.txt")
+    return (os.environ.get("ALBION_ITEMS_DUMP_PATH") or default).strip()
+
+
+def _dump_max_age_seconds() -> float:
+    try:
+        return max(1.0, float(os.environ.get("ALBION_ITEMS_DUMP_MAX_AGE_H", "168"))) * 3600.0
+    except ValueError:
+        return 168 * 3600.0
+
+
+_lock = threading.Lock()
+# (path, mtime, catalog) of the last build; replaced as a whole so readers never see a partial index.
+_loaded: Optional[Tuple[str, float, ItemCatalog]] = None
+
+
+def get_item_catalog() -> Optional[ItemCatalog]:
+    """Last catalog built by load_item_catalog for the current dump path; None until then. Never builds."""
+    loaded = _loaded
+    if loaded is None or loaded[0] != _dump_path():
+        return None
+    return loaded[2]
+
+
+def load_item_catalog() -> bool:
+    """(Re)build the catalog when the dump on disk is new or changed; True when a build happened."""
+    global _loaded
+    path = _dump_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return False
+    with _lock:
+        if _loaded is not None and _loaded[:2] == (path, mtime):
+            return False
+        with open(path, encoding="utf-8") as f:
+            catalog = ItemCatalog.from_dump(f.read())
+        _loaded = (path, mtime, catalog)
+        return True
+
+
+def refresh_item_dump(*, force: bool = False) -> bool:
+    """Download the dump from ALBION_ITEMS_DUMP_URL when missing or older than ALBION_ITEMS_DUMP_MAX_AGE_H."""
+    path = _dump_path()
+    try:
+        fresh = (time.time() - os.path.getmtime(path)) < _dump_max_age_seconds()
+    except OSError:
+        fresh = False
+    if fresh and not force:
+        return False
+    url = (os.environ.get("ALBION_ITEMS_DUMP_URL") or _DEFAULT_DUMP_URL).strip()
+    text = http_client().request("GET", url, timeout=60).text()
+    if len(ItemCatalog.from_dump(text)) == 0:
+        raise ValueError("Item dump contains no items")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return True
@@ -0,0 +1,153 @@
+"""
+Bounded LRU cache for market prices, shared by all pricing_client lookups.
+
+Entries older than the TTL but younger than ``stale_max_seconds`` are still
+served immediately; the caller schedules a background refresh through
+``revalidate`` (stale-while-revalidate), so only cold keys wait on the network.
+With a ``path`` the entries are written through to a small SQLite file and
+reloaded on start, so a restart does not empty the cache.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+    fresh: bool
+    # Past the TTL but still within the stale window: serve now, refresh in background.
+    revalidate: bool
+
+
+class PriceCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 5000,
+        ttl_seconds: float = 90.0,
+        stale_max_seconds: float = 6 * 3600.0,
+        path: Optional[str] = None,
+        refresh_workers: int = 2,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.stale_max_seconds = max(self.ttl_seconds, float(stale_max_seconds))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=max(1, int(refresh_workers)), thread_name_prefix="price-refresh")
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS price_cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)")
+            rows = self._db.execute(
+                "SELECT key, stored_at, value FROM price_cache ORDER BY stored_at DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            for key, stored_at, value in reversed(rows):
+                self._entries[key] = (float(stored_at), json.loads(value))
+            self._db.execute(
+                "DELETE FROM price_cache WHERE key NOT IN (SELECT key FROM price_cache ORDER BY stored_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Any stored value (also expired ones, usable as an error fallback); counters track fresh/stale/miss."""
+        now = time.time()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            age = now - hit[0]
+            fresh = age <= self.ttl_seconds
+            revalidate = not fresh and age <= self.stale_max_seconds
+            if fresh:
+                self._counters["hits"] += 1
+            elif revalidate:
+                self._counters["stale_hits"] += 1
+            else:
+                self._counters["misses"] += 1
+            return CacheEntry(hit[1], hit[0], fresh, revalidate)
+
+    def stored_at(self, key: str) -> Optional[float]:
+        """Store time of ``key`` without touching LRU order or counters (for the prefetcher)."""
+        with self._lock:
+            hit = self._entries.get(key)
+            return hit[0] if hit is not None else None
+
+    def put(self, key: str, value: Any, *, stored_at: Optional[float] = None) -> None:
+        stamp = time.time() if stored_at is None else float(stored_at)
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            evicted: List[str] = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self._counters["evictions"] += len(evicted)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO price_cache (key, stored_at, value) VALUES (?, ?, ?)",
+                    (key, stamp, json.dumps(value, default=str)),
+                )
+                if evicted:
+                    self._db.executemany("DELETE FROM price_cache WHERE key=?", [(k,) for k in evicted])
+                self._db.commit()
+
+    def revalidate(self, keys: Iterable[str], loader: Callable[[List[str]], Any]) -> bool:
+        """Run loader(keys) in the background unless every key already has a refresh in flight."""
+        with self._lock:
+            todo = [k for k in dict.fromkeys(keys) if k not in self._refreshing]
+            if not todo:
+                return False
+            self._refreshing.update(todo)
+            self._counters["refreshes"] += 1
+
+        def _run() -> None:
+            try:
+                loader(todo)
+            except Exception:
+                with self._lock:
+                    self._counters["refresh_errors"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(todo)
+
+        self._refresher.submit(_run)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM price_cache")
+                self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counters)
+            out.update(
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl_seconds,
+                stale_max_seconds=self.stale_max_seconds,
+                refreshing=len(self._refreshing),
+                persistent=self._db is not None,
+            )
+            lookups = out["hits"] + out["stale_hits"] + out["misses"]
+            out["hit_ratio"] = round((out["hits"] + out["stale_hits"]) / float(lookups), 4) if lookups else None
+            return out
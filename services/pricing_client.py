@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-import json
+import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from urllib.parse import quote, urlencode
 
-_CACHE: Dict[str, Tuple[float, dict]] = {}
+from services.http_client import http_client
+from services.price_cache import CacheEntry, PriceCache
+from utils.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger("pricing_client")
 
 
 def _base_url() -> str:
@@ -31,6 +37,197 @@ def _cache_ttl() -> int:
         return 90
 
 
+def _cache_max_entries() -> int:
+    try:
+        return max(100, int(os.environ.get("ALBION_PRICING_CACHE_MAX_ENTRIES", "5000")))
+    except ValueError:
+        return 5000
+
+
+def _cache_stale_max() -> int:
+    try:
+        return max(0, int(os.environ.get("ALBION_PRICING_STALE_MAX_SEC", str(6 * 3600))))
+    except ValueError:
+        return 6 * 3600
+
+
+def _max_retries() -> int:
+    try:
+        return max(0, min(5, int(os.environ.get("ALBION_PRICING_MAX_RETRIES", "1"))))
+    except ValueError:
+        return 1
+
+
+def _breaker_failures() -> int:
+    try:
+        return max(1, int(os.environ.get("ALBION_PRICING_BREAKER_FAILURES", "5")))
+    except ValueError:
+        return 5
+
+
+def _breaker_slo_ms() -> float:
+    try:
+        return max(100.0, float(os.environ.get("ALBION_PRICING_BREAKER_SLO_MS", "3000")))
+    except ValueError:
+        return 3000.0
+
+
+def _breaker_cooldown() -> float:
+    try:
+        return max(1.0, float(os.environ.get("ALBION_PRICING_BREAKER_COOLDOWN_SEC", "30")))
+    except ValueError:
+        return 30.0
+
+
+def _max_concurrency() -> int:
+    try:
+        return max(1, min(16, int(os.environ.get("ALBION_PRICING_MAX_CONCURRENCY", "4"))))
+    except ValueError:
+        return 4
+
+
+def _batch_size() -> int:
+    try:
+        return max(1, min(100, int(os.environ.get("ALBION_PRICING_BATCH_SIZE", "40"))))
+    except ValueError:
+        return 40
+
+
+# Process-wide cap on in-flight requests to the pricing API (single lookups and batch quotes alike).
+# ALBION_PRICING_MAX_CONCURRENCY is read once here: changing it needs a restart.
+_MAX_CONCURRENCY = _max_concurrency()
+_FETCH_SLOTS = threading.BoundedSemaphore(_MAX_CONCURRENCY)
+# Keep batched URLs well under common 4-8 KB request-line limits.
+_MAX_IDS_PATH_CHARS = 1800
+
+# Optional file (ALBION_PRICING_CACHE_PATH) keeps prices across restarts.
+_CACHE = PriceCache(
+    max_entries=_cache_max_entries(),
+    ttl_seconds=_cache_ttl(),
+    stale_max_seconds=_cache_stale_max(),
+    path=(os.environ.get("ALBION_PRICING_CACHE_PATH") or "").strip() or None,
+)
+# Concurrent misses / refreshes for one cache key share a single upstream request.
+_FLIGHT = SingleFlight()
+
+
+# Consecutive upstream failures or SLO breaches stop calls for a cooldown; callers fall back to cache.
+_BREAKER = CircuitBreaker(
+    "albion-online-data",
+    failure_threshold=_breaker_failures(),
+    slo_ms=_breaker_slo_ms(),
+    reset_timeout=_breaker_cooldown(),
+)
+
+
+def _upstream_fault(e: BaseException) -> bool:
+    # 4xx answers (unknown item, bad query) mean the API is up; only 429/5xx and network errors trip the breaker.
+    return not isinstance(e, HTTPError) or e.code == 429 or e.code >= 500
+
+
+class _FetchSlot:
+    """One of _FETCH_SLOTS per request attempt; time spent queueing for it is not billed to the API's latency."""
+
+    def __init__(self) -> None:
+        self.waited = 0.0
+
+    def __enter__(self) -> "_FetchSlot":
+        started = time.perf_counter()
+        _FETCH_SLOTS.acquire()
+        self.waited += time.perf_counter() - started
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        _FETCH_SLOTS.release()
+
+
+def _fetch_json(url: str) -> Any:
+    # Keep-alive connection from the shared client; a 429/5xx gets a short, Retry-After aware retry.
+    # The slot is held per attempt only, so a backoff sleep does not block other pricing calls.
+    _BREAKER.acquire()
+    slot = _FetchSlot()
+    started = time.perf_counter()
+    try:
+        payload = http_client().get_json(url, timeout=_timeout(), retries=_max_retries(), max_retry_wait=_timeout(), slot=slot)
+    except Exception as e:
+        _BREAKER.record(not _upstream_fault(e), (time.perf_counter() - started - slot.waited) * 1000.0)
+        raise
+    _BREAKER.record(True, (time.perf_counter() - started - slot.waited) * 1000.0)
+    return payload
+
+
+_observers: List[Callable[[List[dict]], None]] = []
+
+
+def add_price_observer(fn: Callable[[List[dict]], None]) -> None:
+    """fn(rows) is called with every price response: [{item_id, city, quality, ts, sell_min, buy_max}]."""
+    if fn not in _observers:
+        _observers.append(fn)
+
+
+def remove_price_observer(fn: Callable[[List[dict]], None]) -> None:
+    if fn in _observers:
+        _observers.remove(fn)
+
+
+def _observations(payload: Any) -> List[dict]:
+    out: List[dict] = []
+    for row in payload if isinstance(payload, list) else []:
+        if not isinstance(row, dict):
+            continue
+        sell = int(row.get("sell_price_min") or 0)
+        buy = int(row.get("buy_price_max") or 0)
+        dates = [d for d in (_parse_iso_utc(row.get("sell_price_min_date")), _parse_iso_utc(row.get("buy_price_max_date"))) if d]
+        # Albion Data reports "never seen" as price 0 / year-1 dates.
+        dates = [d for d in dates if d.year >= 2000]
+        item_id = str(row.get("item_id") or "").strip()
+        city = str(row.get("city") or "").strip()
+        if not item_id or not city or not dates or (sell <= 0 and buy <= 0):
+            continue
+        out.append(
+            {
+                "item_id": item_id,
+                "city": city,
+                "quality": int(row.get("quality") or 1),
+                "ts": max(dates).strftime("%Y-%m-%d %H:%M:%S"),
+                "sell_min": sell or None,
+                "buy_max": buy or None,
+            }
+        )
+    return out
+
+
+def _fetch_prices(url: str) -> Any:
+    payload = _fetch_json(url)
+    if _observers:
+        rows = _observations(payload)
+        for fn in list(_observers):
+            try:
+                fn(rows)
+            except Exception:
+                logger.exception("Price observer failed")
+    return payload
+
+
+def trimmed_city_mean(values: Iterable[int]) -> Optional[dict]:
+    """Mean of per-city prices after dropping cities below 50% of the median city price."""
+    values = [int(v) for v in values if v and v > 0]
+    if not values:
+        return None
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    median = ordered[mid] if len(ordered) % 2 else int(round((ordered[mid - 1] + ordered[mid]) / 2.0))
+    floor = max(1, int(round(median * 0.5)))
+    filtered = [v for v in values if v >= floor] or values
+    return {
+        "city_count": len(values),
+        "median_price": median,
+        "trim_floor_50pct": floor,
+        "used_city_count": len(filtered),
+        "market_unit_price": int(round(sum(filtered) / float(len(filtered)))),
+    }
+
+
 def _cache_key(item_id: str, location: str, quality: int) -> str:
     return f"{item_id}|{location}|{quality}"
 
@@ -62,22 +259,24 @@ def get_item_price(item_id: str, location: str, quality: int = 1) -> Tuple[Optio
         return None, "item_id and location are required", False
 
     key = _cache_key(item_id, location, quality)
-    now = time.time()
-    ttl = _cache_ttl()
     hit = _CACHE.get(key)
-    if hit and (now - hit[0]) <= ttl:
-        return hit[1], None, False
+    if hit and hit.fresh:
+        return hit.value, None, False
+    if hit and hit.revalidate:
+        _CACHE.revalidate([key], lambda _keys: _FLIGHT.do(key, lambda: _load_item_price(item_id, location, quality, hit)))
+        return hit.value, None, True
+    return _FLIGHT.do(key, lambda: _load_item_price(item_id, location, quality, hit))
+
 
+def _load_item_price(item_id: str, location: str, quality: int, hit: Optional[CacheEntry]) -> Tuple[Optional[dict], Optional[str], bool]:
     endpoint = f"{_base_url()}/api/v2/stats/prices/{item_id}"
     query = urlencode({"locations": location, "qualities": quality})
-    req = Request(f"{endpoint}?{query}", headers={"Accept": "application/json", "User-Agent": "albion-analytics-bot/1.0"})
 
     try:
-        with urlopen(req, timeout=_timeout()) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        payload = _fetch_prices(f"{endpoint}?{query}")
         if not isinstance(payload, list) or not payload:
             if hit:
-                return hit[1], "No market data, returned stale cache", True
+                return hit.value, "No market data, returned stale cache", True
             return None, "No market data for item/location", False
         first = payload[0]
         out = {
@@ -91,22 +290,74 @@ def get_item_price(item_id: str, location: str, quality: int = 1) -> Tuple[Optio
             "source": "albion-online-data",
             "fetched_at_utc": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
         }
-        _CACHE[key] = (now, out)
+        _CACHE.put(_cache_key(item_id, location, quality), out)
         return out, None, False
+    except CircuitOpenError as e:
+        if hit:
+            return hit.value, "Pricing API unavailable, returned stale cache", True
+        return None, f"Pricing API unavailable: {e}", False
     except HTTPError as e:
         if hit:
-            return hit[1], f"HTTP {e.code}, returned stale cache", True
+            return hit.value, f"HTTP {e.code}, returned stale cache", True
         return None, f"HTTP {e.code}", False
     except URLError as e:
         if hit:
-            return hit[1], f"Network error, returned stale cache: {e.reason}", True
+            return hit.value, f"Network error, returned stale cache: {e.reason}", True
         return None, f"Network error: {e.reason}", False
     except Exception as e:
         if hit:
-            return hit[1], f"Unexpected error, returned stale cache: {e}", True
+            return hit.value, f"Unexpected error, returned stale cache: {e}", True
         return None, str(e), False
 
 
+def _trimmed_mean_from_rows(item_id: str, rows: Iterable[dict]) -> Tuple[Optional[dict], Optional[str]]:
+    """Robust 24h unit price across cities: cities below 50% of the median city price are dropped."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    by_city: Dict[str, int] = {}
+    for row in rows:
+        city = str(row.get("city") or "").strip()
+        if not city:
+            continue
+        dt_sell = _parse_iso_utc(row.get("sell_price_min_date"))
+        dt_buy = _parse_iso_utc(row.get("buy_price_max_date"))
+        price = int(row.get("sell_price_min") or row.get("buy_price_max") or 0)
+        if price <= 0:
+            continue
+        # Keep only records with recent sell/buy snapshot.
+        if ((dt_sell and dt_sell >= cutoff) or (dt_buy and dt_buy >= cutoff)) is False:
+            continue
+        # Keep max recent price per city (avoids stale tiny values within same city).
+        prev = by_city.get(city, 0)
+        if price > prev:
+            by_city[city] = price
+
+    stats = trimmed_city_mean(by_city.values())
+    if not stats:
+        return None, "No valid 24h city prices"
+    return {
+        "item_id": item_id,
+        "quality": 1,
+        "method": "24h_trimmed_mean_all_cities",
+        **stats,
+        "source": "albion-online-data",
+        "fetched_at_utc": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+    }, None
+
+
+def _trimmed_key(item_id: str) -> str:
+    return f"trimmed24h|{item_id}"
+
+
+def _fetch_error(e: Exception) -> str:
+    if isinstance(e, CircuitOpenError):
+        return f"Pricing API unavailable: {e}"
+    if isinstance(e, HTTPError):
+        return f"HTTP {e.code}"
+    if isinstance(e, URLError):
+        return f"Network error: {e.reason}"
+    return str(e)
+
+
 def get_item_price_24h_trimmed_mean(item_id: str) -> Tuple[Optional[dict], Optional[str], bool]:
     """
     Returns robust market price over 24h across all cities.
@@ -116,100 +367,200 @@ def get_item_price_24h_trimmed_mean(item_id: str) -> Tuple[Optional[dict], Optio
     if not item_id:
         return None, "item_id is required", False
 
-    key = f"trimmed24h|{item_id}"
-    now = time.time()
-    ttl = _cache_ttl()
+    key = _trimmed_key(item_id)
     hit = _CACHE.get(key)
-    if hit and (now - hit[0]) <= ttl:
-        return hit[1], None, False
+    if hit and hit.fresh:
+        return hit.value, None, False
+    if hit and hit.revalidate:
+        _CACHE.revalidate([key], lambda _keys: _FLIGHT.do(key, lambda: _load_item_price_24h_trimmed_mean(item_id, hit)))
+        return hit.value, None, True
+    return _FLIGHT.do(key, lambda: _load_item_price_24h_trimmed_mean(item_id, hit))
 
+
+def _load_item_price_24h_trimmed_mean(item_id: str, hit: Optional[CacheEntry]) -> Tuple[Optional[dict], Optional[str], bool]:
     endpoint = f"{_base_url()}/api/v2/stats/prices/{item_id}"
     # Read all cities, default quality 1.
     query = urlencode({"qualities": 1})
-    req = Request(f"{endpoint}?{query}", headers={"Accept": "application/json", "User-Agent": "albion-analytics-bot/1.0"})
 
     try:
-        with urlopen(req, timeout=_timeout()) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        payload = _fetch_prices(f"{endpoint}?{query}")
         if not isinstance(payload, list) or not payload:
             if hit:
-                return hit[1], "No market data, returned stale cache", True
+                return hit.value, "No market data, returned stale cache", True
             return None, "No market data for item", False
-
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-        by_city: Dict[str, int] = {}
-        for row in payload:
-            city = str(row.get("city") or "").strip()
-            if not city:
-                continue
-            dt_sell = _parse_iso_utc(row.get("sell_price_min_date"))
-            dt_buy = _parse_iso_utc(row.get("buy_price_max_date"))
-            price = int(row.get("sell_price_min") or row.get("buy_price_max") or 0)
-            if price <= 0:
-                continue
-            # Keep only records with recent sell/buy snapshot.
-            if ((dt_sell and dt_sell >= cutoff) or (dt_buy and dt_buy >= cutoff)) is False:
-                continue
-            # Keep max recent price per city (avoids stale tiny values within same city).
-            prev = by_city.get(city, 0)
-            if price > prev:
-                by_city[city] = price
-
-        values = [v for v in by_city.values() if v > 0]
-        if not values:
+        out, err = _trimmed_mean_from_rows(item_id, payload)
+        if not out:
             if hit:
-                return hit[1], "No 24h city prices, returned stale cache", True
-            return None, "No valid 24h city prices", False
-        ordered = sorted(values)
-        mid = len(ordered) // 2
-        median = ordered[mid] if len(ordered) % 2 else int(round((ordered[mid - 1] + ordered[mid]) / 2.0))
-        floor = max(1, int(round(median * 0.5)))
-        filtered = [v for v in values if v >= floor]
-        if not filtered:
-            filtered = values
-        unit_price = int(round(sum(filtered) / float(len(filtered))))
-
-        out = {
-            "item_id": item_id,
-            "quality": 1,
-            "method": "24h_trimmed_mean_all_cities",
-            "city_count": len(values),
-            "median_price": median,
-            "trim_floor_50pct": floor,
-            "used_city_count": len(filtered),
-            "market_unit_price": unit_price,
-            "source": "albion-online-data",
-            "fetched_at_utc": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
-        }
-        _CACHE[key] = (now, out)
+                return hit.value, "No 24h city prices, returned stale cache", True
+            return None, err, False
+        _CACHE.put(_trimmed_key(item_id), out)
         return out, None, False
+    except CircuitOpenError as e:
+        if hit:
+            return hit.value, "Pricing API unavailable, returned stale cache", True
+        return None, f"Pricing API unavailable: {e}", False
     except HTTPError as e:
         if hit:
-            return hit[1], f"HTTP {e.code}, returned stale cache", True
+            return hit.value, f"HTTP {e.code}, returned stale cache", True
         return None, f"HTTP {e.code}", False
     except URLError as e:
         if hit:
-            return hit[1], f"Network error, returned stale cache: {e.reason}", True
+            return hit.value, f"Network error, returned stale cache: {e.reason}", True
         return None, f"Network error: {e.reason}", False
     except Exception as e:
         if hit:
-            return hit[1], f"Unexpected error, returned stale cache: {e}", True
+            return hit.value, f"Unexpected error, returned stale cache: {e}", True
         return None, str(e), False
 
 
+def _id_batches(item_ids: List[str]) -> List[List[str]]:
+    size = _batch_size()
+    batches: List[List[str]] = []
+    cur: List[str] = []
+    chars = 0
+    for item_id in item_ids:
+        if cur and (len(cur) >= size or chars + len(item_id) + 1 > _MAX_IDS_PATH_CHARS):
+            batches.append(cur)
+            cur, chars = [], 0
+        cur.append(item_id)
+        chars += len(item_id) + 1
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _fetch_trimmed_batch(item_ids: List[str]) -> Tuple[Dict[str, List[dict]], Optional[str]]:
+    """One comma-separated request for several items; rows grouped per item id."""
+    url = f"{_base_url()}/api/v2/stats/prices/{','.join(quote(i, safe='') for i in item_ids)}?{urlencode({'qualities': 1})}"
+    try:
+        payload = _fetch_prices(url)
+    except Exception as e:
+        return {}, _fetch_error(e)
+    if not isinstance(payload, list):
+        return {}, "Invalid price response"
+    grouped: Dict[str, List[dict]] = {}
+    for row in payload:
+        if isinstance(row, dict):
+            grouped.setdefault(str(row.get("item_id") or "").strip(), []).append(row)
+    return grouped, None
+
+
+def get_items_price_24h_trimmed_mean(item_ids: Iterable[str]) -> Dict[str, dict]:
+    """
+    Batch form of get_item_price_24h_trimmed_mean for quoting many items at once.
+    Cache misses are fetched as comma-separated batches, in parallel under the global request cap.
+    Returns {item_id: {"data", "error", "stale"}} for every distinct non-empty id.
+    """
+    ids: List[str] = []
+    for raw in item_ids:
+        item_id = str(raw or "").strip()
+        if item_id and item_id not in ids:
+            ids.append(item_id)
+
+    results: Dict[str, dict] = {}
+    hits: Dict[str, Optional[CacheEntry]] = {}
+    misses: List[str] = []
+    revalidate: List[str] = []
+    for item_id in ids:
+        hit = _CACHE.get(_trimmed_key(item_id))
+        if hit and (hit.fresh or hit.revalidate):
+            results[item_id] = {"data": hit.value, "error": None, "stale": not hit.fresh}
+            if hit.revalidate:
+                revalidate.append(item_id)
+        else:
+            hits[item_id] = hit
+            misses.append(item_id)
+    if revalidate:
+        _CACHE.revalidate(
+            [_trimmed_key(i) for i in revalidate],
+            lambda keys: _load_trimmed_batches([k.split("|", 1)[1] for k in keys], {}),
+        )
+    if misses:
+        results.update(_load_trimmed_batches(misses, hits))
+    return results
+
+
+def _load_trimmed_batches(item_ids: List[str], hits: Dict[str, Optional[CacheEntry]]) -> Dict[str, dict]:
+    # Shares flights with the single-item path: ids already being loaded elsewhere are awaited, not re-requested.
+    # Flight results use the single-item (data, error, stale) form.
+    keyed = {_trimmed_key(i): i for i in item_ids}
+
+    def load(keys: List[str]) -> Dict[str, tuple]:
+        fetched = _fetch_trimmed_batches([keyed[k] for k in keys], hits)
+        return {_trimmed_key(i): (r["data"], r["error"], r["stale"]) for i, r in fetched.items()}
+
+    shared = _FLIGHT.do_many(list(keyed), load)
+    return {keyed[k]: {"data": r[0], "error": r[1], "stale": r[2]} for k, r in shared.items()}
+
+
+def _fetch_trimmed_batches(item_ids: List[str], hits: Dict[str, Optional[CacheEntry]]) -> Dict[str, dict]:
+    batches = _id_batches(item_ids)
+    with ThreadPoolExecutor(max_workers=min(len(batches), _MAX_CONCURRENCY), thread_name_prefix="price-quote") as pool:
+        fetched = list(pool.map(_fetch_trimmed_batch, batches))
+
+    results: Dict[str, dict] = {}
+    for batch, (grouped, batch_err) in zip(batches, fetched):
+        for item_id in batch:
+            hit = hits.get(item_id)
+            rows = grouped.get(item_id)
+            if batch_err or not rows:
+                out, err = None, batch_err or "No market data for item"
+            else:
+                out, err = _trimmed_mean_from_rows(item_id, rows)
+            if out:
+                _CACHE.put(_trimmed_key(item_id), out)
+                results[item_id] = {"data": out, "error": None, "stale": False}
+            elif hit:
+                results[item_id] = {"data": hit.value, "error": f"{err}, returned stale cache", "stale": True}
+            else:
+                results[item_id] = {"data": None, "error": err, "stale": False}
+    return results
+
+
+def prefetch_items_24h_trimmed_mean(item_ids: Iterable[str], *, max_requests: int) -> dict:
+    """
+    Warm the trimmed-mean cache for ``item_ids`` using at most ``max_requests`` batched requests.
+    Missing entries go first, then the oldest; entries younger than half the TTL are left alone.
+    Nothing is requested while the circuit breaker is open.
+    """
+    now = time.time()
+    ids = list(dict.fromkeys(str(i or "").strip() for i in item_ids if str(i or "").strip()))
+    ages: Dict[str, float] = {}
+    for item_id in ids:
+        stored = _CACHE.stored_at(_trimmed_key(item_id))
+        ages[item_id] = float("inf") if stored is None else now - stored
+    due = sorted((i for i in ids if ages[i] > _CACHE.ttl_seconds / 2.0), key=lambda i: -ages[i])
+    batches = [] if _BREAKER.state == OPEN else _id_batches(due)[: max(0, int(max_requests))]
+    chosen = [i for b in batches for i in b]
+    results = _load_trimmed_batches(chosen, {}) if chosen else {}
+    return {
+        "candidates": len(ids),
+        "due": len(due),
+        "requests": len(batches),
+        "refreshed": sum(1 for r in results.values() if r["data"]),
+        "failed": sum(1 for r in results.values() if not r["data"]),
+        "deferred": len(due) - len(chosen),
+    }
+
+
+def cache_stats() -> dict:
+    out = _CACHE.stats()
+    out["single_flight"] = _FLIGHT.stats()
+    return out
+
+
+def breaker_stats() -> dict:
+    return _BREAKER.stats()
+
+
 def search_item_ids(query: str, limit: int = 20) -> Tuple[list[str], Optional[str]]:
     q = str(query or "").strip()
     if len(q) < 2:
         return [], None
     lim = max(1, min(int(limit), 50))
     endpoint = f"{_base_url()}/api/v2/search"
-    req = Request(
-        f"{endpoint}?{urlencode({'q': q})}",
-        headers={"Accept": "application/json", "User-Agent": "albion-analytics-bot/1.0"},
-    )
     try:
-        with urlopen(req, timeout=_timeout()) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        payload = _fetch_json(f"{endpoint}?{urlencode({'q': q})}")
         if not isinstance(payload, list):
             return [], "Invalid search response"
         out: list[str] = []
@@ -0,0 +1,77 @@
+"""Materialized econ_account_balances: posting, approval review, verify and rebuild."""
+
+import sqlite3
+import unittest
+from unittest import mock
+
+from web_dashboard import economy_service as es
+
+
+class TestAccountBalances(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(self.conn, "sqlite")
+        rule = next(r for r in es.list_routing_rules(self.conn, "sqlite") if r["category"] == "content_income")
+        es.upsert_routing_rule(
+            self.conn,
+            "sqlite",
+            category="needs_ok",
+            debit_account=rule["debit_account"],
+            credit_account=rule["credit_account"],
+            require_approval=True,
+        )
+        self.cash_account = rule["debit_account"]
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _post(self, category, amount):
+        return es.create_routed_operation(self.conn, "sqlite", category=category, amount=amount, actor="t")
+
+    def _stored(self):
+        return {
+            r["account_code"]: (r["debit_total"], r["credit_total"])
+            for r in es.fetch_all(self.conn, "sqlite", "SELECT * FROM econ_account_balances", ())
+        }
+
+    def test_post_review_verify_rebuild(self):
+        self._post("content_income", 100)
+        self._post("content_income", 50)
+        approved = self._post("needs_ok", 30)
+        rejected = self._post("needs_ok", 7)
+        self.assertEqual(approved["status"], "pending")
+        self.assertEqual(self._stored()[self.cash_account][0], 150)
+
+        es.review_pending_entry(self.conn, "sqlite", entry_id=approved["entry_id"], action="approve", reviewed_by="o")
+        es.review_pending_entry(self.conn, "sqlite", entry_id=rejected["entry_id"], action="reject", reviewed_by="o")
+        self.assertEqual(self._stored()[self.cash_account][0], 180)
+        self.assertTrue(es.verify_account_balances(self.conn, "sqlite")["ok"])
+        with self.assertRaises(ValueError):
+            es.review_pending_entry(self.conn, "sqlite", entry_id=approved["entry_id"], action="approve", reviewed_by="o")
+
+        good = self._stored()
+        self.conn.execute("UPDATE econ_account_balances SET debit_total = debit_total + 1")
+        self.conn.commit()
+        self.assertFalse(es.verify_account_balances(self.conn, "sqlite")["ok"])
+        es.rebuild_account_balances(self.conn, "sqlite")
+        self.assertTrue(es.verify_account_balances(self.conn, "sqlite")["ok"])
+        self.assertEqual(self._stored(), good)
+
+    def test_stale_pending_read_does_not_apply_twice(self):
+        entry = self._post("needs_ok", 40)
+        es.review_pending_entry(self.conn, "sqlite", entry_id=entry["entry_id"], action="approve", reviewed_by="a")
+        before = self._stored()
+        # A concurrent reviewer that read the row while it was still pending.
+        stale = {"id": entry["entry_id"], "status": "pending", "category": "needs_ok", "amount": 40}
+        reads = iter([stale])
+        real_fetch_one = es.fetch_one
+        with mock.patch.object(es, "fetch_one", side_effect=lambda *a, **k: next(reads, None) or real_fetch_one(*a, **k)):
+            with self.assertRaises(ValueError):
+                es.review_pending_entry(self.conn, "sqlite", entry_id=entry["entry_id"], action="approve", reviewed_by="b")
+        self.assertEqual(self._stored(), before)
+        self.assertTrue(es.verify_account_balances(self.conn, "sqlite")["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
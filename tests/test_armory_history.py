@@ -0,0 +1,109 @@
+"""Armory batch import vs per-row movements, and as-of stock (weekly snapshot + replay) vs a full replay."""
+
+import random
+import sqlite3
+import unittest
+from datetime import datetime, timedelta
+
+from web_dashboard import economy_service as es
+
+ITEMS = [("Bag", "4"), ("Cape", "5"), ("Sword", "6"), ("Potion", "7")]
+
+
+def _movements(seed, n):
+    rng = random.Random(seed)
+    stock = {}
+    out = []
+    for i in range(n):
+        name, tier = rng.choice(ITEMS)
+        have = stock.get(name, 0)
+        action = rng.choice(["ADD", "ADD", "REMOVE", "SET"]) if have else "ADD"
+        qty = rng.randint(1, have) if action == "REMOVE" else rng.randint(0 if action == "SET" else 1, 20)
+        stock[name] = have + qty if action == "ADD" else have - qty if action == "REMOVE" else qty
+        out.append(
+            {
+                "action": action,
+                "item_name": name,
+                "category": "gear",
+                "tier": tier,
+                "enchant": "0",
+                "quality": "1",
+                "quantity": qty,
+                "officer": "o",
+                "occurred_at": f"2024-01-01 00:00:{i % 60:02d}",
+            }
+        )
+    return out
+
+
+class TestArmoryHistory(unittest.TestCase):
+    def _db(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(conn, "sqlite")
+        self.addCleanup(conn.close)
+        return conn
+
+    @staticmethod
+    def _state(conn):
+        stock = [tuple(r) for r in conn.execute("SELECT item_key, quantity FROM econ_armory_stock ORDER BY item_key")]
+        moves = [
+            tuple(r)
+            for r in conn.execute("SELECT action, item_key, quantity, occurred_at FROM econ_armory_movements ORDER BY id")
+        ]
+        return stock, moves
+
+    def test_batch_matches_per_row_results_and_errors(self):
+        movements = _movements(1, 120)
+        single, batch = self._db(), self._db()
+        expected = [es.record_armory_movement(single, "sqlite", **m)["quantity_after"] for m in movements]
+        got = [r["quantity_after"] for r in es.record_armory_movements_batch(batch, "sqlite", movements)]
+        self.assertEqual(got, expected)
+        self.assertEqual(self._state(batch), self._state(single))
+
+        bad = [dict(movements[0], action="ADD", quantity=1), dict(movements[0], action="REMOVE", quantity=10_000)]
+        with self.assertRaises(ValueError) as per_row:
+            for m in bad:
+                es.record_armory_movement(single, "sqlite", auto_commit=False, **m)
+        single.rollback()
+        before = self._state(batch)
+        with self.assertRaises(ValueError) as batched:
+            es.record_armory_movements_batch(batch, "sqlite", bad)
+        batch.rollback()
+        self.assertEqual(str(batched.exception), str(per_row.exception))
+        self.assertEqual(self._state(batch), before)
+
+    def test_stock_as_of_matches_full_replay(self):
+        conn = self._db()
+        movements = _movements(2, 150)
+        es.record_armory_movements_batch(conn, "sqlite", movements)
+        # Spread the movements over ~10 weeks (created_at is the server clock at insert).
+        start = datetime(2024, 1, 3, 9, 0, 0)
+        ids = [r[0] for r in conn.execute("SELECT id FROM econ_armory_movements ORDER BY id")]
+        for i, mid in enumerate(ids):
+            stamp = (start + timedelta(hours=11 * i)).strftime("%Y-%m-%d %H:%M:%S")
+            conn.execute("UPDATE econ_armory_movements SET created_at=? WHERE id=?", (stamp, mid))
+        conn.execute("DELETE FROM econ_armory_snapshots")  # closed at schema setup, before the backdating
+        conn.commit()
+        es.close_armory_snapshots(conn, "sqlite", through_day="2024-02-25")
+        self.assertGreater(conn.execute("SELECT COUNT(DISTINCT period_day) FROM econ_armory_snapshots").fetchone()[0], 3)
+
+        rows = conn.execute("SELECT created_at, action, item_key, quantity FROM econ_armory_movements ORDER BY created_at, id").fetchall()
+        for as_of in ("2024-01-02", "2024-01-10 12:00:00", "2024-01-21", "2024-02-05 03:00:00", "2024-02-26", "2024-03-30"):
+            cutoff = es._as_of_cutoff(as_of)
+            replay = {}
+            for created_at, action, key, qty in rows:
+                if created_at >= cutoff:
+                    break
+                replay[key] = replay.get(key, 0) + qty if action == "ADD" else replay.get(key, 0) - qty if action == "REMOVE" else qty
+            expected = {k: q for k, q in replay.items() if q}
+            with self.subTest(as_of=as_of):
+                out = es.armory_stock_as_of(conn, "sqlite", as_of)
+                self.assertEqual({r["item_key"]: r["quantity"] for r in out["items"]}, expected)
+                key = sorted(expected)[0] if expected else es._armory_item_key("Bag", "4", "0", "1")
+                one = es.armory_stock_as_of(conn, "sqlite", as_of, item_key=key)
+                self.assertEqual({r["item_key"]: r["quantity"] for r in one["items"]}, {k: q for k, q in expected.items() if k == key})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""Unit tests for services.cash_forecast (pure NumPy, no DB)."""
+
+import unittest
+from datetime import date
+
+import numpy as np
+
+from services.cash_forecast import FORECAST_HORIZONS, _ewma_levels, forecast_cash
+
+
+class TestCashForecast(unittest.TestCase):
+    def test_ewma_closed_form_matches_recursion(self):
+        y = np.random.RandomState(7).randn(180) * 5000
+        level, expected = y[0], []
+        for v in y:
+            level = 0.3 * v + 0.7 * level
+            expected.append(level)
+        np.testing.assert_allclose(_ewma_levels(y, 0.3), expected, rtol=1e-9, atol=1e-6)
+
+    def test_constant_flow_projects_exactly(self):
+        out = forecast_cash([100] * 60, first_day=date(2024, 1, 1), cash_now=1000)
+        for name, model in out["models"].items():
+            with self.subTest(model=name):
+                self.assertEqual([p["cash"] for p in model["projections"]], [1000 + 100 * h for h in FORECAST_HORIZONS])
+                self.assertEqual(model["backtest"]["mae_daily"], 0.0)
+                p = model["projections"][0]
+                self.assertEqual((p["low"], p["high"]), (p["cash"], p["cash"]))
+
+    def test_weekday_pattern_prefers_seasonal_model(self):
+        # 2024-01-01 is a Monday: income on weekends, spending on weekdays.
+        pattern = [-200, -200, -200, -200, -200, 900, 900]
+        out = forecast_cash(pattern * 12, first_day=date(2024, 1, 1), cash_now=0)
+        self.assertEqual(out["best_model"], "weekday_seasonal")
+        self.assertEqual(out["projections"][0]["cash"], sum(pattern))
+
+    def test_empty_history(self):
+        out = forecast_cash([], first_day=date(2024, 1, 1), cash_now=500)
+        self.assertEqual(out["history_days"], 0)
+        self.assertEqual([p["cash"] for p in out["projections"]], [500, 500, 500])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Circuit breaker: open on failures / SLO breaches, half-open probe, stale cache served while the pricing API is down."""
+
+import os
+import time
+import unittest
+from unittest import mock
+
+from services import pricing_client
+from test_pricing_batch import FakeAlbionData
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.cb = CircuitBreaker("api", failure_threshold=3, slo_ms=500, reset_timeout=30, clock=lambda: self.now[0])
+
+    def _run(self, ok=True, ms=10.0):
+        self.cb.acquire()
+        self.cb.record(ok, ms)
+
+    def test_opens_after_consecutive_failures_or_slow_calls(self):
+        self._run(False)
+        self._run(False)
+        self._run(True)  # a good call resets the streak
+        self._run(False)
+        self._run(True, ms=900)  # SLO breach
+        self.assertEqual(self.cb.state, "closed")
+        self._run(False)
+        self.assertEqual(self.cb.state, "open")
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.cb.acquire()
+        self.assertEqual(ctx.exception.retry_in, 30)
+        st = self.cb.stats()
+        self.assertEqual((st["calls"], st["failures"], st["slow_calls"], st["rejected"], st["opened"]), (6, 4, 1, 1, 1))
+        self.assertEqual(st["error_rate"], round(4 / 6, 4))
+        self.assertEqual(st["p95_latency_ms"], 900)
+
+    def test_half_open_allows_one_probe(self):
+        for _ in range(3):
+            self._run(False)
+        self.now[0] = 31.0
+        self.assertEqual(self.cb.state, "half_open")
+        self.cb.acquire()
+        with self.assertRaises(CircuitOpenError):
+            self.cb.acquire()  # only the probe goes through
+        self.cb.record(False, 10)
+        self.assertEqual(self.cb.stats()["state"], "open")
+        self.now[0] = 62.0
+        self._run(True)
+        self.assertEqual(self.cb.state, "closed")
+        self._run(True)
+
+    def test_call_classifies_errors(self):
+        with self.assertRaises(KeyError):
+            self.cb.call(lambda: {}["x"], is_failure=lambda e: not isinstance(e, KeyError))
+        self.assertEqual(self.cb.stats()["failures"], 0)
+        self.assertEqual(self.cb.call(lambda: 7), 7)
+
+
+class TestPricingBreaker(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlbionData()
+        self.addCleanup(self.fake.close)
+        env = mock.patch.dict(os.environ, {"ALBION_PRICING_BASE_URL": self.fake.url, "ALBION_PRICING_MAX_RETRIES": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+        self.now = [0.0]
+        breaker = CircuitBreaker("albion-online-data", failure_threshold=2, slo_ms=5000, reset_timeout=30, clock=lambda: self.now[0])
+        patch = mock.patch.object(pricing_client, "_BREAKER", breaker)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_open_circuit_serves_stale_cache_without_calling_upstream(self):
+        data, err, stale = pricing_client.get_item_price_24h_trimmed_mean("T4_BAG")
+        self.assertEqual((data["market_unit_price"], err, stale), (1100, None, False))
+        key = pricing_client._trimmed_key("T4_BAG")
+        pricing_client._CACHE.put(key, data, stored_at=time.time() - 100_000)
+
+        self.fake.status = 503
+        for item_id in ("T5_CAPE", "T6_CAPE"):
+            self.assertEqual(pricing_client.get_item_price_24h_trimmed_mean(item_id)[1], "HTTP 503")
+        self.assertEqual(pricing_client.breaker_stats()["state"], "open")
+        calls = len(self.fake.paths)
+
+        data, err, stale = pricing_client.get_item_price_24h_trimmed_mean("T4_BAG")
+        self.assertEqual((data["market_unit_price"], err, stale), (1100, "Pricing API unavailable, returned stale cache", True))
+        quote = pricing_client.get_items_price_24h_trimmed_mean(["T4_BAG", "T7_CAPE"])
+        self.assertTrue(quote["T4_BAG"]["stale"])
+        self.assertTrue(quote["T7_CAPE"]["error"].startswith("Pricing API unavailable"))
+        self.assertEqual(pricing_client.prefetch_items_24h_trimmed_mean(["T7_CAPE"], max_requests=5)["requests"], 0)
+        self.assertEqual(len(self.fake.paths), calls)
+
+        # Cooldown over: one probe reaches the recovered API and closes the circuit.
+        self.fake.status = 200
+        self.now[0] = 31.0
+        data, err, stale = pricing_client.get_item_price_24h_trimmed_mean("T4_BAG")
+        self.assertEqual((err, stale), (None, False))
+        st = pricing_client.breaker_stats()
+        self.assertEqual((st["state"], st["rejected"], st["opened"]), ("closed", 2, 1))
+        self.assertEqual(len(self.fake.paths), calls + 1)
+
+    def test_unknown_item_does_not_trip_the_breaker(self):
+        self.fake.status = 404
+        for item_id in ("T4_X", "T5_X", "T6_X"):
+            self.assertEqual(pricing_client.get_item_price_24h_trimmed_mean(item_id)[1], "HTTP 404")
+        self.assertEqual(pricing_client.breaker_stats()["state"], "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
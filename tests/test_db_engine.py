@@ -0,0 +1,165 @@
+"""Shared DB engine: placeholder translation, async handle sharing, instrumentation."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+import db_engine
+from database import Database
+from web_dashboard import economy_service as es
+
+
+class TestDbEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = "sqlite:///" + os.path.join(self.tmp.name, "bot.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_translate_postgres_duplicates_bindings(self):
+        sql, bind = db_engine.translate("SELECT $2, $1 WHERE a = $2", ("x", "y"), "postgres")
+        self.assertEqual(sql, "SELECT %s, %s WHERE a = %s")
+        self.assertEqual(bind, ("y", "x", "y"))
+        self.assertEqual(db_engine.translate("SELECT $1, $2", (1, 2), "sqlite"), ("SELECT ?, ?", (1, 2)))
+        with self.assertRaises(IndexError):
+            db_engine.translate("SELECT $3", (1,), "postgres")
+
+    def test_translation_cached_per_sql_text(self):
+        sql = "SELECT $2 AS b, $1 AS a, $2 AS b2 -- cache test"
+        before = db_engine._compile_placeholders.cache_info()
+        first = db_engine._compile_placeholders(sql, "sqlite")
+        self.assertEqual(first, ("SELECT ? AS b, ? AS a, ? AS b2 -- cache test", (1, 0, 1)))
+        for i in range(5):
+            self.assertEqual(db_engine.translate(sql, (i, -i), "sqlite")[1], (-i, i, -i))
+        self.assertIs(db_engine._compile_placeholders(sql, "sqlite"), first)
+        after = db_engine._compile_placeholders.cache_info()
+        self.assertEqual(after.misses - before.misses, 1)
+        self.assertEqual(after.hits - before.hits, 6)
+        # Repeated / out-of-order $N now binds correctly on SQLite too; plain ? SQL is untouched.
+        conn = db_engine.connect_sqlite(":memory:")
+        self.assertEqual(tuple(conn.execute(*db_engine.translate(sql, ("a", "b"), "sqlite")).fetchone()), ("b", "a", "b"))
+        self.assertEqual(db_engine.translate("SELECT ?", ["x"], "sqlite"), ("SELECT ?", ("x",)))
+        conn.close()
+
+    def test_async_handle_shared_and_refcounted(self):
+        async def scenario():
+            first = await db_engine.open_async(self.url)
+            second = await db_engine.open_async(self.url)
+            self.assertIs(first, second)
+            await db_engine.close_async(first)
+            async with second.execute("SELECT 1") as cur:
+                self.assertEqual((await cur.fetchone())[0], 1)
+            await db_engine.close_async(second)
+            self.assertEqual(db_engine.engine_stats()["async_handles"], [])
+
+        asyncio.run(scenario())
+        # WAL pragma cursor was closed: a sync writer can still take the lock.
+        conn = db_engine.connect_sqlite(db_engine.sqlite_path(self.url))
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.commit()
+        conn.close()
+
+    def test_bot_queries_are_instrumented(self):
+        async def scenario():
+            db = Database(self.url)
+            db.conn = await db_engine.open_async(self.url)
+            await db.execute("CREATE TABLE kv (k TEXT, v TEXT)")
+            await db.execute("INSERT INTO kv (k, v) VALUES ($1, $2)", "a", "b")
+            row = await db.fetchrow("SELECT v FROM kv WHERE k = $1", "a")
+            await db.close()
+            return row
+
+        before = db_engine.engine_stats()["queries"].get("bot", {}).get("queries", 0)
+        self.assertEqual(asyncio.run(scenario()), {"v": "b"})
+        self.assertEqual(db_engine.engine_stats()["queries"]["bot"]["queries"], before + 3)
+
+
+class FakePgServer:
+    """Session advisory locks and aborted-transaction state, as psycopg2 connections see them."""
+
+    def __init__(self):
+        self.locks = {}
+        self.fail_ddl = False
+
+    def connect(self):
+        return FakePgConnection(self)
+
+
+class FakePgError(Exception):
+    pass
+
+
+class FakePgConnection:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+        self.aborted = False
+        self.cursor_factory = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        if self.aborted:
+            raise FakePgError("current transaction is aborted, commands ignored until end of transaction block")
+        if "pg_advisory_lock" in sql:
+            owner = self.server.locks.setdefault(params[0], self)
+            if owner is not self:
+                raise FakePgError("lock held by another session (would block forever)")
+        elif "pg_advisory_unlock" in sql:
+            if self.server.locks.get(params[0]) is self:
+                del self.server.locks[params[0]]
+        elif self.server.fail_ddl:
+            self.aborted = True
+            raise FakePgError("permission denied for schema public")
+
+    def get_transaction_status(self):
+        return db_engine._PG_TX_INERROR if self.aborted else 0
+
+    def rollback(self):
+        self.aborted = False
+
+    def commit(self):
+        self.aborted = False
+
+    def close(self):
+        self.closed = True
+        for key, owner in list(self.server.locks.items()):
+            if owner is self:
+                del self.server.locks[key]
+
+
+class TestPgSchemaLock(unittest.TestCase):
+    def setUp(self):
+        self.server = FakePgServer()
+        self.pool = db_engine._SyncPool("postgresql://u@localhost/econ", 2)
+
+    def test_failed_schema_step_releases_lock(self):
+        conn = self.server.connect()
+        self.server.fail_ddl = True
+        with self.assertRaisesRegex(FakePgError, "permission denied"):
+            es.ensure_economy_schema(conn, "postgres")
+        self.assertEqual(self.server.locks, {})
+        self.pool._slots.acquire()
+        self.pool.checkin(conn)
+        self.assertEqual(self.pool.stats()["idle"], 1)
+        # Another session can take the lock right away.
+        other = self.server.connect()
+        es._pg_lock_econ_schema(other, "postgres")
+        self.assertIs(self.server.locks[es._ECON_SCHEMA_LOCK_ID], other)
+
+    def test_checkin_drops_connection_left_in_failed_transaction(self):
+        conn = self.server.connect()
+        es._pg_lock_econ_schema(conn, "postgres")
+        conn.aborted = True  # caller failed and never reached its unlock
+        self.pool._slots.acquire()
+        self.pool.checkin(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual((self.pool.stats()["idle"], self.pool.stats()["discarded"]), (0, 1))
+        es._pg_lock_econ_schema(self.server.connect(), "postgres")
+
+
+if __name__ == "__main__":
+    unittest.main()
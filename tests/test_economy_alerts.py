@@ -0,0 +1,46 @@
+"""Alert evaluation: re-run on generation change only, audit only on open/resolve transitions."""
+
+import sqlite3
+import unittest
+
+from web_dashboard import economy_service as es
+
+
+class TestAlertEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(self.conn, "sqlite")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _alert_audits(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM econ_audit_log WHERE mutation_type='run_alert_threshold_checks'"
+        ).fetchone()[0]
+
+    def _income(self, amount):
+        es.create_routed_operation(self.conn, "sqlite", category="content_income", amount=amount, actor="t")
+
+    def test_audit_row_only_on_state_transition(self):
+        first = es.evaluate_alerts_if_changed(self.conn, "sqlite")
+        self.assertEqual(first["state"]["transitions"], {"low_cash": "opened"})
+        self.assertEqual(self._alert_audits(), 1)
+
+        self.assertFalse(es.evaluate_alerts_if_changed(self.conn, "sqlite")["evaluated"])
+        forced = es.evaluate_alerts_if_changed(self.conn, "sqlite", force=True)
+        self.assertEqual(forced["state"]["transitions"], {})
+        self.assertEqual(self._alert_audits(), 1)
+
+        self._income(100)  # ledger generation bumps, cash still below threshold
+        self.assertEqual(es.evaluate_alerts_if_changed(self.conn, "sqlite")["state"]["transitions"], {})
+        self.assertEqual(self._alert_audits(), 1)
+
+        self._income(5_000_000)
+        self.assertEqual(es.evaluate_alerts_if_changed(self.conn, "sqlite")["state"]["transitions"], {"low_cash": "resolved"})
+        self.assertEqual(self._alert_audits(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
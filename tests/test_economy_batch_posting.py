@@ -0,0 +1,55 @@
+"""create_routed_operations_batch: same ledger as per-item posting, all-or-nothing."""
+
+import sqlite3
+import unittest
+
+from web_dashboard import economy_service as es
+
+OPS = [
+    {"category": "content_income", "amount": 500, "description": "CTA loot"},
+    {"category": "reward_payout", "amount": 200, "description": "CTA payout"},
+    {"category": "content_income", "amount": 75},
+]
+
+LEDGER_QUERIES = (
+    "SELECT id, category, amount, description, status, debit_sum, credit_sum FROM econ_journal_entries ORDER BY id",
+    "SELECT entry_id, account_code, side, amount FROM econ_journal_lines ORDER BY id",
+    "SELECT account_code, debit_total, credit_total, last_entry_id FROM econ_account_balances ORDER BY account_code",
+    "SELECT mutation_type, entity_id, actor FROM econ_audit_log ORDER BY id",
+)
+
+
+def _conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    es.ensure_economy_schema(conn, "sqlite")
+    return conn
+
+
+def _dump(conn):
+    return [[tuple(r) for r in conn.execute(sql)] for sql in LEDGER_QUERIES]
+
+
+class TestRoutedBatch(unittest.TestCase):
+    def test_matches_sequential_posting(self):
+        seq, batch = _conn(), _conn()
+        for op in OPS:
+            es.create_routed_operation(seq, "sqlite", actor="officer", source="manual", **op)
+        out = es.create_routed_operations_batch(batch, "sqlite", OPS, actor="officer", source="manual")
+        self.assertTrue(out["ok"])
+        self.assertEqual([it["entry_id"] for it in out["items"]], [1, 2, 3])
+        self.assertEqual([it["status"] for it in out["items"]], ["posted", "pending", "posted"])
+        self.assertEqual(_dump(batch), _dump(seq))
+
+    def test_invalid_item_writes_nothing(self):
+        conn = _conn()
+        before = _dump(conn)
+        out = es.create_routed_operations_batch(conn, "sqlite", OPS + [{"category": "nope", "amount": 5}])
+        self.assertFalse(out["ok"])
+        self.assertEqual([it["ok"] for it in out["items"]], [True, True, True, False])
+        self.assertIn("Unknown category", out["items"][3]["error"])
+        self.assertEqual(_dump(conn), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
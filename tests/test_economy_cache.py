@@ -0,0 +1,47 @@
+"""Generation-keyed dashboard section cache: recompute only after the section's domain is written."""
+
+import sqlite3
+import unittest
+
+from web_dashboard import economy_service as es
+from web_dashboard.economy_cache import GenerationCache
+
+
+class TestGenerationCache(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(self.conn, "sqlite")
+        self.cache = GenerationCache()
+        self.computed = []
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _kpis(self):
+        def compute():
+            self.computed.append("kpis")
+            return es.economy_kpis(self.conn, "sqlite")
+
+        gens = es.get_generations(self.conn, "sqlite")
+        return self.cache.get_or_compute("kpis", compute, generations=gens, domains=("ledger", "discrepancies", "alerts"))
+
+    def test_section_recomputed_only_after_its_domain_bumps(self):
+        self.assertEqual(self._kpis()["entries_count"], 0)
+        self._kpis()
+        self.assertEqual(self.computed, ["kpis"])
+
+        es.record_armory_movement(
+            self.conn, "sqlite", action="ADD", item_name="Bag", category="bag", tier="4", enchant="0", quality="1", quantity=2
+        )
+        self._kpis()  # armory generation only: cached
+        self.assertEqual(self.computed, ["kpis"])
+
+        es.create_routed_operation(self.conn, "sqlite", category="content_income", amount=10, actor="t")
+        self.assertEqual(self._kpis()["entries_count"], 1)
+        self.assertEqual(self.computed, ["kpis", "kpis"])
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
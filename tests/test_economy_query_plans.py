@@ -0,0 +1,299 @@
+"""
+EXPLAIN QUERY PLAN regression suite for web_dashboard.economy_service (SQLite backend).
+
+Seeds a synthetic ledger, runs the service functions with a statement trace and
+checks every SELECT/UPDATE/DELETE they issued: a plain ``SCAN <table>`` (no index)
+fails unless the table is a small lookup table or the statement is a bounded
+newest-first listing. No ANALYZE is run, matching the dashboard databases.
+"""
+
+import re
+import sqlite3
+import unittest
+
+from web_dashboard import economy_service as es
+
+BACKEND = "sqlite"
+ENTRY_COUNT = 20000
+LOG_ROW_COUNT = 20000
+
+# Fixed-size or near-fixed-size tables where a scan is the cheapest plan.
+SMALL_TABLES = {
+    "econ_accounts",
+    "econ_account_balances",
+    "econ_alert_state",
+    "econ_config",
+    "econ_generations",
+    "econ_guild_bonus_tasks",
+    "econ_routing_rules",
+    "sqlite_master",
+    # Known-name roster for discrepancy matching: read once per import, grouped per player.
+    "econ_guild_bonus_awards",
+}
+
+_TRACED_VERBS = ("SELECT", "UPDATE", "DELETE", "WITH")
+_FROM_RE = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIAS = {"where", "join", "left", "inner", "on", "order", "group", "limit", "set", "having"}
+_NEWEST_FIRST_RE = re.compile(r"ORDER BY (?:\w+\.)?id DESC\s+LIMIT \d+\s*$", re.IGNORECASE)
+_BARE_COUNT_RE = re.compile(r"^SELECT COUNT\(\*\) AS c FROM \w+$", re.IGNORECASE)
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+def _table_aliases(sql):
+    aliases = {}
+    for table, alias in _FROM_RE.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in _NOT_ALIAS:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql):
+    """Plan lines that read a whole table without an index (after the allowances above)."""
+    sql = _normalize(sql)
+    if _BARE_COUNT_RE.match(sql):
+        return []
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    # Rowid walk from the newest row that stops after LIMIT rows.
+    bounded = " WHERE " not in sql.upper() and _NEWEST_FIRST_RE.search(sql) and not any("TEMP B-TREE" in p for p in plan)
+    aliases = _table_aliases(sql)
+    bad = []
+    for detail in plan:
+        m = re.match(r"SCAN (\w+)(.*)$", detail)
+        if not m or "INDEX" in m.group(2):
+            continue
+        table = aliases.get(m.group(1))
+        if table is None or table in SMALL_TABLES or bounded:
+            continue
+        bad.append(detail)
+    return bad
+
+
+def seed_ledger(conn):
+    cur = conn.cursor()
+    categories = ("content_income", "reward_payout", "buy_gear", "loot_buyback")
+    cur.executemany(
+        """
+        INSERT INTO econ_journal_entries (id, created_at, category, amount, description, actor, source, status)
+        VALUES (?, datetime('now', ?), ?, ?, ?, 'seed', ?, ?)
+        """,
+        [
+            (
+                i,
+                f"-{(ENTRY_COUNT - i) * 7} minutes",
+                categories[i % len(categories)],
+                100 + i % 900,
+                f"seed entry {i}",
+                "csv" if i % 3 else "manual",
+                "pending" if i % 211 == 0 else "posted",
+            )
+            for i in range(1, ENTRY_COUNT + 1)
+        ],
+    )
+    cur.executemany(
+        "INSERT INTO econ_journal_lines (entry_id, account_code, side, amount) VALUES (?, ?, ?, ?)",
+        [
+            (i, code, side, 100 + i % 900)
+            for i in range(1, ENTRY_COUNT + 1)
+            for code, side in (("1000", "debit"), ("4000", "credit"))
+        ],
+    )
+    cur.execute("INSERT INTO econ_game_log_imports (id, log_type, rows_count, summary_json) VALUES (1, 'silver', 0, '{}')")
+    cur.executemany(
+        """
+        INSERT INTO econ_game_log_rows (import_id, log_type, row_hash, occurred_at, player_name, operation, amount)
+        VALUES (1, ?, ?, ?, ?, 'Deposit', ?)
+        """,
+        [
+            (
+                "silver" if i % 4 else "energy",
+                f"seed-{i}",
+                f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00",
+                f"Player{i % 700}",
+                (i % 50) - 20,
+            )
+            for i in range(LOG_ROW_COUNT)
+        ],
+    )
+    cur.executemany(
+        "INSERT INTO econ_import_player_totals (import_id, log_type, player_name, net_amount) VALUES (1, 'silver', ?, ?)",
+        [(f"Player{i}", i - 350) for i in range(700)],
+    )
+    cur.executemany(
+        "INSERT INTO econ_import_discrepancies (import_id, raw_name, status) VALUES (1, ?, ?)",
+        [(f"Player{i}", "open" if i % 40 == 0 else "resolved") for i in range(5000)],
+    )
+    cur.executemany(
+        "INSERT INTO econ_alerts (alert_type, severity, message, status) VALUES (?, 'medium', 'seed alert', ?)",
+        [(f"seed_{i % 7}", "open" if i % 90 == 0 else "resolved") for i in range(5000)],
+    )
+    cur.executemany(
+        "INSERT INTO econ_audit_log (mutation_type, entity_type, entity_id, actor, payload_json) VALUES ('seed', 'seed', ?, 'seed', '{}')",
+        [(str(i),) for i in range(ENTRY_COUNT)],
+    )
+    conn.commit()
+    es.rebuild_account_balances(conn, BACKEND, actor="test_seed")
+    es.backfill_game_log_timestamps(conn, BACKEND)
+    es.rebuild_player_daily_totals(conn, BACKEND)
+    es.close_ledger_periods(conn, BACKEND)
+
+
+class TestEconomyQueryPlans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = sqlite3.connect(":memory:")
+        cls.conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(cls.conn, BACKEND)
+        seed_ledger(cls.conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def traced(self, fn):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            fn()
+        finally:
+            self.conn.set_trace_callback(None)
+        out = []
+        for sql in statements:
+            text = sql.strip()
+            verb = text.split(None, 1)[0].upper() if text else ""
+            if verb in _TRACED_VERBS and text not in out:
+                out.append(text)
+        return out
+
+    def assert_no_full_scans(self, label, fn):
+        statements = self.traced(fn)
+        self.assertTrue(statements, f"{label}: no statements traced")
+        for sql in statements:
+            with self.subTest(call=label, sql=_normalize(sql)[:160]):
+                self.assertEqual(full_scans(self.conn, sql), [])
+
+    def test_indexes_created(self):
+        names = {r["name"] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        for name, _target in es._ECON_INDEXES:
+            self.assertIn(name, names)
+
+    def test_detector_flags_unindexed_filter(self):
+        self.assertTrue(full_scans(self.conn, "SELECT id FROM econ_audit_log WHERE actor='nobody'"))
+        self.assertEqual(full_scans(self.conn, "SELECT id FROM econ_audit_log ORDER BY id DESC LIMIT 50"), [])
+
+    def test_keyset_pages_walk_history(self):
+        c, b = self.conn, BACKEND
+        first = es.list_recent_entries(c, b, 200)
+        older = es.list_recent_entries(c, b, 200, before_id=first[-1]["id"])
+        self.assertEqual(older[0]["id"], first[-1]["id"] - 1)
+        newer = es.list_recent_entries(c, b, 200, after_id=older[0]["id"])
+        self.assertEqual([r["id"] for r in newer], [r["id"] for r in first])
+        # Search terms are prefixes: "1234" also matches 12340..12349.
+        hits = es.list_recent_entries(c, b, 50, search="seed entry 1234")
+        self.assertEqual([r["id"] for r in hits], [12349 - i for i in range(10)] + [1234])
+
+    def test_player_rollup_matches_log_rows(self):
+        c, b = self.conn, BACKEND
+        self.assertTrue(es.list_current_player_totals(c, b, log_type="silver", date_from="2024-03-01", date_to="2024-03-31"))
+        # Whole-day bounds read econ_player_daily_totals; a time bound falls back to the rows.
+        for kwargs in ({}, {"sign": "neg"}, {"min_amount": 40}):
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    es.list_current_player_totals(c, b, log_type="silver", date_from="2024-03-01", date_to="2024-03-31", **kwargs),
+                    es.list_current_player_totals(
+                        c, b, log_type="silver", date_from="2024-03-01 00:00:00", date_to="2024-03-31 23:59:59", **kwargs
+                    ),
+                )
+
+    def test_read_paths(self):
+        c, b = self.conn, BACKEND
+        reads = {
+            "list_recent_entries": lambda: es.list_recent_entries(c, b, 160),
+            "list_recent_entries(pending)": lambda: es.list_recent_entries(c, b, 160, status="pending"),
+            "list_recent_entries(before_id)": lambda: es.list_recent_entries(c, b, 160, before_id=5000),
+            "list_recent_entries(after_id)": lambda: es.list_recent_entries(c, b, 160, after_id=5000),
+            "list_recent_entries(search)": lambda: es.list_recent_entries(c, b, 160, search="entry 42", before_id=15000),
+            "economy_kpis": lambda: es.economy_kpis(c, b),
+            "list_pending_approvals": lambda: es.list_pending_approvals(c, b),
+            "list_audit_trail": lambda: es.list_audit_trail(c, b),
+            "list_audit_trail(before_id)": lambda: es.list_audit_trail(c, b, before_id=100),
+            "list_discrepancy_queue": lambda: es.list_discrepancy_queue(c, b),
+            "list_discrepancy_queue(open)": lambda: es.list_discrepancy_queue(c, b, status="open", before_id=4000),
+            "list_alerts": lambda: es.list_alerts(c, b),
+            "get_alert_state": lambda: es.get_alert_state(c, b),
+            "get_generations": lambda: es.get_generations(c, b),
+            "balance_snapshot": lambda: es.balance_snapshot(c, b),
+            "balance_snapshot(as_of)": lambda: es.balance_snapshot(c, b, as_of="2024-06-01"),
+            "pnl_summary": lambda: es.pnl_summary(c, b, 30),
+            "cashflow_summary(as_of)": lambda: es.cashflow_summary(c, b, 7, as_of="2024-06-01"),
+            "forecast_summary": lambda: es.forecast_summary(c, b),
+            "list_current_player_totals(range)": lambda: es.list_current_player_totals(
+                c, b, log_type="silver", date_from="2024-03-01", date_to="2024-03-31 23:59:59"
+            ),
+            "list_current_player_totals(to)": lambda: es.list_current_player_totals(
+                c, b, log_type="energy", date_to="2024-02-01", sign="neg"
+            ),
+            "list_current_player_totals(days)": lambda: es.list_current_player_totals(
+                c, b, log_type="silver", date_from="2024-03-01", date_to="2024-03-31"
+            ),
+            "list_current_player_totals(all)": lambda: es.list_current_player_totals(c, b, log_type="silver"),
+            "list_import_player_totals(latest)": lambda: es.list_import_player_totals(c, b, log_type="silver", import_id=None),
+            "list_import_player_totals(id)": lambda: es.list_import_player_totals(c, b, log_type="silver", import_id=1),
+            "list_game_log_imports": lambda: es.list_game_log_imports(c, b),
+            "list_armory_stock": lambda: es.list_armory_stock(c, b),
+            "list_armory_movements": lambda: es.list_armory_movements(c, b),
+            "list_armory_movements(after_id)": lambda: es.list_armory_movements(c, b, after_id=1),
+            "armory_stock_as_of": lambda: es.armory_stock_as_of(c, b, "2024-06-01"),
+            "armory_stock_as_of(item)": lambda: es.armory_stock_as_of(c, b, "2024-06-01", item_key="Broadsword|T6|1|Normal"),
+            "armory_item_velocity": lambda: es.armory_item_velocity(c, b, weeks=12),
+            "list_loot_buyback_requests": lambda: es.list_loot_buyback_requests(c, b),
+            "list_regear_requests": lambda: es.list_regear_requests(c, b),
+            "list_bonus_awards": lambda: es.list_bonus_awards(c, b),
+            "list_tasks": lambda: es.list_tasks(c, b),
+            "list_routing_rules": lambda: es.list_routing_rules(c, b),
+            "get_config": lambda: es.get_config(c, b),
+        }
+        for label, fn in reads.items():
+            self.assert_no_full_scans(label, fn)
+
+    def test_write_paths(self):
+        c, b = self.conn, BACKEND
+        pending_id = 211 * 3
+        writes = {
+            "create_routed_operation": lambda: es.create_routed_operation(
+                c, b, category="content_income", amount=500, description="plan test", actor="test"
+            ),
+            "create_routed_operations_batch": lambda: es.create_routed_operations_batch(
+                c,
+                b,
+                [{"category": "content_income", "amount": 300}, {"category": "reward_payout", "amount": 120}],
+                actor="test",
+            ),
+            "review_pending_entry": lambda: es.review_pending_entry(
+                c, b, entry_id=pending_id, action="approve", reviewed_by="test"
+            ),
+            "run_alert_threshold_checks": lambda: es.run_alert_threshold_checks(c, b),
+            "evaluate_alerts_if_changed": lambda: es.evaluate_alerts_if_changed(c, b, force=True),
+            "acknowledge_alert": lambda: es.acknowledge_alert(c, b, 90, "test"),
+            "resolve_discrepancy": lambda: es.resolve_discrepancy(c, b, 40, "test"),
+            "import_game_log_csv": lambda: es.import_game_log_csv(
+                c,
+                b,
+                log_type="silver",
+                content="Date,Player,Reason,Amount\n2024-05-02 10:00:00,Player7,Deposit,1200\n2024-05-02 11:00:00,Playr8,Withdrawal,-300\n",
+            ),
+            "record_armory_movement": lambda: es.record_armory_movement(
+                c, b, action="ADD", item_name="Broadsword", category="Sword", tier="T6", enchant="1", quality="Normal", quantity=4
+            ),
+            "apply_treasury_snapshot": lambda: es.apply_treasury_snapshot(c, b, cash=5_000_000, energy=2_000, actor="test"),
+            "close_ledger_periods": lambda: es.close_ledger_periods(c, b),
+        }
+        for label, fn in writes.items():
+            self.assert_no_full_scans(label, fn)
+
+
+if __name__ == "__main__":
+    unittest.main()
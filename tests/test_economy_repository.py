@@ -0,0 +1,50 @@
+"""Async economy repository used by the Discord cog (SQLite backend)."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from web_dashboard import economy_db_sync
+from web_dashboard import economy_service as es
+from web_dashboard.economy_repository import AsyncEconomyRepository
+
+
+class TestAsyncEconomyRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        url = "sqlite:///" + os.path.join(self.tmp.name, "economy.db")
+        self.env = mock.patch.dict(os.environ, {"ECON_DATABASE_URL": url})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_reads_match_sync_service_after_writes(self):
+        async def scenario():
+            repo = AsyncEconomyRepository()
+            try:
+                outs = await asyncio.gather(
+                    *(repo.create_routed_operation(category="content_income", amount=100 + i, actor="bot") for i in range(5))
+                )
+                return outs, await repo.kpis(), await repo.routing_rules()
+            finally:
+                await repo.close()
+
+        outs, kpis, rules = asyncio.run(scenario())
+        self.assertEqual(len({o["entry_id"] for o in outs}), 5)
+        with economy_db_sync.get_economy_sync_connection() as (conn, backend):
+            expected = es.economy_kpis(conn, backend)
+            snapshot = es.balance_snapshot(conn, backend)
+            self.assertEqual(rules, es.list_routing_rules(conn, backend))
+        for key in es.KPI_COUNT_SQL:
+            self.assertEqual(kpis[key], expected[key], key)
+        self.assertEqual(kpis["entries_count"], 5)
+        self.assertEqual(kpis["cash_balance"], snapshot["cash_balance"])
+        self.assertEqual(kpis["cash_balance"], sum(100 + i for i in range(5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Economy dashboard API routes (Flask test client, temporary SQLite economy DB)."""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from web_dashboard import economy_db_sync
+from web_dashboard import economy_service as es
+from web_dashboard.economy_cache import economy_data_cache
+from web_dashboard.routes import register_dashboard
+
+
+class TestEconomyRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        url = "sqlite:///" + os.path.join(self.tmp.name, "economy.db")
+        self.env = mock.patch.dict(os.environ, {"ECON_DATABASE_URL": url, "DASHBOARD_SECRET": "s"})
+        self.env.start()
+        app = Flask(__name__)
+        register_dashboard(app)
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess["dash_ok"] = True
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def _get(self, path):
+        resp = self.client.get(path)
+        self.assertEqual(resp.status_code, 200, resp.data)
+        return json.loads(resp.data)
+
+    def test_reads_run_schema_setup_once_through_writer(self):
+        with mock.patch.object(es, "ensure_economy_schema", wraps=es.ensure_economy_schema) as ensure:
+            self._get("/dashboard/api/economy/reports")
+            self._get("/dashboard/api/economy/reports")
+            self._get("/dashboard/api/economy/entries")
+            self._get("/dashboard/api/economy/armory-velocity")
+        self.assertEqual(ensure.call_count, 1)
+        self.assertGreaterEqual(economy_db_sync.economy_writer_stats()["jobs"], 1)
+
+    def test_cached_snapshots_report_read_time(self):
+        economy_data_cache().clear()
+        first = self._get("/dashboard/api/economy/data")["reports"]
+        later = time.gmtime(time.time() + 3600)
+        with mock.patch("web_dashboard.routes.time.gmtime", return_value=later):
+            second = self._get("/dashboard/api/economy/data")["reports"]
+        self.assertGreater(economy_data_cache().stats()["hits"], 0)
+        for name in ("balance_snapshot", "csv_treasury_snapshot"):
+            self.assertEqual(second[name]["as_of_utc"], time.strftime("%Y-%m-%d %H:%M:%S", later))
+            self.assertNotEqual(first[name]["as_of_utc"], second[name]["as_of_utc"])
+
+    def test_loot_quote_rejects_malformed_list(self):
+        resp = self.client.post("/dashboard/api/economy/loot-quote", json={"text": "T4_BAG 2\n3 T4_CAPE 4"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("Line 2", json.loads(resp.data)["error"])
+        self.assertEqual(self.client.post("/dashboard/api/economy/loot-quote", json={"items": []}).status_code, 400)
+
+    def test_entries_page_cursor_uses_clamped_limit(self):
+        economy_db_sync.ensure_economy_ready()
+        ops = [{"category": "content_income", "amount": 10 + i} for i in range(es.ROUTED_BATCH_MAX_ITEMS)]
+        for batch in (ops, ops[:1]):
+            economy_db_sync.run_economy_write(
+                lambda conn, backend, batch=batch: es.create_routed_operations_batch(conn, backend, batch)
+            )
+        first = self._get("/dashboard/api/economy/entries?limit=1000")
+        self.assertEqual(first["limit"], 500)
+        self.assertEqual(len(first["rows"]), 500)
+        self.assertIsNotNone(first["next_before_id"])
+        rest = self._get(f"/dashboard/api/economy/entries?limit=1000&before_id={first['next_before_id']}")
+        self.assertEqual(len(rest["rows"]), 1)
+        self.assertIsNone(rest["next_before_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Single-writer queue / group commit for the SQLite economy DB."""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from web_dashboard import economy_db_sync
+from web_dashboard import economy_service as es
+from web_dashboard.economy_writer import EconomyWriter
+
+
+class TestEconomyWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "economy.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _connect(self):
+        return economy_db_sync._connect_sqlite(self.path)
+
+    def test_failed_job_rolls_back_alone_in_group(self):
+        writer = EconomyWriter(self._connect)
+        writer.run(lambda conn, backend: conn.execute("CREATE TABLE t (v INTEGER)"))
+        started, gate = threading.Event(), threading.Event()
+
+        def insert(v, fail=False):
+            def job(conn, backend):
+                conn.execute("INSERT INTO t (v) VALUES (?)", (v,))
+                conn.commit()  # deferred to the group commit
+                if fail:
+                    raise ValueError("bad row")
+                return v
+
+            return job
+
+        blocker = writer.submit(lambda conn, backend: started.set() or gate.wait(5))
+        started.wait(5)
+        futures = [writer.submit(insert(1)), writer.submit(insert(2, fail=True)), writer.submit(insert(3))]
+        gate.set()
+        blocker.result(5)
+        self.assertEqual(futures[0].result(5), 1)
+        with self.assertRaises(ValueError):
+            futures[1].result(5)
+        self.assertEqual(futures[2].result(5), 3)
+        conn = self._connect()
+        self.assertEqual([r[0] for r in conn.execute("SELECT v FROM t ORDER BY v")], [1, 3])
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        conn.close()
+        stats = writer.stats()
+        self.assertEqual(stats["max_group_size"], 3)
+        self.assertEqual(stats["job_errors"], 1)
+        self.assertIsNotNone(stats["lock_wait_ms"]["p95"])
+
+    def test_connect_failure_fails_jobs_and_restarts(self):
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return self._connect()
+
+        writer = EconomyWriter(connect)
+        with self.assertRaises(sqlite3.OperationalError):
+            writer.submit(lambda conn, backend: 1).result(5)
+        self.assertEqual(writer.run(lambda conn, backend: 2, timeout=5), 2)
+        self.assertEqual(len(attempts), 2)
+
+    def test_savepoint_failure_resolves_whole_group(self):
+        writer = EconomyWriter(self._connect)
+        writer.run(lambda conn, backend: conn.execute("CREATE TABLE t (v INTEGER)"))
+        started, gate = threading.Event(), threading.Event()
+        blocker = writer.submit(lambda conn, backend: started.set() or gate.wait(5))
+        started.wait(5)
+
+        def breaks_savepoint(conn, backend):
+            conn.execute("INSERT INTO t (v) VALUES (1)")
+            conn.execute("RELEASE SAVEPOINT econ_write_job")  # writer's own RELEASE now fails
+
+        futures = [writer.submit(breaks_savepoint), writer.submit(lambda conn, backend: 3)]
+        gate.set()
+        blocker.result(5)
+        for fut in futures:
+            with self.assertRaises(sqlite3.OperationalError):
+                fut.result(5)
+        self.assertEqual(writer.run(lambda conn, backend: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]), 0)
+
+    def test_concurrent_route_writes_and_reads(self):
+        url = "sqlite:///" + self.path
+        with mock.patch.dict(os.environ, {"ECON_DATABASE_URL": url}):
+            economy_db_sync.run_economy_write(es.ensure_economy_schema)
+            errors = []
+
+            def post(worker):
+                try:
+                    for i in range(10):
+                        economy_db_sync.run_economy_write(
+                            lambda conn, backend: es.create_routed_operation(
+                                conn, backend, category="content_income", amount=100 + i, actor=f"w{worker}"
+                            )
+                        )
+                        with economy_db_sync.get_economy_sync_connection() as (conn, backend):
+                            es.list_recent_entries(conn, backend, 20)
+                except Exception as e:  # pragma: no cover - surfaced below
+                    errors.append(e)
+
+            threads = [threading.Thread(target=post, args=(w,)) for w in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(30)
+            self.assertEqual(errors, [])
+            with economy_db_sync.get_economy_sync_connection() as (conn, backend):
+                count = es.fetch_one(conn, backend, "SELECT COUNT(*) AS c FROM econ_journal_entries", ())["c"]
+                self.assertEqual(es.verify_account_balances(conn, backend)["ok"], True)
+            self.assertEqual(count, 80)
+            stats = economy_db_sync.economy_writer_stats()
+            self.assertGreaterEqual(stats["jobs"], 81)
+            self.assertLessEqual(stats["groups"], stats["jobs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
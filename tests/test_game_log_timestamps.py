@@ -0,0 +1,57 @@
+"""Albion game-log date parsing into econ_game_log_rows.occurred_ts."""
+
+import sqlite3
+import unittest
+
+from web_dashboard import economy_service as es
+
+
+class TestParseLogTimestamp(unittest.TestCase):
+    def test_formats(self):
+        cases = {
+            "2024-05-02 10:00:00": "2024-05-02 10:00:00",
+            "2024-05-02T10:00:00Z": "2024-05-02 10:00:00",
+            "2024-05-02T12:00:00+02:00": "2024-05-02 10:00:00",
+            "2024/5/2 10:00": "2024-05-02 10:00:00",
+            "2024-05-02": "2024-05-02 00:00:00",
+            "05/02/2024 10:00:00 PM": "2024-05-02 22:00:00",
+            "05/02/2024 12:30:00 AM": "2024-05-02 00:30:00",
+            "25/02/2024 10:00:00": "2024-02-25 10:00:00",
+            "02.05.2024 10:00": "2024-05-02 10:00:00",
+            "": None,
+            "yesterday": None,
+            "13/13/2024": None,
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(es._parse_log_timestamp(raw), expected)
+
+    def test_day_first_inferred_per_import(self):
+        values = ["03/04/2024 10:00:00", "25/04/2024 10:00:00"]
+        self.assertTrue(es._log_dates_day_first(values))
+        self.assertFalse(es._log_dates_day_first(values[:1]))
+        self.assertEqual(es._parse_log_timestamp(values[0], day_first=True), "2024-04-03 10:00:00")
+
+
+class TestOccurredTsImport(unittest.TestCase):
+    def test_import_orders_locale_dates_by_time(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(conn, "sqlite")
+        # Day-first export: lexicographically "12/01" < "25/01" < "03/02", chronologically too only when parsed.
+        content = (
+            "Date,Player,Reason,Amount\n"
+            "03/02/2024 10:00:00,Alice,Deposit,100\n"
+            "25/01/2024 10:00:00,Bob,Deposit,200\n"
+            "12/01/2024 10:00:00,Carol,Deposit,400\n"
+        )
+        es.import_game_log_csv(conn, "sqlite", log_type="silver", content=content)
+        rows = es.list_current_player_totals(conn, "sqlite", log_type="silver", date_from="2024-01-20", date_to="2024-02-28")
+        self.assertEqual(rows, [{"player_name": "Alice", "net_amount": 100}, {"player_name": "Bob", "net_amount": 200}])
+        rows = es.list_current_player_totals(conn, "sqlite", log_type="silver", date_to="2024-01-31 23:59:59")
+        self.assertEqual([r["player_name"] for r in rows], ["Bob", "Carol"])
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Shared outbound HTTP client: keep-alive reuse, Retry-After backoff, redirects, per-host latency stats."""
+
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError, URLError
+
+from services.http_client import HttpClient, parse_retry_after
+
+
+class KeepAliveServer:
+    def __init__(self, idle_timeout=None):
+        self.peers = []
+        self.calls = {}
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            timeout = idle_timeout
+
+            def do_GET(self):
+                fake.peers.append(self.client_address[1])
+                n = fake.calls[self.path] = fake.calls.get(self.path, 0) + 1
+                if self.path == "/flaky" and n == 1:
+                    return self._send(503, b"busy", {"Retry-After": "0.2"})
+                if self.path == "/limited":
+                    return self._send(429, b'{"retry_after": 1}', {"Retry-After": "1"})
+                if self.path == "/old":
+                    return self._send(307, b"", {"Location": "/new?x=1"})
+                self._send(200, f"ok {self.path}".encode("utf-8"))
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.client = HttpClient(timeout=5, max_retries=2, backoff_base=0.01)
+        self.addCleanup(self.client.close)
+
+    def _server(self, **kw):
+        srv = KeepAliveServer(**kw)
+        self.addCleanup(srv.close)
+        return srv
+
+    def _host(self):
+        return self.client.stats()["hosts"]["127.0.0.1"]
+
+    def test_connections_are_kept_alive_and_latency_recorded(self):
+        srv = self._server()
+        for i in range(5):
+            self.assertEqual(self.client.request("GET", f"{srv.url}/p{i}").text(), f"ok /p{i}")
+        self.assertEqual(len(set(srv.peers)), 1)
+        host = self._host()
+        self.assertEqual((host["requests"], host["opened_connections"], host["reused_connections"]), (5, 1, 4))
+        self.assertEqual(sum(host["latency_ms"]["histogram"].values()), 5)
+        self.assertEqual(len(host["latency_ms"]["recent"]), 5)
+        self.assertIsNotNone(host["latency_ms"]["p95"])
+
+    def test_retry_honours_retry_after(self):
+        srv = self._server()
+        started = time.monotonic()
+        self.assertEqual(self.client.request("GET", f"{srv.url}/flaky").status, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(srv.calls["/flaky"], 2)
+        self.assertEqual(self._host()["retries"], 1)
+
+        with self.assertRaises(HTTPError) as ctx:
+            self.client.request("GET", f"{srv.url}/limited", retries=0)
+        self.assertEqual(ctx.exception.code, 429)
+        self.assertEqual(ctx.exception.headers.get("Retry-After"), "1")
+        self.assertEqual(ctx.exception.read(), b'{"retry_after": 1}')
+        self.assertEqual(srv.calls["/limited"], 1)
+
+    def test_slot_is_released_while_backing_off(self):
+        srv = self._server()
+        events = []
+
+        class Slot:
+            def __enter__(self):
+                events.append(("enter", time.monotonic()))
+
+            def __exit__(self, *exc):
+                events.append(("exit", time.monotonic()))
+
+        self.assertEqual(self.client.request("GET", f"{srv.url}/flaky", slot=Slot()).status, 200)
+        self.assertEqual([e for e, _ in events], ["enter", "exit", "enter", "exit"])
+        # The Retry-After wait happened between the two attempts, outside the slot.
+        self.assertGreaterEqual(events[2][1] - events[1][1], 0.2)
+
+    def test_redirect_and_server_closed_idle_connection(self):
+        srv = self._server(idle_timeout=0.2)
+        resp = self.client.request("GET", f"{srv.url}/old")
+        self.assertEqual((resp.status, resp.text(), resp.url), (200, "ok /new?x=1", f"{srv.url}/new?x=1"))
+        time.sleep(0.5)  # server drops the idle keep-alive connection
+        self.assertEqual(self.client.request("GET", f"{srv.url}/again").text(), "ok /again")
+        self.assertEqual(self._host()["opened_connections"], 2)
+
+    def test_connection_errors_raise_urlerror(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        with self.assertRaises(URLError):
+            self.client.request("GET", f"http://127.0.0.1:{port}/", retries=1)
+        self.assertEqual(self._host()["errors"], 2)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
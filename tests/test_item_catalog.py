@@ -0,0 +1,124 @@
+"""Offline item catalog: dump parsing, prefix trie + token index ranking, suggest_item_ids integration."""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from services import item_catalog
+from services.item_catalog import ItemCatalog
+from web_dashboard import economy_service as es
+
+DUMP_TXT = """\
+   1: UNIQUE_HIDEOUT                                  : Hideout Construction Kit
+ 101: T4_BAG                                          : Adept's Bag
+ 102: T4_BAG@1                                        : Adept's Bag
+ 103: T5_BAG                                          : Expert's Bag
+ 104: T4_BAG_INSIGHT                                  : Adept's Satchel of Insight
+ 105: T6_CAPE                                         : Master's Cape
+ 106: T6_CAPEITEM_FW_BRIDGEWATCH                      : Master's Bridgewatch Cape
+ 107: T8_2H_HOLYSTAFF_HELL                            : Elder's Fallen Staff
+ 108: T4_NO_NAME
+"""
+
+
+class TestItemCatalog(unittest.TestCase):
+    def setUp(self):
+        self.catalog = ItemCatalog.from_dump(DUMP_TXT)
+
+    def _ids(self, q, limit=20):
+        return [m["item_id"] for m in self.catalog.search(q, limit)]
+
+    def test_parses_txt_and_json_dumps(self):
+        self.assertEqual(len(self.catalog), 9)
+        rows = [
+            {"UniqueName": "T4_BAG", "LocalizedNames": {"EN-US": "Adept's Bag", "DE-DE": "Tasche des Adepten"}},
+            {"UniqueName": "T5_BAG", "LocalizedNames": None},
+        ]
+        as_json = ItemCatalog.from_dump(json.dumps(rows))
+        self.assertEqual((as_json.ids, as_json.names), (["T4_BAG", "T5_BAG"], ["Adept's Bag", ""]))
+
+    def test_ranking(self):
+        # Exact id, then id prefix, then shorter names first.
+        self.assertEqual(self._ids("t4_bag"), ["T4_BAG", "T4_BAG@1", "T4_BAG_INSIGHT"])
+        # Token queries are case- and order-insensitive, the last token may be a prefix.
+        self.assertEqual(self._ids("BAG adept"), ["T4_BAG", "T4_BAG@1", "T4_BAG_INSIGHT"])
+        self.assertEqual(self._ids("master's ca"), ["T6_CAPE", "T6_CAPEITEM_FW_BRIDGEWATCH"])
+        self.assertEqual(self._ids("bridge"), ["T6_CAPEITEM_FW_BRIDGEWATCH"])
+        self.assertEqual(self._ids("fallen staff")[0], "T8_2H_HOLYSTAFF_HELL")
+        self.assertEqual(self._ids("Expert's Bag"), ["T5_BAG"])
+        self.assertEqual(self._ids("bag", limit=2), ["T4_BAG", "T4_BAG@1"])
+        self.assertEqual(self._ids("zzz"), [])
+        self.assertEqual(self._ids("  "), [])
+
+    def test_short_prefixes_on_a_large_catalog_stop_at_limit(self):
+        rows = [(f"T{4 + i % 4}_ITEM_{i:05d}", f"Adept's Thing {i}") for i in range(12000)]
+        catalog = ItemCatalog(rows)
+        self.assertEqual(self._ids_of(catalog, "t4", 3), ["T4_ITEM_00000", "T4_ITEM_00004", "T4_ITEM_00008"])
+        # Name prefix: every item matches "adept", shortest names win.
+        self.assertEqual(self._ids_of(catalog, "a", 2), ["T4_ITEM_00000", "T5_ITEM_00001"])
+        # Exact tokens first, then token-prefix matches (equal name lengths: by id).
+        prefixed = sorted(f"T{4 + i % 4}_ITEM_{i:05d}" for i in range(11990, 12000))
+        self.assertEqual(self._ids_of(catalog, "thing 1199"), ["T7_ITEM_01199", *prefixed])
+
+    @staticmethod
+    def _ids_of(catalog, q, limit=20):
+        return [m["item_id"] for m in catalog.search(q, limit)]
+
+
+class TestCatalogSuggest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "items.txt")
+        env = mock.patch.dict(os.environ, {"ALBION_ITEMS_DUMP_PATH": self.path})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_suggest_uses_local_catalog_without_network(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(DUMP_TXT)
+        self.assertIsNone(item_catalog.get_item_catalog())  # requests never build the index
+        self.assertTrue(item_catalog.load_item_catalog())
+        self.assertFalse(item_catalog.load_item_catalog())
+        with mock.patch.object(es, "search_item_ids", side_effect=AssertionError("remote search called")):
+            out = es.suggest_item_ids("adept bag", limit=2)
+            self.assertEqual(es.suggest_item_ids("b", limit=5)["items"], [])
+        self.assertEqual(out["source"], "catalog")
+        self.assertEqual(out["items"], ["T4_BAG", "T4_BAG@1"])
+        self.assertEqual(out["matches"][0], {"item_id": "T4_BAG", "name": "Adept's Bag"})
+
+    def test_refresh_downloads_dump_once(self):
+        hits = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                hits.append(self.path)
+                body = DUMP_TXT.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/items.txt"
+        with mock.patch.dict(os.environ, {"ALBION_ITEMS_DUMP_URL": url}):
+            self.assertIsNone(item_catalog.get_item_catalog())
+            self.assertTrue(item_catalog.refresh_item_dump())
+            self.assertFalse(item_catalog.refresh_item_dump())
+        self.assertEqual(hits, ["/items.txt"])
+        self.assertTrue(item_catalog.load_item_catalog())
+        self.assertEqual(len(item_catalog.get_item_catalog()), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
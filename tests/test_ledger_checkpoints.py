@@ -0,0 +1,80 @@
+"""Daily ledger checkpoints: as-of balances (checkpoint + delta) against a full scan of journal lines."""
+
+import sqlite3
+import unittest
+
+from web_dashboard import economy_service as es
+
+DAYS = ["2024-03-01", "2024-03-02", "2024-03-04", "2024-03-07"]
+
+
+class TestLedgerCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        es.ensure_economy_schema(self.conn, "sqlite")
+        rule = next(r for r in es.list_routing_rules(self.conn, "sqlite") if r["category"] == "content_income")
+        es.upsert_routing_rule(
+            self.conn,
+            "sqlite",
+            category="needs_ok",
+            debit_account=rule["debit_account"],
+            credit_account=rule["credit_account"],
+            require_approval=True,
+        )
+        for i, day in enumerate(DAYS):
+            for j, category in enumerate(("content_income", "reward_payout")):
+                self._post(category, 100 * (i + 1) + j, f"{day} 1{j}:00:00")
+        self.conn.execute("DELETE FROM econ_ledger_checkpoints")
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _post(self, category, amount, created_at):
+        out = es.create_routed_operation(self.conn, "sqlite", category=category, amount=amount, actor="t")
+        self.conn.execute("UPDATE econ_journal_entries SET created_at=? WHERE id=?", (created_at, out["entry_id"]))
+        self.conn.commit()
+        return out
+
+    def _full_scan(self, cutoff):
+        rows = self.conn.execute(
+            """
+            SELECT l.account_code,
+                   SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),
+                   SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END)
+            FROM econ_journal_lines l JOIN econ_journal_entries e ON e.id = l.entry_id
+            WHERE e.status='posted' AND e.created_at < ?
+            GROUP BY l.account_code
+            """,
+            (cutoff,),
+        )
+        return {code: (d, c) for code, d, c in rows}
+
+    def _assert_as_of_matches_scan(self):
+        for as_of in ("2024-02-28", "2024-03-01", "2024-03-02 10:30:00", "2024-03-03", "2024-03-05", "2024-03-09"):
+            with self.subTest(as_of=as_of):
+                snap = es.balance_snapshot(self.conn, "sqlite", as_of=as_of)
+                got = {a["code"]: (a["debit_total"], a["credit_total"]) for a in snap["accounts"] if a["debit_total"] or a["credit_total"]}
+                self.assertEqual(got, self._full_scan(es._as_of_cutoff(as_of)))
+
+    def test_checkpoint_plus_delta_matches_full_scan(self):
+        out = es.close_ledger_periods(self.conn, "sqlite", through_day="2024-03-05")
+        self.assertEqual(out["closed_through"], "2024-03-05")
+        days = [r[0] for r in self.conn.execute("SELECT DISTINCT period_day FROM econ_ledger_checkpoints ORDER BY 1")]
+        self.assertEqual(days, ["2024-03-01", "2024-03-02", "2024-03-04", "2024-03-05"])
+        self._assert_as_of_matches_scan()
+
+    def test_backdated_approval_invalidates_later_checkpoints(self):
+        pending = self._post("needs_ok", 9999, "2024-03-02 12:00:00")
+        es.close_ledger_periods(self.conn, "sqlite", through_day="2024-03-05")
+        es.review_pending_entry(self.conn, "sqlite", entry_id=pending["entry_id"], action="approve", reviewed_by="o")
+        days = [r[0] for r in self.conn.execute("SELECT DISTINCT period_day FROM econ_ledger_checkpoints ORDER BY 1")]
+        self.assertEqual(days, ["2024-03-01"])
+        self._assert_as_of_matches_scan()
+        es.close_ledger_periods(self.conn, "sqlite", through_day="2024-03-05")
+        self._assert_as_of_matches_scan()
+
+
+if __name__ == "__main__":
+    unittest.main()
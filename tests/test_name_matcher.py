@@ -0,0 +1,63 @@
+"""NameMatcherIndex must pick the same name/score as the legacy SequenceMatcher scan."""
+
+import random
+import string
+import unittest
+from difflib import SequenceMatcher
+
+from utils.name_matcher import NameMatcherIndex
+
+
+def legacy_best(raw_name, names):
+    best_idx, best_score = -1, 0.0
+    for idx, candidate in enumerate(names):
+        score = SequenceMatcher(None, raw_name.lower(), candidate.lower()).ratio()
+        if score > best_score:
+            best_idx, best_score = idx, score
+    return best_idx, best_score
+
+
+class TestNameMatcherIndex(unittest.TestCase):
+    def assert_equivalent(self, names, queries):
+        index = NameMatcherIndex(names)
+        for raw in queries:
+            with self.subTest(raw=raw):
+                self.assertEqual(index.best_match(raw), legacy_best(raw, names))
+
+    def test_empty_index(self):
+        self.assertEqual(NameMatcherIndex([]).best_match("Bob"), (-1, 0.0))
+
+    def test_exact_and_case_duplicates_pick_first(self):
+        names = ["Zed", "BOB", "Bob", "bobby"]
+        self.assert_equivalent(names, ["Bob", "bob", "BOB", "bobb", "Zed"])
+        self.assertEqual(NameMatcherIndex(names).best_match("Bob"), (1, 1.0))
+
+    def test_no_shared_characters(self):
+        self.assert_equivalent(["aaa", "bbb"], ["xyz", "q"])
+
+    def test_ties_resolve_to_earliest_name(self):
+        names = ["abcx", "abcy", "abcz", "xabc"]
+        self.assert_equivalent(names, ["abcq", "abc", "qabc", "cba"])
+
+    def test_memoized_per_raw_name(self):
+        index = NameMatcherIndex(["Alpha", "Beta"])
+        first = index.best_match("Alpah")
+        self.assertIs(index.best_match("Alpah"), first)
+
+    def test_random_names_match_legacy_scan(self):
+        rng = random.Random(20240518)
+        alphabet = string.ascii_letters + string.digits + "_ "
+        names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14))) for _ in range(300)]
+        names += [n.upper() for n in names[:20]]
+        queries = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 14))) for _ in range(150)]
+        # Typo'd versions of real names exercise the shortlist path.
+        for n in names[:80]:
+            if len(n) > 2:
+                pos = rng.randrange(len(n))
+                queries.append(n[:pos] + rng.choice(alphabet) + n[pos + 1 :])
+                queries.append(n.swapcase())
+        self.assert_equivalent(names, queries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Price cache: bounded LRU, SQLite persistence, stale-while-revalidate in pricing_client."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from services import pricing_client
+from services.price_cache import PriceCache
+from test_pricing_batch import FakeAlbionData
+
+
+class TestPriceCache(unittest.TestCase):
+    def test_lru_bound_and_counters(self):
+        cache = PriceCache(max_entries=3, ttl_seconds=60, stale_max_seconds=600)
+        for key in "abc":
+            cache.put(key, {"v": key})
+        self.assertTrue(cache.get("a").fresh)  # "a" becomes most recently used
+        cache.put("d", {"v": "d"})
+        self.assertIsNone(cache.get("b"))
+        cache.put("e", {"v": "e"}, stored_at=time.time() - 120)
+        self.assertTrue(cache.get("e").revalidate)
+        cache.put("f", {"v": "f"}, stored_at=time.time() - 6000)
+        old = cache.get("f")
+        self.assertFalse(old.fresh or old.revalidate)
+        self.assertEqual(len(cache), 3)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["stale_hits"], stats["misses"], stats["evictions"]), (1, 1, 2, 3))
+
+    def test_entries_survive_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "prices.db")
+            first = PriceCache(max_entries=2, path=path)
+            first.put("x", {"p": 1}, stored_at=time.time() - 10)
+            first.put("y", {"p": 2})
+            first.put("z", {"p": 3})
+            second = PriceCache(max_entries=2, path=path)
+            self.assertEqual({k: second.get(k) and second.get(k).value for k in "xyz"}, {"x": None, "y": {"p": 2}, "z": {"p": 3}})
+            self.assertTrue(second.stats()["persistent"])
+
+    def test_revalidate_runs_once_per_key(self):
+        cache = PriceCache()
+        gate = threading.Event()
+        calls = []
+
+        def loader(keys):
+            calls.append(keys)
+            gate.wait(5)
+
+        self.assertTrue(cache.revalidate(["k1", "k2"], loader))
+        self.assertFalse(cache.revalidate(["k2", "k1"], loader))
+        gate.set()
+        deadline = time.time() + 5
+        while cache.stats()["refreshing"] and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(calls, [["k1", "k2"]])
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlbionData()
+        self.addCleanup(self.fake.close)
+        env = mock.patch.dict(os.environ, {"ALBION_PRICING_BASE_URL": self.fake.url})
+        env.start()
+        self.addCleanup(env.stop)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+
+    def test_expired_price_served_then_refreshed_in_background(self):
+        pricing_client.get_item_price_24h_trimmed_mean("T4_BAG")
+        key = "trimmed24h|T4_BAG"
+        pricing_client._CACHE.put(key, pricing_client._CACHE.get(key).value, stored_at=time.time() - 300)
+        self.fake.scale = 2
+        self.fake.delay = 0.3
+
+        started = time.monotonic()
+        data, err, stale = pricing_client.get_item_price_24h_trimmed_mean("T4_BAG")
+        self.assertLess(time.monotonic() - started, 0.25)
+        self.assertEqual((data["market_unit_price"], err, stale), (1100, None, True))
+
+        deadline = time.time() + 5
+        while not pricing_client._CACHE.get(key).fresh and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(pricing_client.get_item_price_24h_trimmed_mean("T4_BAG")[0]["market_unit_price"], 2200)
+        self.assertEqual(len(self.fake.paths), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Price history: downsampling, recorder behind the pricing client, series API shape, point-in-time armory valuation."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from services import pricing_client
+from services.downsample import bucket_stats, lttb
+from test_pricing_batch import FakeAlbionData
+from web_dashboard import economy_db_sync
+from web_dashboard import economy_service as es
+from web_dashboard.price_history import PriceHistoryRecorder
+
+
+class TestDownsample(unittest.TestCase):
+    def test_bucket_stats(self):
+        pts = [(0, 5), (1, 7), (5, 1), (9, 3), (10, 11)]
+        out = bucket_stats(pts, 2, 0, 10)
+        self.assertEqual([b["count"] for b in out], [2, 3])
+        self.assertEqual((out[0]["t"], out[0]["min"], out[0]["max"], out[0]["mean"]), (0, 5, 7, 6))
+        self.assertEqual((out[1]["t"], out[1]["min"], out[1]["max"], out[1]["mean"]), (5, 1, 11, 5))
+        self.assertEqual(bucket_stats([], 10), [])
+
+    def test_lttb_keeps_endpoints_and_spikes(self):
+        pts = [(float(t), 100.0) for t in range(1000)]
+        pts[437] = (437.0, 5000.0)
+        out = lttb(pts, 50)
+        self.assertEqual(len(out), 50)
+        self.assertEqual((out[0], out[-1]), (pts[0], pts[-1]))
+        self.assertIn(pts[437], out)
+        self.assertEqual([p[0] for p in out], sorted(p[0] for p in out))
+        self.assertEqual(lttb(pts[:10], 50), pts[:10])
+
+
+class TestPriceHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.fake = FakeAlbionData()
+        self.addCleanup(self.fake.close)
+        env = mock.patch.dict(
+            os.environ,
+            {
+                "ECON_DATABASE_URL": "sqlite:///" + os.path.join(self.tmp.name, "economy.db"),
+                "ALBION_PRICING_BASE_URL": self.fake.url,
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+        economy_db_sync.ensure_economy_ready()
+
+    def _rows(self, sql, params=()):
+        with economy_db_sync.get_economy_sync_connection() as (conn, backend):
+            return es.fetch_all(conn, backend, sql, params)
+
+    def test_fetched_prices_are_recorded(self):
+        rec = PriceHistoryRecorder(flush_rows=1000, flush_interval=3600)
+        pricing_client.add_price_observer(rec)
+        self.addCleanup(pricing_client.remove_price_observer, rec)
+        pricing_client.get_items_price_24h_trimmed_mean(["T4_BAG", "T5_CAPE"])
+        self.assertEqual(rec.stats()["pending"], 6)
+        rec.flush().result(timeout=10)
+        self.assertEqual(rec.stats(), {"pending": 0, "recorded": 6, "failed": 0})
+        rows = self._rows("SELECT item_id, city, quality, sell_min, buy_max FROM econ_price_history WHERE item_id=$1 ORDER BY city", ("T4_BAG",))
+        self.assertEqual(
+            [(r["city"], r["quality"], r["sell_min"], r["buy_max"]) for r in rows],
+            [("Caerleon", 1, 100, None), ("Lymhurst", 1, 1000, None), ("Martlock", 1, 1200, None)],
+        )
+        self.assertIsNone(rec.flush())
+
+    def _seed(self):
+        rows = []
+        for day in range(1, 11):
+            for city, price in (("Lymhurst", 1000 + day), ("Martlock", 1200 + day), ("Caerleon", 50)):
+                rows.append({"item_id": "T4_BAG", "city": city, "quality": 1, "ts": f"2026-03-{day:02d} 12:00:00", "sell_min": price})
+        rows.append({"item_id": "T6_CAPE@2", "city": "Lymhurst", "quality": 1, "ts": "2026-03-04 08:00:00", "sell_min": 9000})
+        economy_db_sync.run_economy_write(lambda conn, backend: es.record_price_observations(conn, backend, rows + rows))
+
+    def test_series_are_downsampled_per_city(self):
+        self._seed()
+        with economy_db_sync.get_economy_sync_connection() as (conn, backend):
+            out = es.price_history_series(conn, backend, "t4_bag", start="2026-03-01", end="2026-03-10", buckets=5, points=4)
+            one = es.price_history_series(conn, backend, "T4_BAG", city="Martlock", start="2026-03-01", end="2026-03-10")
+            with self.assertRaises(ValueError):
+                es.price_history_series(conn, backend, "T4_BAG", field="sell_min; DROP TABLE x")
+        self.assertEqual([s["city"] for s in out["series"]], ["Caerleon", "Lymhurst", "Martlock"])
+        lym = out["series"][1]
+        self.assertEqual(lym["observations"], 10)
+        self.assertEqual(len(lym["buckets"]), 5)
+        self.assertEqual(sum(b["count"] for b in lym["buckets"]), 10)
+        self.assertEqual((lym["buckets"][0]["min"], lym["buckets"][-1]["max"]), (1001, 1010))
+        self.assertEqual([p["t"] for p in (lym["line"][0], lym["line"][-1])], ["2026-03-01 12:00:00", "2026-03-10 12:00:00"])
+        self.assertEqual(len(lym["line"]), 4)
+        self.assertEqual(out["to"], "2026-03-10 23:59:59")
+        self.assertEqual([s["city"] for s in one["series"]], ["Martlock"])
+
+    def test_armory_valuation_uses_prices_before_as_of(self):
+        self._seed()
+        stock = [
+            {"action": "ADD", "item_name": "T4_BAG", "category": "gear", "tier": "4", "enchant": "0", "quality": "Normal", "quantity": 3},
+            {"action": "ADD", "item_name": "T6_CAPE", "category": "gear", "tier": "6", "enchant": "2", "quality": "1", "quantity": 1},
+            {"action": "ADD", "item_name": "Mystery box", "category": "misc", "tier": "", "enchant": "", "quality": "", "quantity": 2},
+        ]
+        with economy_db_sync.get_economy_sync_connection() as (conn, backend):
+            es.record_armory_movements_batch(conn, backend, stock)
+            conn.execute("UPDATE econ_armory_movements SET created_at='2026-03-01 00:00:00'")
+            conn.commit()
+            early = es.armory_valuation_as_of(conn, backend, "2026-03-05 00:00:00")
+            late = es.armory_valuation_as_of(conn, backend, "2026-04-30", lookback_days=7)
+        # 2026-03-04 prices: Caerleon 50 is trimmed, mean(1004, 1204) = 1104.
+        by_id = {r["price_item_id"]: r for r in early["items"]}
+        self.assertEqual(by_id["T4_BAG"]["unit_price"], 1104)
+        self.assertEqual(by_id["T6_CAPE@2"]["value"], 9000)
+        self.assertEqual(early["total_value"], 1104 * 3 + 9000)
+        self.assertEqual([r["item_name"] for r in early["unpriced"]], ["Mystery box"])
+        # Nothing observed in the 7 days before as_of: every item is unpriced.
+        self.assertEqual((late["priced_count"], late["unpriced_count"], late["total_value"]), (0, 3, 0))
+
+
+class TestRecorderFlushTriggers(unittest.TestCase):
+    def test_flush_on_rows_or_interval(self):
+        now = [0.0]
+        rec = PriceHistoryRecorder(flush_rows=3, flush_interval=30, clock=lambda: now[0])
+        with mock.patch.object(rec, "flush") as flush:
+            rec([{}, {}])
+            flush.assert_not_called()
+            rec([{}])
+            self.assertEqual(flush.call_count, 1)
+        rec = PriceHistoryRecorder(flush_rows=100, flush_interval=30, clock=lambda: now[0])
+        with mock.patch.object(rec, "flush") as flush:
+            rec([{}])
+            now[0] = 31.0
+            rec([{}])
+            self.assertEqual(flush.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Price prefetcher: item selection from armory/requests, per-minute request budget, batched warm-up."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from services import pricing_client
+from test_pricing_batch import FakeAlbionData
+from web_dashboard import economy_db_sync
+from web_dashboard import economy_service as es
+from web_dashboard.price_prefetch import RequestBudget, prefetch_once
+
+
+def _stock(name, enchant="0", qty=1):
+    return {
+        "action": "ADD",
+        "item_name": name,
+        "category": "gear",
+        "tier": "4",
+        "enchant": enchant,
+        "quality": "1",
+        "quantity": qty,
+    }
+
+
+class TestPrefetchSelection(unittest.TestCase):
+    def test_armory_and_recent_request_items(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        self.addCleanup(conn.close)
+        es.ensure_economy_schema(conn, "sqlite")
+        es.record_armory_movements_batch(
+            conn, "sqlite", [_stock("T4_BAG", "1"), _stock("Bag"), _stock("T5_CAPE"), dict(_stock("T5_CAPE"), action="REMOVE")]
+        )
+        for item_id, created in (("T6_MAIN_SWORD", "2000-01-01 00:00:00"), ("T7_HEAD_PLATE_SET1", None)):
+            conn.execute(
+                "INSERT INTO econ_regear_requests (player_name, content_type, item_id, quantity, unit_cost, screenshot_url)"
+                " VALUES ('p', 'zvz', ?, 1, 10, '')",
+                (item_id,),
+            )
+            if created:
+                conn.execute("UPDATE econ_regear_requests SET created_at=? WHERE item_id=?", (created, item_id))
+        conn.commit()
+        self.assertEqual(es.list_prefetch_item_ids(conn, "sqlite"), ["T4_BAG@1", "T7_HEAD_PLATE_SET1"])
+
+
+class TestRequestBudget(unittest.TestCase):
+    def test_refills_per_minute_and_caps_at_one_minute(self):
+        now = [0.0]
+        budget = RequestBudget(10, clock=lambda: now[0])
+        self.assertEqual(budget.take(15), 10)
+        self.assertEqual(budget.take(1), 0)
+        now[0] = 30.0
+        self.assertEqual(budget.take(15), 5)
+        budget.refund(3)
+        now[0] = 600.0
+        self.assertEqual(budget.take(100), 10)
+
+
+class TestPrefetchOnce(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.fake = FakeAlbionData()
+        self.addCleanup(self.fake.close)
+        env = mock.patch.dict(
+            os.environ,
+            {
+                "ECON_DATABASE_URL": "sqlite:///" + os.path.join(self.tmp.name, "economy.db"),
+                "ALBION_PRICING_BASE_URL": self.fake.url,
+                "ALBION_PRICING_BATCH_SIZE": "40",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+
+    def test_budget_limits_batched_requests_and_cache_is_warmed(self):
+        economy_db_sync.ensure_economy_ready()
+        moves = [_stock(f"T4_ITEM_{i}") for i in range(90)]
+        economy_db_sync.run_economy_write(lambda conn, backend: es.record_armory_movements_batch(conn, backend, moves))
+        now = [0.0]
+        budget = RequestBudget(2, clock=lambda: now[0])
+
+        first = prefetch_once(budget)
+        self.assertEqual((first["candidates"], first["requests"], first["refreshed"], first["deferred"]), (90, 2, 80, 10))
+        self.assertEqual(prefetch_once(budget)["requests"], 0)  # budget spent
+        now[0] = 30.0
+        second = prefetch_once(budget)
+        self.assertEqual((second["due"], second["requests"], second["refreshed"]), (10, 1, 10))
+        self.assertEqual(len(self.fake.paths), 3)
+
+        # Interactive quote is now answered from the warm cache.
+        quote = es.quote_loot_list([{"item_id": "T4_ITEM_7", "quantity": 2}])
+        self.assertEqual(quote["payout_total"], 1760)
+        self.assertEqual(len(self.fake.paths), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
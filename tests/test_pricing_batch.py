@@ -0,0 +1,139 @@
+"""Multi-item price quotes: comma-batched requests, global concurrency cap, per-item stale flags."""
+
+import json
+import os
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import unquote, urlparse
+
+from services import pricing_client
+from web_dashboard import economy_service as es
+
+
+class FakeAlbionData:
+    """Local stand-in for albion-online-data: /api/v2/stats/prices/<id,id,...>."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.status = 200
+        self.scale = 1
+        self.paths = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake.lock:
+                    fake.paths.append(self.path)
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.delay)
+                    if fake.status != 200:
+                        self.send_response(fake.status)
+                        self.end_headers()
+                        return
+                    ids = unquote(urlparse(self.path).path.rsplit("/", 1)[-1]).split(",")
+                    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+                    rows = [
+                        {"item_id": i, "city": city, "sell_price_min": price * fake.scale, "sell_price_min_date": now}
+                        for i in ids
+                        if not i.startswith("UNKNOWN")
+                        for city, price in (("Lymhurst", 1000), ("Martlock", 1200), ("Caerleon", 100))
+                    ]
+                    body = json.dumps(rows).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestPricingBatch(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeAlbionData()
+        self.addCleanup(self.fake.close)
+        env = mock.patch.dict(os.environ, {"ALBION_PRICING_BASE_URL": self.fake.url, "ALBION_PRICING_BATCH_SIZE": "40"})
+        env.start()
+        self.addCleanup(env.stop)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+
+    def test_many_items_fetched_in_comma_batches(self):
+        ids = [f"T4_ITEM_{i}" for i in range(90)] + ["UNKNOWN_X", "T4_ITEM_0", " "]
+        out = pricing_client.get_items_price_24h_trimmed_mean(ids)
+        self.assertEqual(len(self.fake.paths), 3)
+        self.assertEqual(len(out), 91)
+        # Caerleon (100) is below 50% of the median and is trimmed: mean(1000, 1200).
+        self.assertEqual(out["T4_ITEM_89"]["data"]["market_unit_price"], 1100)
+        self.assertEqual(out["UNKNOWN_X"], {"data": None, "error": "No market data for item", "stale": False})
+        # Second quote is served from cache; single-item path agrees with the batch result.
+        pricing_client.get_items_price_24h_trimmed_mean(ids[:10])
+        data, err, stale = pricing_client.get_item_price_24h_trimmed_mean("T4_ITEM_3")
+        self.assertEqual((data["market_unit_price"], err, stale), (1100, None, False))
+        self.assertEqual(len(self.fake.paths), 3)
+
+    def test_concurrency_is_capped_globally(self):
+        self.fake.delay = 0.15
+        # The cap is fixed at import time (ALBION_PRICING_MAX_CONCURRENCY); swap in a process configured with 2.
+        with mock.patch.dict(os.environ, {"ALBION_PRICING_BATCH_SIZE": "1"}), mock.patch.multiple(
+            pricing_client, _MAX_CONCURRENCY=2, _FETCH_SLOTS=threading.BoundedSemaphore(2)
+        ):
+            started = time.monotonic()
+            out = pricing_client.get_items_price_24h_trimmed_mean([f"T5_X_{i}" for i in range(6)])
+            elapsed = time.monotonic() - started
+        self.assertTrue(all(r["data"] for r in out.values()))
+        self.assertEqual(self.fake.max_in_flight, 2)
+        self.assertLess(elapsed, 6 * 0.15)
+
+    def test_stale_cache_flagged_per_item_on_failure(self):
+        pricing_client.get_items_price_24h_trimmed_mean(["T4_A"])
+        key = "trimmed24h|T4_A"
+        # Past the stale-while-revalidate window: only usable as an error fallback.
+        pricing_client._CACHE.put(key, pricing_client._CACHE.get(key).value, stored_at=time.time() - 100_000)
+        self.fake.status = 503
+        out = pricing_client.get_items_price_24h_trimmed_mean(["T4_A", "T4_B"])
+        self.assertTrue(out["T4_A"]["stale"])
+        self.assertEqual(out["T4_A"]["data"]["market_unit_price"], 1100)
+        self.assertEqual(out["T4_B"], {"data": None, "error": "HTTP 503", "stale": False})
+
+    def test_loot_list_quote(self):
+        items = es.parse_loot_list("t4_bag 3\n# comment\n2x T6_CAPE\nT4_BAG,1\nUNKNOWN_Q")
+        self.assertEqual(
+            items,
+            [{"item_id": "T4_BAG", "quantity": 4}, {"item_id": "T6_CAPE", "quantity": 2}, {"item_id": "UNKNOWN_Q", "quantity": 1}],
+        )
+        with self.assertRaises(ValueError):
+            es.parse_loot_list("T4_BAG 0")
+        quote = es.quote_loot_list(items)
+        self.assertEqual(len(self.fake.paths), 1)
+        self.assertEqual(quote["market_total"], 1100 * 6)
+        self.assertEqual(quote["payout_total"], 880 * 4 + 880 * 2)
+        self.assertEqual((quote["priced_count"], quote["missing_count"]), (2, 1))
+        with self.assertRaises(ValueError):
+            es.quote_loot_list([])
+
+
+if __name__ == "__main__":
+    unittest.main()
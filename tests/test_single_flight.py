@@ -0,0 +1,145 @@
+"""Single-flight: concurrent callers for one key share one execution (pricing + Discord roles clients)."""
+
+import json
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from services import pricing_client
+from test_pricing_batch import FakeAlbionData
+from utils.single_flight import SingleFlight
+from web_dashboard import discord_roles_client
+
+
+def _together(n, fn):
+    barrier = threading.Barrier(n)
+
+    def run(_):
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(run, range(n)))
+
+
+class FakeDiscord:
+    def __init__(self):
+        self.paths = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.paths.append(self.path)
+                time.sleep(0.2)
+                body = json.dumps([{"id": 2, "name": "Officer"}, {"id": 1, "name": "@everyone"}]).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_result_and_error(self):
+        flight = SingleFlight()
+        runs = []
+
+        def slow():
+            runs.append(1)
+            time.sleep(0.2)
+            return {"v": len(runs)}
+
+        results = _together(8, lambda: flight.do("k", slow))
+        self.assertEqual(len(runs), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+        def boom():
+            time.sleep(0.2)
+            raise RuntimeError("upstream down")
+
+        errors = _together(4, lambda: self._catch(lambda: flight.do("k", boom)))
+        self.assertEqual([str(e) for e in errors], ["upstream down"] * 4)
+        self.assertEqual(flight.do("k", lambda: "again"), "again")
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    @staticmethod
+    def _catch(fn):
+        try:
+            fn()
+        except RuntimeError as e:
+            return e
+        return None
+
+    def test_pricing_misses_for_one_item_hit_upstream_once(self):
+        fake = FakeAlbionData(delay=0.2)
+        self.addCleanup(fake.close)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+        with mock.patch.dict(os.environ, {"ALBION_PRICING_BASE_URL": fake.url}):
+            results = _together(8, lambda: pricing_client.get_item_price_24h_trimmed_mean("T4_BAG"))
+        self.assertEqual(len(fake.paths), 1)
+        self.assertEqual({r[0]["market_unit_price"] for r in results}, {1100})
+
+    def test_batch_quote_waits_for_single_lookup_in_flight(self):
+        fake = FakeAlbionData(delay=0.3)
+        self.addCleanup(fake.close)
+        pricing_client._CACHE.clear()
+        self.addCleanup(pricing_client._CACHE.clear)
+        with mock.patch.dict(os.environ, {"ALBION_PRICING_BASE_URL": fake.url}), ThreadPoolExecutor(max_workers=1) as pool:
+            single = pool.submit(pricing_client.get_item_price_24h_trimmed_mean, "T4_BAG")
+            time.sleep(0.1)
+            quote = pricing_client.get_items_price_24h_trimmed_mean(["T4_BAG", "T5_CAPE"])
+            self.assertEqual(single.result()[0]["market_unit_price"], 1100)
+        # T4_BAG was requested once (by the single lookup); the batch only asked for T5_CAPE.
+        self.assertEqual(sorted(p.split("?")[0].rsplit("/", 1)[-1] for p in fake.paths), ["T4_BAG", "T5_CAPE"])
+        self.assertEqual({r["data"]["market_unit_price"] for r in quote.values()}, {1100})
+        self.assertFalse(any(r["stale"] or r["error"] for r in quote.values()))
+
+    def test_do_many_shares_keys_between_overlapping_batches(self):
+        flight = SingleFlight()
+        loads = []
+
+        def load(keys):
+            loads.append(sorted(keys))
+            time.sleep(0.2)
+            return {k: k.upper() for k in keys}
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            first = pool.submit(flight.do_many, ["a", "b"], load)
+            time.sleep(0.05)
+            second = flight.do_many(["b", "c"], load)
+        self.assertEqual(first.result(), {"a": "A", "b": "B"})
+        self.assertEqual(second, {"b": "B", "c": "C"})
+        self.assertEqual(sorted(loads), [["a", "b"], ["c"]])
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_guild_roles_fetched_once_for_parallel_requests(self):
+        fake = FakeDiscord()
+        self.addCleanup(fake.close)
+        discord_roles_client._cache.clear()
+        self.addCleanup(discord_roles_client._cache.clear)
+        with mock.patch.dict(os.environ, {"DISCORD_TOKEN": "t", "DISCORD_API_BASE_URL": fake.url}):
+            results = _together(6, lambda: discord_roles_client.fetch_discord_guild_roles(123))
+            self.assertEqual(discord_roles_client.fetch_discord_guild_roles(123), results[0])
+        self.assertEqual(fake.paths, ["/guilds/123/roles"])
+        self.assertEqual(results[0], ([{"id": "1", "name": "@everyone"}, {"id": "2", "name": "Officer"}], None))
+        self.assertTrue(all(r == results[0] for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Circuit breaker for an upstream dependency.
+
+closed     calls pass; ``failure_threshold`` consecutive bad calls (errors, or
+           successes slower than ``slo_ms``) open the circuit.
+open       calls are rejected with ``CircuitOpenError`` without touching the
+           upstream, so callers can answer from cache right away.
+half_open  after ``reset_timeout`` seconds one probe call is let through; a good
+           probe closes the circuit, a bad one opens it for another cooldown.
+
+Callers bracket each upstream call with ``acquire()`` and ``record(ok, elapsed_ms)``
+(or use ``call(fn)``), so time spent queueing before the request is not billed
+to the upstream's latency.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        slo_ms: Optional[float] = None,
+        reset_timeout: float = 30.0,
+        window: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.slo_ms = None if slo_ms is None else float(slo_ms)
+        self.reset_timeout = max(0.0, float(reset_timeout))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._consecutive = 0
+        # (ok, elapsed_ms) of the most recent calls, for error rate and p95.
+        self._recent: Deque[Tuple[bool, float]] = deque(maxlen=max(1, int(window)))
+        self._counters = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    def _retry_in(self, now: float) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - now)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._retry_in(self._clock()) <= 0:
+                return HALF_OPEN
+            return self._state
+
+    def acquire(self) -> None:
+        """Raise CircuitOpenError unless a call may go upstream now (at most one probe while half-open)."""
+        with self._lock:
+            now = self._clock()
+            if self._state == OPEN and self._retry_in(now) <= 0:
+                self._state = HALF_OPEN
+            if self._state == CLOSED or (self._state == HALF_OPEN and not self._probing):
+                self._probing = self._state == HALF_OPEN
+                return
+            self._counters["rejected"] += 1
+            retry_in = self._retry_in(now)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, ok: bool, elapsed_ms: float) -> None:
+        """Outcome of an acquired call; a success slower than the SLO counts as a breach."""
+        slow = ok and self.slo_ms is not None and elapsed_ms > self.slo_ms
+        with self._lock:
+            self._counters["calls"] += 1
+            self._recent.append((ok, float(elapsed_ms)))
+            if not ok:
+                self._counters["failures"] += 1
+            if slow:
+                self._counters["slow_calls"] += 1
+            probe = self._state == HALF_OPEN
+            self._probing = False
+            if ok and not slow:
+                self._consecutive = 0
+                if self._state != OPEN:  # a call that started before the circuit opened does not close it
+                    self._state = CLOSED
+                return
+            self._consecutive += 1
+            if probe or (self._state == CLOSED and self._consecutive >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._counters["opened"] += 1
+
+    def call(self, fn: Callable[[], Any], *, is_failure: Callable[[BaseException], bool] = lambda e: True) -> Any:
+        self.acquire()
+        started = time.perf_counter()
+        try:
+            out = fn()
+        except BaseException as e:
+            self.record(not is_failure(e), (time.perf_counter() - started) * 1000.0)
+            raise
+        self.record(True, (time.perf_counter() - started) * 1000.0)
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._probing = False
+            self._consecutive = 0
+            self._recent.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            state = self._state
+            if state == OPEN and self._retry_in(now) <= 0:
+                state = HALF_OPEN
+            recent = list(self._recent)
+            latencies = sorted(ms for _, ms in recent)
+            p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))] if latencies else None
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive,
+                "failure_threshold": self.failure_threshold,
+                "slo_ms": self.slo_ms,
+                "retry_in_seconds": round(self._retry_in(now), 1) if state == OPEN else 0.0,
+                "window_calls": len(recent),
+                "error_rate": round(sum(1 for ok, _ in recent if not ok) / float(len(recent)), 4) if recent else 0.0,
+                "p95_latency_ms": None if p95 is None else round(p95, 2),
+                **self._counters,
+            }
@@ -0,0 +1,139 @@
+"""
+Fuzzy player-name lookup for economy imports (discrepancy detection).
+
+NameMatcherIndex returns the same winner as the legacy linear scan
+``SequenceMatcher(None, raw.lower(), name.lower()).ratio()`` over every known
+name (highest score, earliest name on ties, no match when every score is 0),
+but only fully scores a handful of names per lookup:
+
+1. lower-cased hash lookup (identical strings are the only way to score 1.0);
+2. character-trigram inverted index -> shortlist scored with SequenceMatcher;
+3. remaining names are skipped when a length or character-multiset upper bound
+   proves they cannot beat (or tie earlier than) the shortlist winner.
+
+Results are memoized per raw name for the lifetime of the index (one import).
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+_NO_MATCH: Tuple[int, float] = (-1, 0.0)
+
+
+def _ratio_from(matches: int, length: int) -> float:
+    # Same formula as difflib._calculate_ratio, so bounds compare exactly with ratio().
+    if length:
+        return 2.0 * matches / length
+    return 1.0
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatcherIndex:
+    """Index over candidate names; ``best_match`` returns ``(index, score)`` or ``(-1, 0.0)``."""
+
+    def __init__(self, names: Sequence[str], *, shortlist_size: int = 8):
+        self._names: List[str] = [str(n or "") for n in names]
+        self._lower: List[str] = [n.lower() for n in self._names]
+        self._shortlist_size = max(1, int(shortlist_size))
+        self._by_lower: Dict[str, int] = {}
+        self._by_length: Dict[int, List[int]] = {}
+        self._grams: Dict[str, List[int]] = {}
+        for idx, low in enumerate(self._lower):
+            self._by_lower.setdefault(low, idx)
+            self._by_length.setdefault(len(low), []).append(idx)
+            for gram in _trigrams(low):
+                self._grams.setdefault(gram, []).append(idx)
+        self._lengths: List[int] = sorted(self._by_length)
+        # Lazily built per candidate: SequenceMatcher caches its b-side (candidate) analysis.
+        self._matchers: List[Optional[SequenceMatcher]] = [None] * len(self._names)
+        self._char_counts: List[Optional[Counter]] = [None] * len(self._names)
+        self._memo: Dict[str, Tuple[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def name_at(self, idx: int) -> str:
+        return self._names[idx]
+
+    def best_match(self, raw_name: str) -> Tuple[int, float]:
+        raw = str(raw_name or "")
+        hit = self._memo.get(raw)
+        if hit is None:
+            hit = self._search(raw.lower())
+            self._memo[raw] = hit
+        return hit
+
+    def _score(self, idx: int, low: str) -> float:
+        sm = self._matchers[idx]
+        if sm is None:
+            sm = SequenceMatcher(None, "", self._lower[idx])
+            self._matchers[idx] = sm
+        sm.set_seq1(low)
+        return sm.ratio()
+
+    def _char_bound(self, idx: int, low_counts: Counter, total_len: int) -> float:
+        counts = self._char_counts[idx]
+        if counts is None:
+            counts = Counter(self._lower[idx])
+            self._char_counts[idx] = counts
+        matches = 0
+        for ch, n in low_counts.items():
+            other = counts.get(ch)
+            if other:
+                matches += n if n < other else other
+        return _ratio_from(matches, total_len)
+
+    def _search(self, low: str) -> Tuple[int, float]:
+        if not self._names:
+            return _NO_MATCH
+        exact = self._by_lower.get(low)
+        if exact is not None:
+            return exact, 1.0
+
+        best_idx, best_score = -1, 0.0
+
+        def consider(idx: int, score: float) -> None:
+            nonlocal best_idx, best_score
+            if score > best_score or (best_idx >= 0 and score == best_score and idx < best_idx):
+                best_idx, best_score = idx, score
+
+        overlap: Dict[int, int] = {}
+        for gram in _trigrams(low):
+            for idx in self._grams.get(gram, ()):
+                overlap[idx] = overlap.get(idx, 0) + 1
+        shortlist = sorted(overlap, key=lambda i: (-overlap[i], i))[: self._shortlist_size]
+        scored = set(shortlist)
+        for idx in shortlist:
+            consider(idx, self._score(idx, low))
+
+        # Exactness pass: every other name must be proven unable to win before it is skipped.
+        la = len(low)
+        low_counts: Optional[Counter] = None
+        for lb in self._lengths:
+            total = la + lb
+            length_bound = _ratio_from(min(la, lb), total)
+            if length_bound < best_score or length_bound == 0.0:
+                continue
+            for idx in self._by_length[lb]:
+                if idx in scored:
+                    continue
+                if length_bound == best_score and idx > best_idx:
+                    continue
+                if low_counts is None:
+                    low_counts = Counter(low)
+                char_bound = self._char_bound(idx, low_counts, total)
+                if char_bound < best_score or char_bound == 0.0:
+                    continue
+                if char_bound == best_score and idx > best_idx:
+                    continue
+                consider(idx, self._score(idx, low))
+        if best_idx < 0:
+            return _NO_MATCH
+        return best_idx, best_score
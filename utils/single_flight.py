@@ -0,0 +1,100 @@
+"""
+Collapse concurrent calls for the same key into one execution.
+
+While a call for ``key`` is running, other threads asking for the same key wait
+for it and receive its result (or its exception) instead of repeating the work.
+Nothing is cached: once the call finishes the next caller starts a new one.
+``do_many`` is the batch form: one call loads every key nobody else is loading,
+and keys already in flight (single or batch) are awaited instead.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                call.waiters += 1
+                self._shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def do_many(self, keys: Iterable[Hashable], fn: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """fn(owned_keys) -> {key: result} for the keys not already in flight; returns results for all keys."""
+        owned: Dict[Hashable, _Call] = {}
+        waiting: Dict[Hashable, _Call] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                call = self._calls.get(key)
+                if call is None:
+                    owned[key] = self._calls[key] = _Call()
+                else:
+                    call.waiters += 1
+                    self._shared += 1
+                    waiting[key] = call
+            if owned:
+                self._executions += 1
+        out: Dict[Hashable, Any] = {}
+        if owned:
+            # Own keys are settled before waiting on others, so two overlapping batches cannot deadlock.
+            try:
+                loaded = fn(list(owned))
+                for key, call in owned.items():
+                    call.result = out[key] = loaded.get(key)
+            except BaseException as e:
+                for call in owned.values():
+                    call.error = e
+                raise
+            finally:
+                with self._lock:
+                    for key in owned:
+                        self._calls.pop(key, None)
+                for call in owned.values():
+                    call.done.set()
+        for key, call in waiting.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            out[key] = call.result
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "executions": self._executions, "shared": self._shared}
@@ -6,12 +6,20 @@ import os
 import threading
 import time
 import urllib.error
-import urllib.request
 from typing import Any, Dict, List, Optional, Tuple
 
+from services.http_client import http_client
+from utils.single_flight import SingleFlight
+
 # In-process cache: fewer identical GET /guilds/{id}/roles (Discord global limits are strict).
 _cache_lock = threading.Lock()
 _cache: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}
+# Parallel dashboard requests for one guild wait on a single Discord call (and its 429 retries).
+_roles_flight = SingleFlight()
+
+
+def _api_base_url() -> str:
+    return (os.environ.get("DISCORD_API_BASE_URL") or "https://discord.com/api/v10").rstrip("/")
 
 
 def _cache_ttl_seconds() -> float:
@@ -74,11 +82,19 @@ def fetch_discord_guild_roles(discord_guild_id: int) -> Tuple[List[Dict[str, Any
     if discord_guild_id < 1:
         return [], "Guild has no Discord server ID — set it above and save."
 
+    cached = _cache_get(discord_guild_id)
+    if cached is not None:
+        return cached, None
+    roles, err = _roles_flight.do(discord_guild_id, lambda: _load_guild_roles(discord_guild_id, token))
+    return list(roles), err
+
+
+def _load_guild_roles(discord_guild_id: int, token: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     cached = _cache_get(discord_guild_id)
     if cached is not None:
         return cached, None
 
-    url = f"https://discord.com/api/v10/guilds/{discord_guild_id}/roles"
+    url = f"{_api_base_url()}/guilds/{discord_guild_id}/roles"
     max_attempts = int(os.environ.get("DISCORD_ROLES_MAX_RETRIES", "5"))
     try:
         cap_wait = float(os.environ.get("DISCORD_ROLES_RETRY_CAP_SEC", "60"))
@@ -89,18 +105,19 @@ def fetch_discord_guild_roles(discord_guild_id: int) -> Tuple[List[Dict[str, Any
     last_429_snippet = ""
 
     for attempt in range(max_attempts):
-        req = urllib.request.Request(
-            url,
-            headers={
-                "Authorization": f"Bot {token}",
-                "User-Agent": "DiscordBot (https://github.com/lymp3n/albion-analytics-bot, 1.0)",
-                "Accept": "application/json",
-            },
-            method="GET",
-        )
         try:
-            with urllib.request.urlopen(req, timeout=20) as resp:
-                raw = resp.read().decode("utf-8")
+            # 429 handling stays in this loop (JSON retry_after, user-facing message), so no client retries.
+            raw = http_client().request(
+                "GET",
+                url,
+                headers={
+                    "Authorization": f"Bot {token}",
+                    "User-Agent": "DiscordBot (https://github.com/lymp3n/albion-analytics-bot, 1.0)",
+                    "Accept": "application/json",
+                },
+                timeout=20,
+                retries=0,
+            ).text()
         except urllib.error.HTTPError as e:
             body_txt = ""
             try:
@@ -0,0 +1,59 @@
+"""Background evaluator for economy alert thresholds (keeps GET /economy/data read-only)."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from web_dashboard.economy_db_sync import run_economy_write
+from web_dashboard.economy_service import ensure_economy_schema, evaluate_alerts_if_changed
+
+logger = logging.getLogger("economy_alerts")
+
+_start_lock = threading.Lock()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _interval_seconds() -> float:
+    try:
+        return max(10.0, float(os.environ.get("ECON_ALERT_EVAL_INTERVAL_SEC", "60")))
+    except ValueError:
+        return 60.0
+
+
+def evaluate_alerts_once(*, force: bool = False) -> dict:
+    return run_economy_write(lambda conn, backend: evaluate_alerts_if_changed(conn, backend, force=force))
+
+
+def _run() -> None:
+    schema_ready = False
+    while not _stop.is_set():
+        try:
+            if not schema_ready:
+                run_economy_write(ensure_economy_schema)
+                schema_ready = True
+            out = evaluate_alerts_once()
+            if out.get("evaluated"):
+                transitions = (out.get("state") or {}).get("transitions") or {}
+                logger.info("Economy alerts evaluated (%s), transitions=%s", out.get("signature"), transitions)
+        except Exception:
+            logger.exception("Economy alert evaluation failed")
+        _stop.wait(_interval_seconds())
+
+
+def start_alert_evaluator() -> bool:
+    """Start the daemon thread once per process; returns False if it was already running."""
+    global _thread
+    with _start_lock:
+        if _thread is not None and _thread.is_alive():
+            return False
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="economy-alert-evaluator", daemon=True)
+        _thread.start()
+        return True
+
+
+def stop_alert_evaluator() -> None:
+    _stop.set()
@@ -0,0 +1,77 @@
+"""
+In-process cache for economy dashboard sections.
+
+Each section is stored with the write generations (econ_generations) of the
+domains it depends on; a mutation bumps its domain generation in the same
+transaction, so the next read recomputes only the sections of that domain.
+Generations live in the economy DB, so writes from other processes (bot cog,
+second worker) invalidate correctly too.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+
+class GenerationCache:
+    def __init__(self, max_entries: int = 256):
+        self._max_entries = max(8, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Tuple, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compute(
+        self,
+        section: str,
+        compute: Callable[[], Any],
+        *,
+        generations: Dict[str, int],
+        domains: Iterable[str],
+        params: Hashable = (),
+    ) -> Any:
+        stamp = tuple(generations.get(d, 0) for d in domains)
+        key = (section, params)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] == stamp:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return hit[1]
+            self._misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_or_compute_ttl(self, section: str, compute: Callable[[], Any], *, ttl_seconds: float, params: Hashable = ()) -> Any:
+        """For data without a generation counter (e.g. main bot DB): expire by time bucket."""
+        bucket = int(time.time() // max(1.0, float(ttl_seconds)))
+        return self.get_or_compute(section, compute, generations={"ttl": bucket}, domains=("ttl",), params=params)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / float(total), 4) if total else None,
+            }
+
+
+_data_cache = GenerationCache()
+
+
+def economy_data_cache() -> GenerationCache:
+    return _data_cache
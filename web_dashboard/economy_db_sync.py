@@ -1,26 +1,18 @@
 import os
-import re
 import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Generator, List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Any, Callable, Generator, List, Optional, Tuple, TypeVar
 
+import db_engine
 
-def _pg_dollar_to_psycopg(sql: str, params: tuple) -> Tuple[str, tuple]:
-    expanded: List[Any] = []
-    pattern = re.compile(r"\$(\d+)")
-
-    def repl(match):
-        idx = int(match.group(1)) - 1
-        if idx < 0 or idx >= len(params):
-            raise IndexError(f"SQL placeholder {match.group(0)} out of range for {len(params)} params")
-        expanded.append(params[idx])
-        return "%s"
-
-    return pattern.sub(repl, sql), tuple(expanded)
+T = TypeVar("T")
 
 
 def _normalize_postgres_url(url: str) -> str:
-    return url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url
+    return db_engine.normalize_postgres_url(url)
 
 
 def _economy_db_url() -> str:
@@ -53,72 +45,110 @@ def economy_db_meta() -> dict:
     return {"backend": "postgres", "source": "ECON_DATABASE_URL"}
 
 
+# Seconds a sqlite connection waits for a lock before "database is locked".
+SQLITE_BUSY_TIMEOUT_S = float(os.environ.get("ECON_SQLITE_BUSY_TIMEOUT_S") or 15)
+
+
+def _sqlite_path(url: str) -> str:
+    return db_engine.sqlite_path(url)
+
+
+def _connect_sqlite(path: str) -> sqlite3.Connection:
+    return db_engine.connect_sqlite(path, timeout=SQLITE_BUSY_TIMEOUT_S)
+
+
 @contextmanager
 def get_economy_sync_connection() -> Generator[Tuple[Any, str], None, None]:
-    url = _economy_db_url()
+    """Postgres connections come from the shared db_engine pool (tuple rows, as economy_service expects)."""
+    with db_engine.sync_connection(_economy_db_url(), sqlite_timeout=SQLITE_BUSY_TIMEOUT_S) as (conn, backend):
+        yield conn, backend
 
+
+def run_economy_write(fn: Callable[[Any, str], T]) -> T:
+    """
+    Run a mutation fn(conn, backend) and return its result.
+
+    SQLite: executed on the single writer thread of the DB file (see economy_writer),
+    group-committed with other queued writes. Postgres: executed inline on a pooled
+    connection; the server handles concurrent writers.
+    """
+    url = _economy_db_url()
     if url.startswith("sqlite"):
-        path = url.replace("sqlite:///", "").replace("sqlite://", "")
-        # Normalize relative paths to absolute, and ensure parent dir exists.
-        path = os.path.abspath(path)
-        parent = os.path.dirname(path)
-        if parent:
-            os.makedirs(parent, exist_ok=True)
-        conn = sqlite3.connect(path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        try:
-            yield conn, "sqlite"
-        finally:
-            conn.close()
+        from web_dashboard.economy_writer import writer_for
+
+        path = _sqlite_path(url)
+        return writer_for(path, lambda: _connect_sqlite(path)).run(fn)
+    with get_economy_sync_connection() as (conn, backend):
+        return fn(conn, backend)
+
+
+_ready_days: dict = {}
+_ready_lock = threading.Lock()
+
+
+def ensure_economy_ready() -> None:
+    """
+    Schema setup, migrations and daily closing (ensure_economy_schema) for read paths.
+
+    Runs through run_economy_write once per process and UTC day, so GET handlers
+    never write on their own read connection and only the first request of a day pays for it.
+    """
+    url = _economy_db_url()
+    day = datetime.now(timezone.utc).date().isoformat()
+    if _ready_days.get(url) == day:
         return
+    from web_dashboard.economy_service import ensure_economy_schema
 
-    import psycopg2
-    import psycopg2.extras
+    with _ready_lock:
+        if _ready_days.get(url) == day:
+            return
+        run_economy_write(ensure_economy_schema)
+        _ready_days[url] = day
 
-    dsn = _normalize_postgres_url(url)
-    conn = psycopg2.connect(dsn, connect_timeout=10)
-    try:
-        yield conn, "postgres"
-    finally:
-        conn.close()
+
+_pg_write_executor: Optional[ThreadPoolExecutor] = None
+_pg_write_lock = threading.Lock()
+
+
+def _pg_write_job(fn: Callable[[Any, str], T]) -> T:
+    with get_economy_sync_connection() as (conn, backend):
+        return fn(conn, backend)
+
+
+def submit_economy_write(fn: Callable[[Any, str], T]) -> "Future[T]":
+    """
+    Non-blocking run_economy_write for event-loop callers (await asyncio.wrap_future(...)).
+
+    SQLite: queued on the writer thread. Postgres: a small dedicated pool of threads
+    (ECON_PG_WRITE_WORKERS, default 2) borrowing from the shared connection pool.
+    """
+    global _pg_write_executor
+    url = _economy_db_url()
+    if url.startswith("sqlite"):
+        from web_dashboard.economy_writer import writer_for
+
+        path = _sqlite_path(url)
+        return writer_for(path, lambda: _connect_sqlite(path)).submit(fn)
+    with _pg_write_lock:
+        if _pg_write_executor is None:
+            workers = max(1, int(os.environ.get("ECON_PG_WRITE_WORKERS") or 2))
+            _pg_write_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="economy-pg-writer")
+    return _pg_write_executor.submit(_pg_write_job, fn)
+
+
+def economy_writer_stats() -> Optional[dict]:
+    url = _economy_db_url()
+    if not url.startswith("sqlite"):
+        return None
+    from web_dashboard.economy_writer import writer_stats
+
+    path = _sqlite_path(url)
+    return {"busy_timeout_s": SQLITE_BUSY_TIMEOUT_S, **(writer_stats().get(path) or {"running": False, "jobs": 0})}
 
 
 def fetch_all(conn, backend: str, sql: str, params: Optional[tuple] = None) -> List[dict]:
-    if backend == "postgres":
-        import psycopg2.extras
-
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    else:
-        cur = conn.cursor()
-    p = params or ()
-    if backend == "sqlite":
-        q = re.sub(r"\$\d+", "?", sql)
-        cur.execute(q, p)
-        cols = [d[0] for d in cur.description] if cur.description else []
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
-    q, bind = _pg_dollar_to_psycopg(sql, p)
-    cur.execute(q, bind)
-    return [dict(r) for r in cur.fetchall()]
+    return db_engine.fetch_all(conn, backend, sql, params, source="economy")
 
 
 def fetch_one(conn, backend: str, sql: str, params: Optional[tuple] = None) -> Optional[dict]:
-    if backend == "postgres":
-        import psycopg2.extras
-
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    else:
-        cur = conn.cursor()
-    p = params or ()
-    if backend == "sqlite":
-        q = re.sub(r"\$\d+", "?", sql)
-        cur.execute(q, p)
-        row = cur.fetchone()
-        if not row:
-            return None
-        cols = [d[0] for d in cur.description] if cur.description else []
-        return dict(zip(cols, row))
-    q, bind = _pg_dollar_to_psycopg(sql, p)
-    cur.execute(q, bind)
-    row = cur.fetchone()
-    return dict(row) if row else None
+    return db_engine.fetch_one(conn, backend, sql, params, source="economy")
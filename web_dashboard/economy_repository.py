@@ -0,0 +1,97 @@
+"""
+Async access to the economy DB for the Discord cog (commands/economy.py).
+
+Reads run on the shared db_engine async handle for ECON_DATABASE_URL (asyncpg pool
+or aiosqlite connection, shared with database.Database when both use one URL),
+using the SQL constants defined in economy_service so the dashboard and the bot
+cannot drift. Writes reuse the economy_service functions unchanged: they are
+handed to the economy writer (see economy_db_sync.submit_economy_write) and
+awaited without borrowing a default-executor thread or opening a connection per call.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+import db_engine
+from web_dashboard.economy_db_sync import SQLITE_BUSY_TIMEOUT_S, _economy_db_url, submit_economy_write
+from web_dashboard.economy_service import (
+    CURRENT_BALANCES_SQL,
+    KPI_COUNT_SQL,
+    ROUTING_RULES_SQL,
+    account_balance_items,
+    create_manual_loot_buyback_from_price,
+    create_routed_operation,
+    ensure_economy_schema,
+    issue_regear_request,
+)
+
+T = TypeVar("T")
+
+
+class AsyncEconomyRepository:
+    def __init__(self) -> None:
+        self._url = _economy_db_url()
+        self.backend = db_engine.backend_for(self._url)
+        self._pool = None
+        self._conn = None
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if self._pool is not None or self._conn is not None:
+                return
+            handle = await db_engine.open_async(
+                self._url,
+                max_size=max(1, int(os.environ.get("ECON_ASYNC_POOL_MAX") or 5)),
+                command_timeout=30,
+                sqlite_timeout=SQLITE_BUSY_TIMEOUT_S,
+            )
+            if self.backend == "sqlite":
+                self._conn = handle
+            else:
+                self._pool = handle
+            await asyncio.wrap_future(submit_economy_write(ensure_economy_schema))
+
+    async def close(self) -> None:
+        handle, self._conn, self._pool = self._conn or self._pool, None, None
+        if handle is not None:
+            await db_engine.close_async(handle)
+
+    async def fetch_all(self, sql: str, params: tuple = ()) -> List[dict]:
+        await self.connect()
+        if self.backend == "sqlite":
+            q, bind = db_engine.translate(sql, params, "sqlite")
+            with db_engine.track("economy_async", sql):
+                async with self._conn.execute(q, bind) as cur:
+                    return [dict(r) for r in await cur.fetchall()]
+        async with self._pool.acquire() as conn:
+            with db_engine.track("economy_async", sql):
+                return [dict(r) for r in await conn.fetch(sql, *params)]
+
+    async def fetch_one(self, sql: str, params: tuple = ()) -> Optional[dict]:
+        rows = await self.fetch_all(sql, params)
+        return rows[0] if rows else None
+
+    async def write(self, fn: Callable[[Any, str], T]) -> T:
+        """Run a sync economy_service mutation fn(conn, backend) on the writer and await it."""
+        await self.connect()
+        return await asyncio.wrap_future(submit_economy_write(fn))
+
+    async def routing_rules(self) -> List[dict]:
+        return await self.fetch_all(ROUTING_RULES_SQL)
+
+    async def kpis(self) -> Dict[str, int]:
+        counts = {key: int((await self.fetch_one(sql) or {}).get("c") or 0) for key, sql in KPI_COUNT_SQL.items()}
+        balances = account_balance_items(await self.fetch_all(CURRENT_BALANCES_SQL))
+        return {**counts, "cash_balance": balances["cash_balance"], "energy_balance": balances["energy_balance"]}
+
+    async def create_routed_operation(self, **kwargs) -> dict:
+        return await self.write(lambda conn, backend: create_routed_operation(conn, backend, **kwargs))
+
+    async def create_loot_buyback(self, **kwargs) -> dict:
+        return await self.write(lambda conn, backend: create_manual_loot_buyback_from_price(conn, backend, **kwargs))
+
+    async def issue_regear(self, **kwargs) -> dict:
+        return await self.write(lambda conn, backend: issue_regear_request(conn, backend, **kwargs))
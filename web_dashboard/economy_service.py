@@ -5,11 +5,21 @@ import io
 import json
 import hashlib
 import re
-from difflib import SequenceMatcher
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 
-from services.pricing_client import get_item_price, get_item_price_24h_trimmed_mean, search_item_ids
+from services.cash_forecast import forecast_cash
+from services.downsample import bucket_stats, lttb
+from services.item_catalog import get_item_catalog
+from services.pricing_client import (
+    get_item_price,
+    get_item_price_24h_trimmed_mean,
+    get_items_price_24h_trimmed_mean,
+    search_item_ids,
+    trimmed_city_mean,
+)
+from utils.name_matcher import NameMatcherIndex
+from web_dashboard.economy_cache import GenerationCache
 from web_dashboard.economy_db_sync import fetch_all, fetch_one
 
 
@@ -35,6 +45,49 @@ def _pg_unlock_econ_schema(conn, backend: str) -> None:
     cur.execute("SELECT pg_advisory_unlock(%s)", (_ECON_SCHEMA_LOCK_ID,))
 
 
+# Secondary indexes for the filters/joins in this module (same DDL on both backends).
+# tests/test_economy_query_plans.py checks the SQLite plans; add new ones here, not inline.
+_ECON_INDEXES: Tuple[Tuple[str, str], ...] = (
+    # pending queue / counts, posted-lines-by-date report ranges
+    ("idx_econ_journal_entries_status_created", "econ_journal_entries(status, created_at)"),
+    # lines of one entry (review, recent entries join, checkpoint invalidation)
+    ("idx_econ_journal_lines_entry_account", "econ_journal_lines(entry_id, account_code)"),
+    # open-alert counts and per-type open alert lookup (status first: both queries filter on it)
+    ("idx_econ_alerts_status_type", "econ_alerts(status, alert_type)"),
+    ("idx_econ_import_discrepancies_status", "econ_import_discrepancies(status)"),
+    # covers the time-bounded per-player totals (range on parsed occurred_ts, no table lookups)
+    ("idx_econ_game_log_rows_type_ts", "econ_game_log_rows(log_type, occurred_ts, player_name, amount)"),
+    # armory replay (stock as of / velocity) over a created_at window for all items
+    ("idx_econ_armory_movements_created", "econ_armory_movements(created_at)"),
+    # ORDER BY of the armory stock listing
+    ("idx_econ_armory_stock_listing", "econ_armory_stock(category, item_name, tier, enchant, quality)"),
+)
+
+
+# Read queries shared with the async repository (web_dashboard/economy_repository.py):
+# $N placeholders and no backend branches, so both drivers run the same text.
+ROUTING_RULES_SQL = """
+    SELECT category, debit_account, credit_account, require_approval, tag
+    FROM econ_routing_rules
+    ORDER BY category
+"""
+KPI_COUNT_SQL: Dict[str, str] = {
+    "accounts_count": "SELECT COUNT(*) AS c FROM econ_accounts",
+    "entries_count": "SELECT COUNT(*) AS c FROM econ_journal_entries",
+    "pending_entries": "SELECT COUNT(*) AS c FROM econ_journal_entries WHERE status='pending'",
+    "unresolved_discrepancies": "SELECT COUNT(*) AS c FROM econ_import_discrepancies WHERE status='open'",
+    "open_alerts": "SELECT COUNT(*) AS c FROM econ_alerts WHERE status='open'",
+}
+CURRENT_BALANCES_SQL = """
+    SELECT a.code, a.name, a.kind,
+           COALESCE(b.debit_total,0) AS debit_total,
+           COALESCE(b.credit_total,0) AS credit_total
+    FROM econ_accounts a
+    LEFT JOIN econ_account_balances b ON b.account_code = a.code
+    ORDER BY a.code
+"""
+
+
 def ensure_economy_schema(conn, backend: str, *, with_lock: bool = True) -> None:
     if with_lock:
         _pg_lock_econ_schema(conn, backend)
@@ -155,6 +208,17 @@ def ensure_economy_schema(conn, backend: str, *, with_lock: bool = True) -> None
             )
             cur.execute(
             """
+            CREATE TABLE IF NOT EXISTS econ_player_daily_totals (
+                log_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                net_amount BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (log_type, day, player_name)
+            )
+            """
+            )
+            cur.execute(
+            """
             CREATE UNIQUE INDEX IF NOT EXISTS idx_econ_game_log_rows_unique
             ON econ_game_log_rows(log_type, row_hash)
             """
@@ -296,6 +360,73 @@ def ensure_economy_schema(conn, backend: str, *, with_lock: bool = True) -> None
             ON econ_armory_movements(item_key, created_at DESC)
             """
             )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_account_balances (
+                account_code TEXT PRIMARY KEY,
+                debit_total BIGINT NOT NULL DEFAULT 0,
+                credit_total BIGINT NOT NULL DEFAULT 0,
+                last_entry_id INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_ledger_checkpoints (
+                period_day TEXT NOT NULL,
+                account_code TEXT NOT NULL,
+                debit_total BIGINT NOT NULL DEFAULT 0,
+                credit_total BIGINT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (period_day, account_code)
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_generations (
+                domain TEXT PRIMARY KEY,
+                generation BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_alert_state (
+                state_key TEXT PRIMARY KEY,
+                signature TEXT NOT NULL,
+                state_json TEXT NOT NULL,
+                evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_armory_snapshots (
+                period_day TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                quantity BIGINT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (period_day, item_key)
+            )
+            """
+            )
+            # Market price observations (one row per item/quality/city/market timestamp).
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_price_history (
+                item_id TEXT NOT NULL,
+                quality INTEGER NOT NULL,
+                ts TIMESTAMP NOT NULL,
+                city TEXT NOT NULL,
+                sell_min BIGINT,
+                buy_max BIGINT,
+                PRIMARY KEY (item_id, quality, ts, city)
+            )
+            """
+            )
         else:
             cur.execute(
             """
@@ -415,6 +546,17 @@ def ensure_economy_schema(conn, backend: str, *, with_lock: bool = True) -> None
             )
             cur.execute(
             """
+            CREATE TABLE IF NOT EXISTS econ_player_daily_totals (
+                log_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                net_amount INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (log_type, day, player_name)
+            )
+            """
+            )
+            cur.execute(
+            """
             CREATE UNIQUE INDEX IF NOT EXISTS idx_econ_game_log_rows_unique
             ON econ_game_log_rows(log_type, row_hash)
             """
@@ -557,13 +699,216 @@ def ensure_economy_schema(conn, backend: str, *, with_lock: bool = True) -> None
             ON econ_armory_movements(item_key, created_at DESC)
             """
             )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_account_balances (
+                account_code TEXT PRIMARY KEY,
+                debit_total INTEGER NOT NULL DEFAULT 0,
+                credit_total INTEGER NOT NULL DEFAULT 0,
+                last_entry_id INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_ledger_checkpoints (
+                period_day TEXT NOT NULL,
+                account_code TEXT NOT NULL,
+                debit_total INTEGER NOT NULL DEFAULT 0,
+                credit_total INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (period_day, account_code)
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_generations (
+                domain TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_alert_state (
+                state_key TEXT PRIMARY KEY,
+                signature TEXT NOT NULL,
+                state_json TEXT NOT NULL,
+                evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_armory_snapshots (
+                period_day TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                quantity BIGINT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (period_day, item_key)
+            )
+            """
+            )
+            cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS econ_price_history (
+                item_id TEXT NOT NULL,
+                quality INTEGER NOT NULL,
+                ts TEXT NOT NULL,
+                city TEXT NOT NULL,
+                sell_min INTEGER,
+                buy_max INTEGER,
+                PRIMARY KEY (item_id, quality, ts, city)
+            ) WITHOUT ROWID
+            """
+            )
+        conn.commit()
+        _migrate_econ_columns(conn, backend)
+        for name, target in _ECON_INDEXES:
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        _ensure_journal_search(conn, backend)
         conn.commit()
+        # Must run before seeding: seed entries would otherwise make a partial table look initialized.
+        _backfill_account_balances_if_empty(conn, backend)
+        _backfill_player_daily_totals_if_empty(conn, backend)
         _seed_defaults(conn, backend)
+        # Daily closing: a single MAX() lookup once yesterday is already closed.
+        close_ledger_periods(conn, backend)
+        close_armory_snapshots(conn, backend)
+    except Exception:
+        if backend == "postgres":
+            # Advisory unlock must run in a clean transaction; an aborted one would mask the original error.
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        raise
     finally:
         if with_lock:
             _pg_unlock_econ_schema(conn, backend)
 
 
+def _add_column_if_missing(conn, backend: str, table: str, column: str, decl: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN unless present; True when the column was just added."""
+    cur = conn.cursor()
+    if backend == "postgres":
+        exists = fetch_one(
+            conn,
+            backend,
+            """
+            SELECT 1 AS x FROM information_schema.columns
+            WHERE table_schema=current_schema() AND table_name=$1 AND column_name=$2
+            """,
+            (table, column),
+        )
+    else:
+        cur.execute(f"PRAGMA table_info({table})")
+        exists = any(str(r[1]) == column for r in cur.fetchall())
+    if exists:
+        return False
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    return True
+
+
+def _migrate_econ_columns(conn, backend: str) -> None:
+    # Per-entry line sums, written by _insert_lines (entry listings no longer join the lines).
+    added = _add_column_if_missing(conn, backend, "econ_journal_entries", "debit_sum", "BIGINT NOT NULL DEFAULT 0")
+    added = _add_column_if_missing(conn, backend, "econ_journal_entries", "credit_sum", "BIGINT NOT NULL DEFAULT 0") or added
+    if added:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE econ_journal_entries SET
+              debit_sum = COALESCE((SELECT SUM(l.amount) FROM econ_journal_lines l
+                                    WHERE l.entry_id = econ_journal_entries.id AND l.side='debit'), 0),
+              credit_sum = COALESCE((SELECT SUM(l.amount) FROM econ_journal_lines l
+                                     WHERE l.entry_id = econ_journal_entries.id AND l.side='credit'), 0)
+            """
+        )
+    # Parsed UTC time of game-log rows; occurred_at keeps the raw log string (dedupe hash input).
+    ts_decl = "TIMESTAMP" if backend == "postgres" else "TEXT"
+    if _add_column_if_missing(conn, backend, "econ_game_log_rows", "occurred_ts", ts_decl):
+        conn.commit()
+        if backfill_game_log_timestamps(conn, backend)["parsed"] and fetch_one(
+            conn, backend, "SELECT day FROM econ_player_daily_totals LIMIT 1", ()
+        ):
+            # Rollup days were derived from the raw strings before; re-derive them from occurred_ts.
+            rebuild_player_daily_totals(conn, backend)
+    conn.commit()
+
+
+# Journal text search (category + description): FTS5 external-content table kept in sync by
+# triggers on SQLite, a generated tsvector column with a GIN index on Postgres.
+_JOURNAL_FTS_TABLE = "econ_journal_entries_fts"
+
+
+def _ensure_journal_search(conn, backend: str) -> None:
+    cur = conn.cursor()
+    if backend == "postgres":
+        _add_column_if_missing(
+            conn,
+            backend,
+            "econ_journal_entries",
+            "search_tsv",
+            "tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('simple', COALESCE(category,'') || ' ' || COALESCE(description,''))) STORED",
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_econ_journal_entries_search ON econ_journal_entries USING GIN (search_tsv)")
+        return
+    if _journal_fts_ready(conn, backend):
+        return
+    try:
+        cur.execute(
+            f"""
+            CREATE VIRTUAL TABLE {_JOURNAL_FTS_TABLE} USING fts5(
+                category, description, content='econ_journal_entries', content_rowid='id'
+            )
+            """
+        )
+    except Exception:
+        # SQLite built without FTS5: searches fall back to LIKE.
+        return
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS econ_journal_entries_fts_ai AFTER INSERT ON econ_journal_entries BEGIN
+          INSERT INTO {_JOURNAL_FTS_TABLE}(rowid, category, description) VALUES (new.id, new.category, new.description);
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS econ_journal_entries_fts_ad AFTER DELETE ON econ_journal_entries BEGIN
+          INSERT INTO {_JOURNAL_FTS_TABLE}({_JOURNAL_FTS_TABLE}, rowid, category, description)
+          VALUES ('delete', old.id, old.category, old.description);
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS econ_journal_entries_fts_au AFTER UPDATE OF category, description ON econ_journal_entries BEGIN
+          INSERT INTO {_JOURNAL_FTS_TABLE}({_JOURNAL_FTS_TABLE}, rowid, category, description)
+          VALUES ('delete', old.id, old.category, old.description);
+          INSERT INTO {_JOURNAL_FTS_TABLE}(rowid, category, description) VALUES (new.id, new.category, new.description);
+        END
+        """
+    )
+    cur.execute(f"INSERT INTO {_JOURNAL_FTS_TABLE}({_JOURNAL_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _journal_fts_ready(conn, backend: str) -> bool:
+    if backend == "postgres":
+        return True
+    row = fetch_one(conn, backend, "SELECT name FROM sqlite_master WHERE type='table' AND name=$1", (_JOURNAL_FTS_TABLE,))
+    return bool(row)
+
+
+def _search_terms(text: str) -> List[str]:
+    return re.findall(r"\w+", str(text or "").lower())[:8]
+
+
 def reset_economy_data(conn, backend: str) -> dict:
     """
     Hard reset economy domain only (econ_* tables).
@@ -575,7 +920,9 @@ def reset_economy_data(conn, backend: str) -> dict:
         if backend == "sqlite":
             cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'econ_%'", ())
             rows = cur.fetchall()
-            names = [str(r[0] or "").strip() for r in rows if str(r[0] or "").strip()]
+            names = [str(r[0] or "").strip() for r in rows if str(r[0] or "").strip() not in ("", "econ_generations")]
+            # The FTS index (and its shadow tables) is emptied by the delete trigger on entries.
+            names = [name for name in names if not name.startswith(_JOURNAL_FTS_TABLE)]
             for name in names:
                 cur.execute(f"DELETE FROM {name}")
             # Reset AUTOINCREMENT counters for econ tables.
@@ -586,14 +933,17 @@ def reset_economy_data(conn, backend: str) -> dict:
                 (),
             )
             rows = cur.fetchall()
-            names = [str(r[0] or "").strip() for r in rows if str(r[0] or "").strip()]
+            names = [str(r[0] or "").strip() for r in rows if str(r[0] or "").strip() not in ("", "econ_generations")]
             if names:
                 # TRUNCATE is significantly safer than DROP under concurrency and avoids DDL deadlocks.
-                quoted = ", ".join([f"\"{name.replace('\"', '\"\"')}\"" for name in names])
+                quoted = ", ".join('"' + name.replace('"', '""') + '"' for name in names)
                 cur.execute(f"TRUNCATE TABLE {quoted} RESTART IDENTITY CASCADE")
             # Explicit armory cleanup safety pass (imported item snapshots).
             cur.execute("DELETE FROM econ_armory_movements")
             cur.execute("DELETE FROM econ_armory_stock")
+        # Generations are kept (not wiped) so cached sections keyed on old values can never match again.
+        for domain in ECON_GENERATION_DOMAINS:
+            _bump_generation(conn, backend, domain)
         conn.commit()
         # Re-seed defaults after full data wipe.
         ensure_economy_schema(conn, backend, with_lock=False)
@@ -729,14 +1079,7 @@ def _posted_account_balance(conn, backend: str, account_code: str) -> int:
     row = fetch_one(
         conn,
         backend,
-        """
-        SELECT
-          COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
-          COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total
-        FROM econ_journal_lines l
-        JOIN econ_journal_entries e ON e.id = l.entry_id
-        WHERE e.status='posted' AND l.account_code = $1
-        """,
+        "SELECT debit_total, credit_total FROM econ_account_balances WHERE account_code = $1",
         (str(account_code),),
     )
     debit_total = int((row or {}).get("debit_total") or 0)
@@ -807,9 +1150,7 @@ def _seed_adjust_entry(conn, backend: str, *, category: str, delta: int, asset_c
     else:
         # Decrease asset: Dr equity / Cr asset
         lines = [(equity_code, "debit", amt), (asset_code, "credit", amt)]
-    _validate_double_entry(lines)
-    for acc, side, a in lines:
-        _insert_line(conn, backend, entry_id, acc, side, a)
+    _insert_lines(conn, backend, entry_id, lines, status="posted")
     _log_audit(
         conn,
         backend,
@@ -860,9 +1201,7 @@ def _seed_opening_entry(conn, backend: str, *, category: str, amount: int, asset
         "posted",
     )
     lines = [(asset_code, "debit", int(amount)), (equity_code, "credit", int(amount))]
-    _validate_double_entry(lines)
-    for acc, side, a in lines:
-        _insert_line(conn, backend, entry_id, acc, side, a)
+    _insert_lines(conn, backend, entry_id, lines, status="posted")
     _log_audit(
         conn,
         backend,
@@ -909,6 +1248,7 @@ def set_config_values(conn, backend: str, values: dict, actor: str = "dashboard_
                 """,
                 (key, val),
             )
+    _bump_generation(conn, backend, "config")
     _log_audit(
         conn,
         backend,
@@ -949,6 +1289,7 @@ def apply_treasury_snapshot(conn, backend: str, *, cash: int, energy: int, actor
                 """,
                 (key, val),
             )
+    _bump_generation(conn, backend, "config")
     _log_audit(
         conn,
         backend,
@@ -981,7 +1322,9 @@ def _insert_entry(conn, backend: str, category: str, amount: int, description: s
             """,
             (category, amount, description, actor, source, status),
         )
-        return int(cur.fetchone()[0])
+        entry_id = int(cur.fetchone()[0])
+        _bump_generation(conn, backend, "ledger")
+        return entry_id
     cur.execute(
         """
         INSERT INTO econ_journal_entries (category, amount, description, actor, source, status)
@@ -989,6 +1332,7 @@ def _insert_entry(conn, backend: str, category: str, amount: int, description: s
         """,
         (category, amount, description, actor, source, status),
     )
+    _bump_generation(conn, backend, "ledger")
     return int(cur.lastrowid)
 
 
@@ -1027,6 +1371,31 @@ def _log_audit(conn, backend: str, *, mutation_type: str, entity_type: str, enti
         )
 
 
+def _log_audit_many(conn, backend: str, rows: List[Tuple[str, str, str, str, dict]]) -> None:
+    """Batched _log_audit; rows are (mutation_type, entity_type, entity_id, actor, payload)."""
+    params = [(m, e, str(eid or ""), a or "", json.dumps(p or {}, default=str)) for m, e, eid, a, p in rows]
+    if not params:
+        return
+    cur = conn.cursor()
+    if backend == "postgres":
+        import psycopg2.extras
+
+        psycopg2.extras.execute_values(
+            cur,
+            "INSERT INTO econ_audit_log (mutation_type, entity_type, entity_id, actor, payload_json) VALUES %s",
+            params,
+            page_size=500,
+        )
+    else:
+        cur.executemany(
+            """
+            INSERT INTO econ_audit_log (mutation_type, entity_type, entity_id, actor, payload_json)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            params,
+        )
+
+
 def _validate_double_entry(lines: List[Tuple[str, str, int]]) -> None:
     debit = sum(int(a) for _, side, a in lines if side == "debit")
     credit = sum(int(a) for _, side, a in lines if side == "credit")
@@ -1034,6 +1403,178 @@ def _validate_double_entry(lines: List[Tuple[str, str, int]]) -> None:
         raise ValueError("ERR_UNBALANCED: debit and credit sums must match")
 
 
+# Write domains with a generation counter in econ_generations (cache / alert invalidation).
+ECON_GENERATION_DOMAINS = ("ledger", "armory", "imports", "discrepancies", "alerts", "config")
+
+
+def _bump_generation(conn, backend: str, domain: str) -> None:
+    """Mark a domain as changed; committed together with the caller's mutation."""
+    cur = conn.cursor()
+    if backend == "postgres":
+        cur.execute(
+            """
+            INSERT INTO econ_generations (domain, generation, updated_at) VALUES (%s, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (domain) DO UPDATE SET generation=econ_generations.generation + 1, updated_at=CURRENT_TIMESTAMP
+            """,
+            (domain,),
+        )
+    else:
+        cur.execute(
+            """
+            INSERT INTO econ_generations (domain, generation, updated_at) VALUES (?, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT(domain) DO UPDATE SET generation=generation + 1, updated_at=CURRENT_TIMESTAMP
+            """,
+            (domain,),
+        )
+
+
+def get_generations(conn, backend: str) -> Dict[str, int]:
+    rows = fetch_all(conn, backend, "SELECT domain, generation FROM econ_generations", ())
+    return {str(r["domain"]): int(r["generation"] or 0) for r in rows}
+
+
+def _insert_lines(conn, backend: str, entry_id: int, lines: List[Tuple[str, str, int]], *, status: str) -> None:
+    """Validate and write journal lines; posted entries also update econ_account_balances (same transaction)."""
+    _validate_double_entry(lines)
+    for acc, side, a in lines:
+        _insert_line(conn, backend, entry_id, acc, side, a)
+    debit = sum(int(a) for _, side, a in lines if side == "debit")
+    credit = sum(int(a) for _, side, a in lines if side == "credit")
+    cur = conn.cursor()
+    if backend == "postgres":
+        cur.execute(
+            "UPDATE econ_journal_entries SET debit_sum=debit_sum+%s, credit_sum=credit_sum+%s WHERE id=%s",
+            (debit, credit, int(entry_id)),
+        )
+    else:
+        cur.execute(
+            "UPDATE econ_journal_entries SET debit_sum=debit_sum+?, credit_sum=credit_sum+? WHERE id=?",
+            (debit, credit, int(entry_id)),
+        )
+    if status == "posted":
+        _apply_posted_lines(conn, backend, entry_id, lines)
+
+
+def _apply_posted_lines(conn, backend: str, entry_id: int, lines: List[Tuple[str, str, int]]) -> None:
+    totals: Dict[str, List[int]] = {}
+    for acc, side, a in lines:
+        bucket = totals.setdefault(str(acc), [0, 0])
+        bucket[0 if side == "debit" else 1] += int(a)
+    cur = conn.cursor()
+    for acc, (debit, credit) in totals.items():
+        if backend == "postgres":
+            cur.execute(
+                """
+                INSERT INTO econ_account_balances (account_code, debit_total, credit_total, last_entry_id, updated_at)
+                VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (account_code) DO UPDATE SET
+                  debit_total=econ_account_balances.debit_total + EXCLUDED.debit_total,
+                  credit_total=econ_account_balances.credit_total + EXCLUDED.credit_total,
+                  last_entry_id=GREATEST(econ_account_balances.last_entry_id, EXCLUDED.last_entry_id),
+                  updated_at=CURRENT_TIMESTAMP
+                """,
+                (acc, debit, credit, int(entry_id)),
+            )
+        else:
+            cur.execute(
+                """
+                INSERT INTO econ_account_balances (account_code, debit_total, credit_total, last_entry_id, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(account_code) DO UPDATE SET
+                  debit_total=debit_total + excluded.debit_total,
+                  credit_total=credit_total + excluded.credit_total,
+                  last_entry_id=MAX(last_entry_id, excluded.last_entry_id),
+                  updated_at=CURRENT_TIMESTAMP
+                """,
+                (acc, debit, credit, int(entry_id)),
+            )
+    _invalidate_checkpoints_for_entry(conn, backend, entry_id)
+
+
+_ACCOUNT_BALANCES_FROM_LINES_SQL = """
+    SELECT l.account_code,
+           COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
+           COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total,
+           COALESCE(MAX(l.entry_id),0) AS last_entry_id
+    FROM econ_journal_lines l
+    JOIN econ_journal_entries e ON e.id = l.entry_id
+    WHERE e.status='posted'
+    GROUP BY l.account_code
+"""
+
+
+def rebuild_account_balances(conn, backend: str, actor: str = "system") -> dict:
+    """Recompute econ_account_balances from posted journal lines (repair / first-time backfill)."""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM econ_account_balances")
+    cur.execute(
+        f"""
+        INSERT INTO econ_account_balances (account_code, debit_total, credit_total, last_entry_id, updated_at)
+        SELECT account_code, debit_total, credit_total, last_entry_id, CURRENT_TIMESTAMP
+        FROM ({_ACCOUNT_BALANCES_FROM_LINES_SQL}) src
+        """
+    )
+    accounts = int(cur.rowcount or 0)
+    _bump_generation(conn, backend, "ledger")
+    _log_audit(
+        conn,
+        backend,
+        mutation_type="rebuild_account_balances",
+        entity_type="econ_account_balances",
+        entity_id="all",
+        actor=actor,
+        payload={"accounts": accounts},
+    )
+    conn.commit()
+    return {"ok": True, "accounts": accounts}
+
+
+def verify_account_balances(conn, backend: str) -> dict:
+    """Compare econ_account_balances with totals recomputed from journal lines."""
+    expected = {str(r["account_code"]): r for r in fetch_all(conn, backend, _ACCOUNT_BALANCES_FROM_LINES_SQL, ())}
+    stored = {
+        str(r["account_code"]): r
+        for r in fetch_all(
+            conn, backend, "SELECT account_code, debit_total, credit_total, last_entry_id FROM econ_account_balances", ()
+        )
+    }
+    mismatches: List[dict] = []
+    for code in sorted(set(expected) | set(stored)):
+        exp = expected.get(code) or {}
+        got = stored.get(code) or {}
+        exp_pair = (int(exp.get("debit_total") or 0), int(exp.get("credit_total") or 0))
+        got_pair = (int(got.get("debit_total") or 0), int(got.get("credit_total") or 0))
+        if exp_pair != got_pair:
+            mismatches.append(
+                {
+                    "account_code": code,
+                    "expected_debit": exp_pair[0],
+                    "expected_credit": exp_pair[1],
+                    "stored_debit": got_pair[0],
+                    "stored_credit": got_pair[1],
+                }
+            )
+    return {"ok": not mismatches, "accounts_checked": len(set(expected) | set(stored)), "mismatches": mismatches}
+
+
+def _backfill_account_balances_if_empty(conn, backend: str) -> None:
+    if fetch_one(conn, backend, "SELECT account_code FROM econ_account_balances LIMIT 1", ()):
+        return
+    posted = fetch_one(
+        conn,
+        backend,
+        """
+        SELECT l.id FROM econ_journal_lines l
+        JOIN econ_journal_entries e ON e.id = l.entry_id
+        WHERE e.status='posted'
+        LIMIT 1
+        """,
+        (),
+    )
+    if posted:
+        rebuild_account_balances(conn, backend, actor="system_migration")
+
+
 def create_routed_operation(
     conn,
     backend: str,
@@ -1058,9 +1599,7 @@ def create_routed_operation(
     status = "pending" if bool(rule.get("require_approval")) else "posted"
     entry_id = _insert_entry(conn, backend, category, amount, description, actor, source, status)
     lines = [(rule["debit_account"], "debit", amount), (rule["credit_account"], "credit", amount)]
-    _validate_double_entry(lines)
-    for acc, side, a in lines:
-        _insert_line(conn, backend, entry_id, acc, side, a)
+    _insert_lines(conn, backend, entry_id, lines, status=status)
     _log_audit(
         conn,
         backend,
@@ -1074,6 +1613,191 @@ def create_routed_operation(
     return {"entry_id": entry_id, "status": status, "category": category, "amount": amount}
 
 
+ROUTED_BATCH_MAX_ITEMS = 500
+
+
+def create_routed_operations_batch(
+    conn,
+    backend: str,
+    operations: List[dict],
+    *,
+    actor: str = "",
+    source: str = "manual",
+) -> dict:
+    """
+    Post many routed operations (create_routed_operation fields per item) in one transaction.
+
+    Routing rules are read once and every item is validated before anything is written; if
+    any item is invalid nothing is written and the report carries the per-item errors
+    (ok=False). Entries, lines and audit rows are inserted with bulk statements.
+    """
+    ops = list(operations or [])
+    if not ops:
+        raise ValueError("operations must be a non-empty list")
+    if len(ops) > ROUTED_BATCH_MAX_ITEMS:
+        raise ValueError(f"At most {ROUTED_BATCH_MAX_ITEMS} operations per batch")
+    rules = {
+        str(r["category"]): r
+        for r in fetch_all(
+            conn,
+            backend,
+            "SELECT category, debit_account, credit_account, require_approval, tag FROM econ_routing_rules",
+            (),
+        )
+    }
+    items: List[dict] = []
+    planned: List[dict] = []
+    for idx, op in enumerate(ops):
+        try:
+            if not isinstance(op, dict):
+                raise ValueError("operation must be an object")
+            category = str(op.get("category") or "").strip()
+            try:
+                amount = int(op.get("amount") or 0)
+            except (TypeError, ValueError):
+                raise ValueError("Amount must be an integer")
+            if amount <= 0:
+                raise ValueError("Amount must be positive")
+            rule = rules.get(category)
+            if not rule:
+                raise ValueError(f"Unknown category: {category}")
+            lines = [(rule["debit_account"], "debit", amount), (rule["credit_account"], "credit", amount)]
+            _validate_double_entry(lines)
+        except ValueError as e:
+            items.append({"index": idx, "ok": False, "error": str(e)})
+            continue
+        planned.append(
+            {
+                "index": idx,
+                "category": category,
+                "amount": amount,
+                "description": str(op.get("description") or "").strip(),
+                "actor": str(op.get("actor") or actor or "").strip(),
+                "source": str(op.get("source") or source or "").strip(),
+                "status": "pending" if bool(rule.get("require_approval")) else "posted",
+                "lines": lines,
+            }
+        )
+        items.append({"index": idx, "ok": True})
+    if len(planned) != len(ops):
+        return {"ok": False, "committed": False, "count": 0, "errors": sum(1 for it in items if not it["ok"]), "items": items}
+
+    entry_rows = [
+        (p["category"], p["amount"], p["description"], p["actor"], p["source"], p["status"], p["amount"], p["amount"])
+        for p in planned
+    ]
+    cur = conn.cursor()
+    try:
+        _bump_generation(conn, backend, "ledger")
+        if backend == "postgres":
+            import psycopg2.extras
+
+            id_rows = psycopg2.extras.execute_values(
+                cur,
+                """
+                INSERT INTO econ_journal_entries (category, amount, description, actor, source, status, debit_sum, credit_sum)
+                VALUES %s
+                RETURNING id
+                """,
+                entry_rows,
+                page_size=500,
+                fetch=True,
+            )
+            entry_ids = [int(r[0]) for r in id_rows]
+        else:
+            # The generation bump took the write lock, so ids above the current max are ours.
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM econ_journal_entries")
+            max_before = int(cur.fetchone()[0])
+            cur.executemany(
+                """
+                INSERT INTO econ_journal_entries (category, amount, description, actor, source, status, debit_sum, credit_sum)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                entry_rows,
+            )
+            cur.execute("SELECT id FROM econ_journal_entries WHERE id > ? ORDER BY id", (max_before,))
+            entry_ids = [int(r[0]) for r in cur.fetchall()]
+        if len(entry_ids) != len(planned):
+            raise RuntimeError("routed batch: inserted entry ids do not match the batch")
+
+        line_rows = [(eid, acc, side, a) for eid, p in zip(entry_ids, planned) for acc, side, a in p["lines"]]
+        if backend == "postgres":
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO econ_journal_lines (entry_id, account_code, side, amount) VALUES %s",
+                line_rows,
+                page_size=1000,
+            )
+        else:
+            cur.executemany("INSERT INTO econ_journal_lines (entry_id, account_code, side, amount) VALUES (?, ?, ?, ?)", line_rows)
+        posted = [(eid, p) for eid, p in zip(entry_ids, planned) if p["status"] == "posted"]
+        if posted:
+            # One balance upsert per account for the whole batch.
+            _apply_posted_lines(conn, backend, max(eid for eid, _ in posted), [ln for _, p in posted for ln in p["lines"]])
+        _log_audit_many(
+            conn,
+            backend,
+            [
+                (
+                    "create_routed_operation",
+                    "journal_entry",
+                    str(eid),
+                    p["actor"],
+                    {"category": p["category"], "amount": p["amount"], "source": p["source"], "status": p["status"], "batch": True},
+                )
+                for eid, p in zip(entry_ids, planned)
+            ],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    for item, eid, p in zip(items, entry_ids, planned):
+        item.update({"entry_id": eid, "status": p["status"], "category": p["category"], "amount": p["amount"]})
+    return {"ok": True, "committed": True, "count": len(entry_ids), "errors": 0, "items": items}
+
+
+def _keyset_clause(column: str, params: List[object], before_id, after_id) -> Tuple[str, str, bool]:
+    """Keyset page bounds on an id column: (condition or "", ORDER BY direction, reverse rows).
+
+    before_id pages back through history (id < x, newest first); after_id pages towards
+    newer rows (id > x, read oldest first then reversed so output stays newest first).
+    """
+    if before_id not in (None, ""):
+        params.append(int(before_id))
+        return f"{column} < ${len(params)}", "DESC", False
+    if after_id not in (None, ""):
+        params.append(int(after_id))
+        return f"{column} > ${len(params)}", "ASC", True
+    return "", "DESC", False
+
+
+# (min, max) page size of each keyset-paged history reader. Callers that build cursors
+# (keyset_page) must clamp with the same bounds, or a clamped page looks like the last one.
+HISTORY_PAGE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "entries": (10, 500),
+    "audit": (1, 1000),
+    "armory_movements": (1, 2000),
+    "discrepancies": (1, 500),
+}
+
+
+def clamp_page_limit(kind: str, limit: int) -> int:
+    low, high = HISTORY_PAGE_LIMITS[kind]
+    return max(low, min(int(limit), high))
+
+
+def keyset_page(rows: List[dict], limit: int) -> dict:
+    """Wrap a newest-first page with the cursors for the next/previous request."""
+    ids = [int(r["id"]) for r in rows if r.get("id") is not None]
+    return {
+        "rows": rows,
+        "limit": int(limit),
+        "next_before_id": min(ids) if ids and len(rows) >= int(limit) else None,
+        "prev_after_id": max(ids) if ids else None,
+    }
+
+
 def list_recent_entries(
     conn,
     backend: str,
@@ -1082,8 +1806,11 @@ def list_recent_entries(
     status: str = "",
     category_like: str = "",
     source_like: str = "",
+    search: str = "",
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
 ) -> List[dict]:
-    lim = max(10, min(int(limit), 500))
+    lim = clamp_page_limit("entries", limit)
     where = []
     params: List[object] = []
     if status in ("posted", "pending", "rejected"):
@@ -1097,24 +1824,35 @@ def list_recent_entries(
         idx = len(params) + 1
         where.append(f"LOWER(COALESCE(e.source,'')) LIKE LOWER(${idx})")
         params.append(f"%{source_like.strip()}%")
+    terms = _search_terms(search)
+    if terms and backend == "postgres":
+        params.append(" & ".join(f"{t}:*" for t in terms))
+        where.append(f"e.search_tsv @@ to_tsquery('simple', ${len(params)})")
+    elif terms and _journal_fts_ready(conn, backend):
+        params.append(" ".join(f'"{t}"*' for t in terms))
+        where.append(f"e.id IN (SELECT rowid FROM {_JOURNAL_FTS_TABLE} WHERE {_JOURNAL_FTS_TABLE} MATCH ${len(params)})")
+    elif terms:
+        for t in terms:
+            params.append(f"%{t}%")
+            where.append(f"LOWER(e.category || ' ' || COALESCE(e.description,'')) LIKE ${len(params)}")
+    bound, direction, reverse = _keyset_clause("e.id", params, before_id, after_id)
+    if bound:
+        where.append(bound)
     where_sql = ("WHERE " + " AND ".join(where)) if where else ""
     rows = fetch_all(
         conn,
         backend,
         f"""
         SELECT e.id, e.created_at, e.category, e.amount, e.description, e.actor, e.source, e.status,
-               SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END) AS debit_sum,
-               SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END) AS credit_sum
+               e.debit_sum, e.credit_sum
         FROM econ_journal_entries e
-        LEFT JOIN econ_journal_lines l ON l.entry_id = e.id
         {where_sql}
-        GROUP BY e.id
-        ORDER BY e.id DESC
+        ORDER BY e.id {direction}
         LIMIT {lim}
         """,
         tuple(params),
     )
-    return rows
+    return rows[::-1] if reverse else rows
 
 
 def list_tasks(conn, backend: str) -> List[dict]:
@@ -1156,6 +1894,7 @@ def upsert_task(conn, backend: str, *, task_id: Optional[int], title: str, descr
                 """,
                 (title.strip(), description.strip(), reward_amount, 1 if active else 0, int(task_id)),
             )
+        _bump_generation(conn, backend, "config")
         _log_audit(
             conn,
             backend,
@@ -1187,6 +1926,7 @@ def upsert_task(conn, backend: str, *, task_id: Optional[int], title: str, descr
             (title.strip(), description.strip(), reward_amount, 1 if active else 0),
         )
         new_id = int(cur.lastrowid)
+    _bump_generation(conn, backend, "config")
     _log_audit(
         conn,
         backend,
@@ -1207,6 +1947,7 @@ def delete_task(conn, backend: str, task_id: int) -> int:
     else:
         cur.execute("DELETE FROM econ_guild_bonus_tasks WHERE id=?", (int(task_id),))
     if int(cur.rowcount or 0) > 0:
+        _bump_generation(conn, backend, "config")
         _log_audit(
             conn,
             backend,
@@ -1279,9 +2020,7 @@ def award_task_completion(
         "posted",
     )
     lines = [("5200", "debit", reward_total), ("2000", "credit", reward_total)]
-    _validate_double_entry(lines)
-    for acc, side, amt in lines:
-        _insert_line(conn, backend, entry_id, acc, side, amt)
+    _insert_lines(conn, backend, entry_id, lines, status="posted")
     _log_audit(
         conn,
         backend,
@@ -1408,14 +2147,13 @@ def create_loot_buyback_request(
             "posted",
         )
         lines = [("1200", "debit", payout_total), ("1000", "credit", payout_total)]
-        _validate_double_entry(lines)
-        for acc, side, amt in lines:
-            _insert_line(conn, backend, entry_id, acc, side, amt)
+        _insert_lines(conn, backend, entry_id, lines, status="posted")
         if backend == "postgres":
             cur.execute("UPDATE econ_loot_buyback_requests SET journal_entry_id=%s WHERE id=%s", (entry_id, req_id))
         else:
             cur.execute("UPDATE econ_loot_buyback_requests SET journal_entry_id=? WHERE id=?", (entry_id, req_id))
 
+    _bump_generation(conn, backend, "ledger")
     _log_audit(
         conn,
         backend,
@@ -1531,9 +2269,7 @@ def create_manual_loot_buyback_from_price(
         "posted",
     )
     lines = [("1200", "debit", payout_total), ("1000", "credit", payout_total)]
-    _validate_double_entry(lines)
-    for acc, side, amt in lines:
-        _insert_line(conn, backend, entry_id, acc, side, amt)
+    _insert_lines(conn, backend, entry_id, lines, status="posted")
     if backend == "postgres":
         cur.execute("UPDATE econ_loot_buyback_requests SET journal_entry_id=%s WHERE id=%s", (entry_id, req_id))
     else:
@@ -1617,6 +2353,7 @@ def create_regear_request(
             (player_name, content_type, item_id, quantity, unit_cost, screenshot_url, note.strip() or None),
         )
         req_id = int(cur.lastrowid)
+    _bump_generation(conn, backend, "ledger")
     _log_audit(
         conn,
         backend,
@@ -1674,9 +2411,7 @@ def issue_regear_request(
         "posted",
     )
     lines = [("5210", "debit", total_cost), ("1210", "credit", total_cost)]
-    _validate_double_entry(lines)
-    for acc, side, amt in lines:
-        _insert_line(conn, backend, entry_id, acc, side, amt)
+    _insert_lines(conn, backend, entry_id, lines, status="posted")
     cur = conn.cursor()
     if backend == "postgres":
         cur.execute(
@@ -1755,16 +2490,7 @@ def list_regear_requests(conn, backend: str, limit: int = 80) -> List[dict]:
 
 
 def list_routing_rules(conn, backend: str) -> List[dict]:
-    return fetch_all(
-        conn,
-        backend,
-        """
-        SELECT category, debit_account, credit_account, require_approval, tag
-        FROM econ_routing_rules
-        ORDER BY category
-        """,
-        (),
-    )
+    return fetch_all(conn, backend, ROUTING_RULES_SQL, ())
 
 
 def upsert_routing_rule(
@@ -1806,6 +2532,7 @@ def upsert_routing_rule(
             """,
             (category.strip(), debit_account.strip(), credit_account.strip(), 1 if require_approval else 0, tag.strip() or None),
         )
+    _bump_generation(conn, backend, "config")
     _log_audit(
         conn,
         backend,
@@ -1898,6 +2625,7 @@ def import_game_log_csv(conn, backend: str, *, log_type: str, content: str, smar
     _upsert_import_player_totals(conn, backend, import_id=import_id, log_type=log_type, totals=player_totals)
     discrepancies = _build_import_discrepancies(conn, backend, import_id=import_id, rows=unique_rows)
     summary["discrepancies"] = discrepancies
+    _bump_generation(conn, backend, "imports")
     _log_audit(
         conn,
         backend,
@@ -1936,30 +2664,208 @@ def _dedupe_rows_for_import(conn, backend: str, *, log_type: str, rows: List[dic
 
 def _persist_import_rows(conn, backend: str, *, import_id: int, log_type: str, rows: List[dict]) -> None:
     cur = conn.cursor()
-    for row in rows:
+    daily: Dict[Tuple[str, str], int] = {}
+    raw_dates = [_norm_str(row.get("Date") or row.get("date") or row.get("Timestamp") or row.get("timestamp")) for row in rows]
+    day_first = _log_dates_day_first(raw_dates)
+    for row, occurred_at in zip(rows, raw_dates):
         row_hash = _log_row_hash(log_type=log_type, row=row)
-        occurred_at = _norm_str(row.get("Date") or row.get("date") or row.get("Timestamp") or row.get("timestamp"))
+        occurred_ts = _parse_log_timestamp(occurred_at, day_first=day_first)
         player_name = _guess_name(row) or None
         operation = _norm_str(row.get("Operation") or row.get("Type") or row.get("operation") or row.get("type")) or None
         amount = int(_to_int_amount(row.get("Amount")))
         if backend == "postgres":
             cur.execute(
                 """
-                INSERT INTO econ_game_log_rows (import_id, log_type, row_hash, occurred_at, player_name, operation, amount)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO econ_game_log_rows (import_id, log_type, row_hash, occurred_at, occurred_ts, player_name, operation, amount)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (log_type, row_hash) DO NOTHING
                 """,
-                (int(import_id), str(log_type), row_hash, occurred_at, player_name, operation, amount),
+                (int(import_id), str(log_type), row_hash, occurred_at, occurred_ts, player_name, operation, amount),
             )
         else:
             cur.execute(
                 """
-                INSERT OR IGNORE INTO econ_game_log_rows (import_id, log_type, row_hash, occurred_at, player_name, operation, amount)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT OR IGNORE INTO econ_game_log_rows (import_id, log_type, row_hash, occurred_at, occurred_ts, player_name, operation, amount)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (int(import_id), str(log_type), row_hash, occurred_at, occurred_ts, player_name, operation, amount),
+            )
+        if cur.rowcount == 1:
+            key = ((occurred_ts or "")[:10], _rollup_player(player_name))
+            daily[key] = daily.get(key, 0) + amount
+    _add_player_daily_totals(conn, backend, log_type=log_type, daily=daily)
+    conn.commit()
+
+
+# Albion log dates: ISO ('2024-05-02 10:00:00', '2024-05-02T10:00:00Z', offsets), year-first
+# with slashes, and client-locale day/month forms ('05/02/2024 10:00:00 AM', '02.05.2024 10:00').
+# Slash dates are month-first (game client default) unless the import has a first field > 12;
+# dotted dates are always day-first. Game time is UTC; explicit offsets are converted.
+_LOG_DMY_RE = re.compile(
+    r"^(\d{1,2})([./-])(\d{1,2})\2(\d{4})(?:[ ,T]+(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?\s*([AaPp][Mm])?)?$"
+)
+
+
+def _log_dates_day_first(values: List[str]) -> bool:
+    for v in values:
+        m = _LOG_DMY_RE.match(v or "")
+        if m and m.group(2) == "/" and int(m.group(1)) > 12:
+            return True
+    return False
+
+
+def _parse_log_timestamp(raw: object, *, day_first: bool = False) -> Optional[str]:
+    """Raw log date -> 'YYYY-MM-DD HH:MM:SS' UTC, or None when empty/unrecognised."""
+    s = _norm_str(raw)
+    if not s:
+        return None
+    if re.match(r"^\d{4}[-/]\d{1,2}[-/]\d{1,2}", s):
+        iso = re.sub(r"^(\d{4})/(\d{1,2})/(\d{1,2})", lambda m: f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}", s)
+        if iso.endswith(("Z", "z")):
+            iso = iso[:-1] + "+00:00"
+        try:
+            dt = datetime.fromisoformat(iso)
+        except ValueError:
+            return None
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+    m = _LOG_DMY_RE.match(s)
+    if not m:
+        return None
+    a, sep, b, year = int(m.group(1)), m.group(2), int(m.group(3)), int(m.group(4))
+    day, month = (a, b) if (sep == "." or day_first or a > 12) else (b, a)
+    hour, minute, second = int(m.group(5) or 0), int(m.group(6) or 0), int(m.group(7) or 0)
+    meridiem = (m.group(8) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    try:
+        return datetime(year, month, day, hour, minute, second).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def backfill_game_log_timestamps(conn, backend: str, *, batch_size: int = 5000) -> dict:
+    """Fill occurred_ts for rows imported before it existed (day/month order inferred per import)."""
+
+    def batches():
+        last_id = 0
+        while True:
+            rows = fetch_all(
+                conn,
+                backend,
+                f"""
+                SELECT id, import_id, occurred_at FROM econ_game_log_rows
+                WHERE id > $1 AND occurred_ts IS NULL
+                ORDER BY id
+                LIMIT {int(batch_size)}
                 """,
-                (int(import_id), str(log_type), row_hash, occurred_at, player_name, operation, amount),
+                (last_id,),
             )
+            if not rows:
+                return
+            last_id = int(rows[-1]["id"])
+            yield rows
+
+    # First pass: one slash date with a first field > 12 makes its whole import day-first.
+    day_first: Dict[int, bool] = {}
+    for rows in batches():
+        for r in rows:
+            iid = int(r["import_id"])
+            if not day_first.get(iid):
+                day_first[iid] = _log_dates_day_first([_norm_str(r.get("occurred_at"))])
+    parsed = unparsed = 0
+    cur = conn.cursor()
+    for rows in batches():
+        updates = []
+        for r in rows:
+            ts = _parse_log_timestamp(r.get("occurred_at"), day_first=day_first.get(int(r["import_id"]), False))
+            if ts is None:
+                unparsed += 1
+                continue
+            updates.append((ts, int(r["id"])))
+        parsed += len(updates)
+        if updates:
+            if backend == "postgres":
+                cur.executemany("UPDATE econ_game_log_rows SET occurred_ts=%s WHERE id=%s", updates)
+            else:
+                cur.executemany("UPDATE econ_game_log_rows SET occurred_ts=? WHERE id=?", updates)
+        conn.commit()
+    return {"parsed": parsed, "unparsed": unparsed}
+
+
+# econ_player_daily_totals: net amount per (log_type, UTC day, player) over econ_game_log_rows,
+# added to in the same transaction as the rows. day is the date of occurred_ts, '' for undated
+# (or unparseable) rows; player_name is normalized like the old GROUP BY ('unknown' when blank).
+_LOG_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _rollup_player(player_name: object) -> str:
+    return str(player_name or "").strip() or "unknown"
+
+
+def _add_player_daily_totals(conn, backend: str, *, log_type: str, daily: Dict[Tuple[str, str], int]) -> None:
+    if not daily:
+        return
+    cur = conn.cursor()
+    params = [(str(log_type), day, player, int(net)) for (day, player), net in daily.items()]
+    if backend == "postgres":
+        import psycopg2.extras
+
+        psycopg2.extras.execute_values(
+            cur,
+            """
+            INSERT INTO econ_player_daily_totals (log_type, day, player_name, net_amount) VALUES %s
+            ON CONFLICT (log_type, day, player_name)
+            DO UPDATE SET net_amount = econ_player_daily_totals.net_amount + EXCLUDED.net_amount
+            """,
+            params,
+            page_size=500,
+        )
+    else:
+        cur.executemany(
+            """
+            INSERT INTO econ_player_daily_totals (log_type, day, player_name, net_amount) VALUES (?, ?, ?, ?)
+            ON CONFLICT (log_type, day, player_name)
+            DO UPDATE SET net_amount = econ_player_daily_totals.net_amount + excluded.net_amount
+            """,
+            params,
+        )
+
+
+def rebuild_player_daily_totals(conn, backend: str) -> dict:
+    """Recompute econ_player_daily_totals from econ_game_log_rows (one-shot backfill / repair)."""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM econ_player_daily_totals")
+    if backend == "postgres":
+        day_expr = "COALESCE(to_char(occurred_ts, 'YYYY-MM-DD'), '')"
+    else:
+        day_expr = "COALESCE(SUBSTR(occurred_ts, 1, 10), '')"
+    cur.execute(
+        f"""
+        INSERT INTO econ_player_daily_totals (log_type, day, player_name, net_amount)
+        SELECT log_type, day, player_name, SUM(amount)
+        FROM (
+            SELECT log_type, {day_expr} AS day,
+                   COALESCE(NULLIF(TRIM(player_name), ''), 'unknown') AS player_name, amount
+            FROM econ_game_log_rows
+        ) r
+        GROUP BY log_type, day, player_name
+        """
+    )
+    _bump_generation(conn, backend, "imports")
     conn.commit()
+    row = fetch_one(conn, backend, "SELECT COUNT(*) AS c FROM econ_player_daily_totals", ())
+    return {"daily_rows": int((row or {}).get("c") or 0)}
+
+
+def _backfill_player_daily_totals_if_empty(conn, backend: str) -> None:
+    if fetch_one(conn, backend, "SELECT day FROM econ_player_daily_totals LIMIT 1", ()):
+        return
+    if fetch_one(conn, backend, "SELECT id FROM econ_game_log_rows LIMIT 1", ()):
+        rebuild_player_daily_totals(conn, backend)
 
 
 def _upsert_import_player_totals(conn, backend: str, *, import_id: int, log_type: str, totals: Dict[str, int]) -> None:
@@ -2072,12 +2978,35 @@ def list_current_player_totals(
     params: List[object] = [log_type]
     date_from_s = str(date_from or "").strip()
     date_to_s = str(date_to or "").strip()
+    # Whole-day bounds (or none) are answered from the daily rollup; date_to is then inclusive.
+    if all(not d or _LOG_DAY_RE.fullmatch(d) for d in (date_from_s, date_to_s)):
+        return _list_player_totals_from_rollup(
+            conn,
+            backend,
+            log_type=log_type,
+            sign=sign_norm,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            day_from=date_from_s,
+            day_to=date_to_s,
+            limit=lim,
+        )
+    # Range on the parsed occurred_ts; undated rows (NULL) still count when only date_to is given.
     if date_from_s:
-        where.append(f"COALESCE(NULLIF(TRIM(r.occurred_at), ''), '0000-00-00 00:00:00') >= ${len(params)+1}")
-        params.append(date_from_s)
+        ts_from = _parse_log_timestamp(date_from_s)
+        if ts_from is None:
+            raise ValueError("date_from must be a date or UTC timestamp (YYYY-MM-DD HH:MM:SS)")
+        where.append(f"r.occurred_ts >= ${len(params)+1}")
+        params.append(ts_from)
     if date_to_s:
-        where.append(f"COALESCE(NULLIF(TRIM(r.occurred_at), ''), '0000-00-00 00:00:00') <= ${len(params)+1}")
-        params.append(date_to_s)
+        ts_to = _parse_log_timestamp(date_to_s)
+        if ts_to is None:
+            raise ValueError("date_to must be a date or UTC timestamp (YYYY-MM-DD HH:MM:SS)")
+        if date_from_s:
+            where.append(f"r.occurred_ts <= ${len(params)+1}")
+        else:
+            where.append(f"(r.occurred_ts <= ${len(params)+1} OR r.occurred_ts IS NULL)")
+        params.append(ts_to)
     where_sql = " AND ".join(where)
     having_parts: List[str] = []
     if sign_norm == "pos":
@@ -2106,6 +3035,60 @@ def list_current_player_totals(
         """,
         tuple(params),
     )
+    return _player_totals_out(rows)
+
+
+def _list_player_totals_from_rollup(
+    conn,
+    backend: str,
+    *,
+    log_type: str,
+    sign: str,
+    min_amount: Optional[int],
+    max_amount: Optional[int],
+    day_from: str,
+    day_to: str,
+    limit: int,
+) -> List[dict]:
+    where = ["d.log_type = $1"]
+    params: List[object] = [log_type]
+    # Undated rows have day '' and so sort before any date, like the old occurred_at comparisons.
+    if day_from:
+        params.append(day_from)
+        where.append(f"d.day >= ${len(params)}")
+    if day_to:
+        params.append(day_to)
+        where.append(f"d.day <= ${len(params)}")
+    having_parts: List[str] = []
+    if sign == "pos":
+        having_parts.append("SUM(d.net_amount) > 0")
+    if sign == "neg":
+        having_parts.append("SUM(d.net_amount) < 0")
+    if min_amount is not None:
+        params.append(int(min_amount))
+        having_parts.append(f"SUM(d.net_amount) >= ${len(params)}")
+    if max_amount is not None:
+        params.append(int(max_amount))
+        having_parts.append(f"SUM(d.net_amount) <= ${len(params)}")
+    having_sql = ("HAVING " + " AND ".join(having_parts)) if having_parts else ""
+    rows = fetch_all(
+        conn,
+        backend,
+        f"""
+        SELECT d.player_name, SUM(d.net_amount) AS net_amount
+        FROM econ_player_daily_totals d
+        WHERE {" AND ".join(where)}
+        GROUP BY d.player_name
+        {having_sql}
+        ORDER BY SUM(d.net_amount) ASC, d.player_name ASC
+        LIMIT {int(limit)}
+        """,
+        tuple(params),
+    )
+    return _player_totals_out(rows)
+
+
+def _player_totals_out(rows: List[dict]) -> List[dict]:
     out: List[dict] = []
     for r in rows:
         rec = dict(r)
@@ -2141,6 +3124,7 @@ def economy_db_counts(conn, backend: str) -> dict:
         "econ_armory_movements": c("SELECT COUNT(*) AS c FROM econ_armory_movements"),
         "econ_routing_rules": c("SELECT COUNT(*) AS c FROM econ_routing_rules"),
         "econ_config": c("SELECT COUNT(*) AS c FROM econ_config"),
+        "econ_price_history": c("SELECT COUNT(*) AS c FROM econ_price_history"),
     }
 
 
@@ -2169,20 +3153,7 @@ def list_game_log_imports(conn, backend: str, limit: int = 30) -> List[dict]:
 
 
 def economy_kpis(conn, backend: str) -> dict:
-    accounts = fetch_all(conn, backend, "SELECT code, name, kind FROM econ_accounts ORDER BY code", ())
-    total_entries = fetch_one(conn, backend, "SELECT COUNT(*) AS c FROM econ_journal_entries", ())
-    pending = fetch_one(conn, backend, "SELECT COUNT(*) AS c FROM econ_journal_entries WHERE status='pending'", ())
-    unresolved_discrepancies = fetch_one(
-        conn, backend, "SELECT COUNT(*) AS c FROM econ_import_discrepancies WHERE status='open'", ()
-    )
-    open_alerts = fetch_one(conn, backend, "SELECT COUNT(*) AS c FROM econ_alerts WHERE status='open'", ())
-    return {
-        "accounts_count": len(accounts),
-        "entries_count": int((total_entries or {}).get("c") or 0),
-        "pending_entries": int((pending or {}).get("c") or 0),
-        "unresolved_discrepancies": int((unresolved_discrepancies or {}).get("c") or 0),
-        "open_alerts": int((open_alerts or {}).get("c") or 0),
-    }
+    return {key: int((fetch_one(conn, backend, sql, ()) or {}).get("c") or 0) for key, sql in KPI_COUNT_SQL.items()}
 
 
 def list_pending_approvals(conn, backend: str, limit: int = 100) -> List[dict]:
@@ -2217,10 +3188,31 @@ def review_pending_entry(conn, backend: str, *, entry_id: int, action: str, revi
         raise ValueError("Entry is not pending")
     new_status = "posted" if action_norm == "approve" else "rejected"
     cur = conn.cursor()
+    # Conditional on 'pending': of two concurrent reviews only one flips the row (and applies balances).
     if backend == "postgres":
-        cur.execute("UPDATE econ_journal_entries SET status=%s WHERE id=%s", (new_status, int(entry_id)))
+        cur.execute(
+            "UPDATE econ_journal_entries SET status=%s WHERE id=%s AND status='pending'", (new_status, int(entry_id))
+        )
     else:
-        cur.execute("UPDATE econ_journal_entries SET status=? WHERE id=?", (new_status, int(entry_id)))
+        cur.execute("UPDATE econ_journal_entries SET status=? WHERE id=? AND status='pending'", (new_status, int(entry_id)))
+    if cur.rowcount != 1:
+        conn.rollback()
+        raise ValueError("Entry is not pending")
+    _bump_generation(conn, backend, "ledger")
+    if new_status == "posted":
+        # Pending lines were never counted; rejected entries simply stay out of the balances.
+        lines = fetch_all(
+            conn,
+            backend,
+            "SELECT account_code, side, amount FROM econ_journal_lines WHERE entry_id=$1",
+            (int(entry_id),),
+        )
+        _apply_posted_lines(
+            conn,
+            backend,
+            int(entry_id),
+            [(str(r["account_code"]), str(r["side"]), int(r["amount"] or 0)) for r in lines],
+        )
     _log_audit(
         conn,
         backend,
@@ -2234,19 +3226,26 @@ def review_pending_entry(conn, backend: str, *, entry_id: int, action: str, revi
     return {"entry_id": int(entry_id), "status": new_status}
 
 
-def list_audit_trail(conn, backend: str, limit: int = 250) -> List[dict]:
-    lim = max(1, min(int(limit), 1000))
+def list_audit_trail(
+    conn, backend: str, limit: int = 250, *, before_id: Optional[int] = None, after_id: Optional[int] = None
+) -> List[dict]:
+    lim = clamp_page_limit("audit", limit)
+    params: List[object] = []
+    bound, direction, reverse = _keyset_clause("id", params, before_id, after_id)
     rows = fetch_all(
         conn,
         backend,
         f"""
         SELECT id, created_at, mutation_type, entity_type, entity_id, actor, payload_json
         FROM econ_audit_log
-        ORDER BY id DESC
+        {"WHERE " + bound if bound else ""}
+        ORDER BY id {direction}
         LIMIT {lim}
         """,
-        (),
+        tuple(params),
     )
+    if reverse:
+        rows = rows[::-1]
     out: List[dict] = []
     for row in rows:
         rec = dict(row)
@@ -2330,6 +3329,8 @@ def _build_import_discrepancies(conn, backend: str, *, import_id: int, rows: Lis
         (),
     )
     known_names = [(str(r.get("player_nickname") or "").strip(), int(r.get("total") or 0)) for r in known if r.get("player_nickname")]
+    # Indexed lookup; same winner as scoring every known name with SequenceMatcher.
+    matcher = NameMatcherIndex([name for name, _ in known_names])
     cur = conn.cursor()
     count = 0
     for idx, row in enumerate(rows, start=1):
@@ -2340,12 +3341,11 @@ def _build_import_discrepancies(conn, backend: str, *, import_id: int, rows: Lis
         best_score = 0.0
         best_expected = expected_hint
         if raw_name and known_names:
-            for candidate_name, candidate_total in known_names:
-                score = SequenceMatcher(None, raw_name.lower(), candidate_name.lower()).ratio()
-                if score > best_score:
-                    best_score = score
-                    best_name = candidate_name
-                    best_expected = expected_hint or candidate_total
+            match_idx, match_score = matcher.best_match(raw_name)
+            if match_idx >= 0:
+                best_score = match_score
+                best_name, candidate_total = known_names[match_idx]
+                best_expected = expected_hint or candidate_total
         tolerance = max(5000, int(abs(best_expected) * 0.05)) if best_expected else 5000
         unmatched = bool(raw_name and not best_name)
         low_confidence = bool(raw_name and best_name and best_score < 0.75)
@@ -2391,22 +3391,42 @@ def _build_import_discrepancies(conn, backend: str, *, import_id: int, rows: Lis
                     ),
                 )
             count += 1
+    if count:
+        _bump_generation(conn, backend, "discrepancies")
     return count
 
 
-def list_discrepancy_queue(conn, backend: str, limit: int = 200) -> List[dict]:
-    lim = max(1, min(int(limit), 500))
-    return fetch_all(
+def list_discrepancy_queue(
+    conn,
+    backend: str,
+    limit: int = 200,
+    *,
+    status: str = "",
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> List[dict]:
+    lim = clamp_page_limit("discrepancies", limit)
+    where = []
+    params: List[object] = []
+    if status in ("open", "resolved"):
+        params.append(status)
+        where.append(f"status = ${len(params)}")
+    bound, direction, reverse = _keyset_clause("id", params, before_id, after_id)
+    if bound:
+        where.append(bound)
+    rows = fetch_all(
         conn,
         backend,
         f"""
         SELECT id, import_id, row_ref, raw_name, matched_name, expected_amount, actual_amount, tolerance, score, status, note, created_at
         FROM econ_import_discrepancies
-        ORDER BY id DESC
+        {("WHERE " + " AND ".join(where)) if where else ""}
+        ORDER BY id {direction}
         LIMIT {lim}
         """,
-        (),
+        tuple(params),
     )
+    return rows[::-1] if reverse else rows
 
 
 def resolve_discrepancy(conn, backend: str, discrepancy_id: int, resolved_by: str, note: str = "") -> int:
@@ -2424,6 +3444,7 @@ def resolve_discrepancy(conn, backend: str, discrepancy_id: int, resolved_by: st
             "UPDATE econ_import_discrepancies SET status='resolved', note=? WHERE id=?",
             ((note or "").strip()[:500] or "resolved manually", did),
         )
+    _bump_generation(conn, backend, "discrepancies")
     _log_audit(
         conn,
         backend,
@@ -2467,6 +3488,7 @@ def acknowledge_alert(conn, backend: str, alert_id: int, acknowledged_by: str, n
             "UPDATE econ_alerts SET status='resolved', resolved_at=CURRENT_TIMESTAMP, message=message || ? WHERE id=?",
             (f" [ack:{(note or '').strip()[:200]}]" if (note or "").strip() else "", aid),
         )
+    _bump_generation(conn, backend, "alerts")
     _log_audit(
         conn,
         backend,
@@ -2482,7 +3504,8 @@ def acknowledge_alert(conn, backend: str, alert_id: int, acknowledged_by: str, n
 
 def _set_alert_state(
     conn, backend: str, *, alert_type: str, severity: str, message: str, threshold_value: int, current_value: int, should_open: bool
-) -> None:
+) -> Optional[str]:
+    """Open/resolve the alert as needed; returns 'opened', 'resolved' or None when nothing changed."""
     existing = fetch_one(
         conn,
         backend,
@@ -2507,6 +3530,7 @@ def _set_alert_state(
                 """,
                 (alert_type, severity, message, int(threshold_value), int(current_value)),
             )
+        return "opened"
     if (not should_open) and existing:
         if backend == "postgres":
             cur.execute(
@@ -2518,6 +3542,8 @@ def _set_alert_state(
                 "UPDATE econ_alerts SET status='resolved', resolved_at=CURRENT_TIMESTAMP WHERE id=?",
                 (int(existing["id"]),),
             )
+        return "resolved"
+    return None
 
 
 def run_alert_threshold_checks(conn, backend: str) -> dict:
@@ -2532,50 +3558,62 @@ def run_alert_threshold_checks(conn, backend: str) -> dict:
     unmatched = fetch_one(conn, backend, "SELECT COUNT(*) AS c FROM econ_import_discrepancies WHERE status='open'", ())
     unmatched_count = int((unmatched or {}).get("c") or 0)
 
-    _set_alert_state(
-        conn,
-        backend,
-        alert_type="low_cash",
-        severity="high",
-        message="Cash balance below threshold",
-        threshold_value=low_cash_threshold,
-        current_value=cash,
-        should_open=cash < low_cash_threshold,
-    )
-    _set_alert_state(
-        conn,
-        backend,
-        alert_type="high_expense",
-        severity="medium",
-        message="30-day expense above threshold",
-        threshold_value=high_expense_threshold,
-        current_value=expense_30,
-        should_open=expense_30 > high_expense_threshold,
-    )
-    _set_alert_state(
-        conn,
-        backend,
-        alert_type="unmatched_records",
-        severity="medium",
-        message="Unmatched import records detected",
-        threshold_value=unmatched_threshold,
-        current_value=unmatched_count,
-        should_open=unmatched_count > unmatched_threshold,
-    )
-    _log_audit(
-        conn,
-        backend,
-        mutation_type="run_alert_threshold_checks",
-        entity_type="alerts",
-        entity_id="threshold_check",
-        actor="dashboard_system",
-        payload={"cash_balance": cash, "expense_30d": expense_30, "unmatched_records": unmatched_count},
+    transitions: Dict[str, str] = {}
+    checks = (
+        ("low_cash", "high", "Cash balance below threshold", low_cash_threshold, cash, cash < low_cash_threshold),
+        (
+            "high_expense",
+            "medium",
+            "30-day expense above threshold",
+            high_expense_threshold,
+            expense_30,
+            expense_30 > high_expense_threshold,
+        ),
+        (
+            "unmatched_records",
+            "medium",
+            "Unmatched import records detected",
+            unmatched_threshold,
+            unmatched_count,
+            unmatched_count > unmatched_threshold,
+        ),
     )
+    for alert_type, severity, message, threshold_value, current_value, should_open in checks:
+        changed = _set_alert_state(
+            conn,
+            backend,
+            alert_type=alert_type,
+            severity=severity,
+            message=message,
+            threshold_value=threshold_value,
+            current_value=current_value,
+            should_open=should_open,
+        )
+        if changed:
+            transitions[alert_type] = changed
+    if transitions:
+        # Audit only real state changes, not every evaluation.
+        _log_audit(
+            conn,
+            backend,
+            mutation_type="run_alert_threshold_checks",
+            entity_type="alerts",
+            entity_id="threshold_check",
+            actor="dashboard_system",
+            payload={
+                "cash_balance": cash,
+                "expense_30d": expense_30,
+                "unmatched_records": unmatched_count,
+                "transitions": transitions,
+            },
+        )
+        _bump_generation(conn, backend, "alerts")
     conn.commit()
     return {
         "cash_balance": cash,
         "expense_30d": expense_30,
         "unmatched_records": unmatched_count,
+        "transitions": transitions,
         "thresholds": {
             "low_cash": low_cash_threshold,
             "high_expense_30d": high_expense_threshold,
@@ -2584,22 +3622,80 @@ def run_alert_threshold_checks(conn, backend: str) -> dict:
     }
 
 
-def balance_snapshot(conn, backend: str) -> dict:
-    rows = fetch_all(
+_ALERT_STATE_KEY = "threshold_check"
+
+
+def _alert_signature(conn, backend: str) -> str:
+    gens = get_generations(conn, backend)
+    # The day rolls the 30-day expense window even when nothing is written.
+    return "ledger={}|discrepancies={}|config={}|day={}".format(
+        gens.get("ledger", 0),
+        gens.get("discrepancies", 0),
+        gens.get("config", 0),
+        _utc_now()[:10],
+    )
+
+
+def evaluate_alerts_if_changed(conn, backend: str, *, force: bool = False) -> dict:
+    """
+    Re-run threshold checks only when the ledger / discrepancy / config generation (or the day)
+    changed since the last evaluation; stores the result for get_alert_state().
+    """
+    signature = _alert_signature(conn, backend)
+    stored = fetch_one(
         conn,
         backend,
-        """
-        SELECT a.code, a.name, a.kind,
-               COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
-               COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total
-        FROM econ_accounts a
-        LEFT JOIN econ_journal_lines l ON l.account_code = a.code
-        LEFT JOIN econ_journal_entries e ON e.id = l.entry_id AND e.status='posted'
-        GROUP BY a.code, a.name, a.kind
-        ORDER BY a.code
-        """,
-        (),
+        "SELECT signature FROM econ_alert_state WHERE state_key=$1",
+        (_ALERT_STATE_KEY,),
+    )
+    if stored and not force and str(stored.get("signature") or "") == signature:
+        return {"evaluated": False, "signature": signature}
+    state = run_alert_threshold_checks(conn, backend)
+    state["evaluated_at_utc"] = _utc_now()
+    data = json.dumps(state, default=str)
+    cur = conn.cursor()
+    if backend == "postgres":
+        cur.execute(
+            """
+            INSERT INTO econ_alert_state (state_key, signature, state_json, evaluated_at)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (state_key) DO UPDATE SET
+              signature=EXCLUDED.signature, state_json=EXCLUDED.state_json, evaluated_at=CURRENT_TIMESTAMP
+            """,
+            (_ALERT_STATE_KEY, signature, data),
+        )
+    else:
+        cur.execute(
+            """
+            INSERT INTO econ_alert_state (state_key, signature, state_json, evaluated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(state_key) DO UPDATE SET
+              signature=excluded.signature, state_json=excluded.state_json, evaluated_at=CURRENT_TIMESTAMP
+            """,
+            (_ALERT_STATE_KEY, signature, data),
+        )
+    conn.commit()
+    return {"evaluated": True, "signature": signature, "state": state}
+
+
+def get_alert_state(conn, backend: str) -> dict:
+    """Last stored evaluation (read-only; empty until the background evaluator has run once)."""
+    row = fetch_one(
+        conn,
+        backend,
+        "SELECT state_json FROM econ_alert_state WHERE state_key=$1",
+        (_ALERT_STATE_KEY,),
     )
+    if not row:
+        return {}
+    try:
+        return json.loads(row.get("state_json") or "{}")
+    except Exception:
+        return {}
+
+
+def account_balance_items(rows: List[dict]) -> dict:
+    """Signed balance per account row (debit-normal for assets/expenses) plus cash/energy."""
     items: List[dict] = []
     for r in rows:
         debit_total = int(r.get("debit_total") or 0)
@@ -2611,12 +3707,29 @@ def balance_snapshot(conn, backend: str) -> dict:
         items.append(rec)
     cash_balance = next((int(i.get("balance") or 0) for i in items if str(i.get("code")) == "1000"), 0)
     energy_balance = next((int(i.get("balance") or 0) for i in items if str(i.get("code")) == "1100"), 0)
-    return {
-        "as_of_utc": _utc_now(),
-        "cash_balance": cash_balance,
-        "energy_balance": energy_balance,
-        "accounts": items,
-    }
+    return {"cash_balance": cash_balance, "energy_balance": energy_balance, "accounts": items}
+
+
+def balance_snapshot(conn, backend: str, as_of: Optional[str] = None) -> dict:
+    """
+    Per-account balances. Current balances read the running totals maintained at post time;
+    with as_of they are rebuilt from the nearest ledger checkpoint plus the lines after it.
+    """
+    if as_of:
+        cutoff = _as_of_cutoff(as_of)
+        totals = _account_totals_before(conn, backend, cutoff)
+        accounts = fetch_all(conn, backend, "SELECT code, name, kind FROM econ_accounts ORDER BY code", ())
+        rows = []
+        for a in accounts:
+            debit_total, credit_total = totals.get(str(a.get("code")), (0, 0))
+            rows.append({**dict(a), "debit_total": debit_total, "credit_total": credit_total})
+    else:
+        # Running totals are maintained at post time (see _apply_posted_lines); no scan of journal lines.
+        rows = fetch_all(conn, backend, CURRENT_BALANCES_SQL, ())
+    out = {"as_of_utc": _utc_now(), **account_balance_items(rows)}
+    if as_of:
+        out["as_of_utc"] = _as_of_cutoff(as_of, inclusive_label=True)
+    return out
 
 
 def csv_treasury_snapshot(conn, backend: str) -> dict:
@@ -2645,46 +3758,200 @@ def csv_treasury_snapshot(conn, backend: str) -> dict:
     }
 
 
-def pnl_summary(conn, backend: str, days: int = 30) -> dict:
-    ndays = max(1, min(int(days), 365))
-    if backend == "sqlite":
-        rows = fetch_all(
-            conn,
-            backend,
-            """
-            SELECT a.kind,
-                   COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
-                   COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total
-            FROM econ_journal_lines l
-            JOIN econ_journal_entries e ON e.id = l.entry_id
-            JOIN econ_accounts a ON a.code = l.account_code
-            WHERE e.status='posted' AND e.created_at >= datetime('now', '-' || $1 || ' day')
-            GROUP BY a.kind
-            """,
-            (ndays,),
-        )
-    else:
-        rows = fetch_all(
-            conn,
-            backend,
-            """
-            SELECT a.kind,
-                   COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
-                   COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total
-            FROM econ_journal_lines l
-            JOIN econ_journal_entries e ON e.id = l.entry_id
-            JOIN econ_accounts a ON a.code = l.account_code
-            WHERE e.status='posted' AND e.created_at >= (CURRENT_TIMESTAMP - ($1 * INTERVAL '1 day'))
-            GROUP BY a.kind
-            """,
-            (ndays,),
-        )
+def _checkpoint_day_expr(backend: str) -> str:
+    return "to_char(e.created_at, 'YYYY-MM-DD')" if backend == "postgres" else "substr(e.created_at, 1, 10)"
+
+
+def _as_of_cutoff(as_of: str, *, inclusive_label: bool = False) -> str:
+    """
+    Turn a user as_of ('YYYY-MM-DD' = end of that day, or a full UTC timestamp) into an
+    exclusive 'YYYY-MM-DD HH:MM:SS' cutoff. With inclusive_label, return the display value instead.
+    """
+    raw = str(as_of or "").strip().replace("T", " ").rstrip("Z")
+    for fmt, step in (("%Y-%m-%d %H:%M:%S", timedelta(seconds=1)), ("%Y-%m-%d %H:%M", timedelta(minutes=1)), ("%Y-%m-%d", timedelta(days=1))):
+        try:
+            dt = datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+        if inclusive_label:
+            return (dt + step - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S")
+        return (dt + step).strftime("%Y-%m-%d %H:%M:%S")
+    raise ValueError("as_of must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS (UTC)")
+
+
+def _invalidate_checkpoints_for_entry(conn, backend: str, entry_id: int) -> None:
+    """A posting dated inside a closed period makes that day's and all later checkpoints stale."""
+    row = fetch_one(conn, backend, "SELECT created_at FROM econ_journal_entries WHERE id=$1", (int(entry_id),))
+    day = str((row or {}).get("created_at") or "")[:10]
+    if not day:
+        return
+    cur = conn.cursor()
+    if backend == "postgres":
+        cur.execute("DELETE FROM econ_ledger_checkpoints WHERE period_day >= %s", (day,))
+    else:
+        cur.execute("DELETE FROM econ_ledger_checkpoints WHERE period_day >= ?", (day,))
+
+
+def close_ledger_periods(conn, backend: str, through_day: Optional[str] = None) -> dict:
+    """
+    Closing job: write cumulative per-account checkpoints up to the end of through_day
+    (default: yesterday UTC). Only days with postings (plus the closing day itself) get rows,
+    so a checkpoint day always carries a full snapshot of every account touched so far.
+    """
+    through = str(through_day or (datetime.utcnow().date() - timedelta(days=1)).isoformat())[:10]
+    last = fetch_one(conn, backend, "SELECT MAX(period_day) AS d FROM econ_ledger_checkpoints", ())
+    last_day = str((last or {}).get("d") or "")
+    if last_day and last_day >= through:
+        return {"closed_through": last_day, "days_written": 0}
+
+    running: Dict[str, List[int]] = {}
+    params: List[object] = []
+    where = ["e.status='posted'"]
+    if last_day:
+        for r in fetch_all(
+            conn,
+            backend,
+            "SELECT account_code, debit_total, credit_total FROM econ_ledger_checkpoints WHERE period_day=$1",
+            (last_day,),
+        ):
+            running[str(r["account_code"])] = [int(r["debit_total"] or 0), int(r["credit_total"] or 0)]
+        params.append(_next_day_start(last_day))
+        where.append(f"e.created_at >= ${len(params)}")
+    params.append(_next_day_start(through))
+    where.append(f"e.created_at < ${len(params)}")
+    day_expr = _checkpoint_day_expr(backend)
+    deltas = fetch_all(
+        conn,
+        backend,
+        f"""
+        SELECT {day_expr} AS day, l.account_code,
+               COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
+               COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total
+        FROM econ_journal_lines l
+        JOIN econ_journal_entries e ON e.id = l.entry_id
+        WHERE {" AND ".join(where)}
+        GROUP BY {day_expr}, l.account_code
+        ORDER BY 1
+        """,
+        tuple(params),
+    )
+    by_day: Dict[str, List[dict]] = {}
+    for r in deltas:
+        by_day.setdefault(str(r["day"]), []).append(r)
+    days = sorted(by_day)
+    if through not in by_day:
+        days.append(through)
+
+    snapshot_rows: List[tuple] = []
+    for day in days:
+        for r in by_day.get(day, ()):
+            bucket = running.setdefault(str(r["account_code"]), [0, 0])
+            bucket[0] += int(r["debit_total"] or 0)
+            bucket[1] += int(r["credit_total"] or 0)
+        for code, (debit, credit) in running.items():
+            snapshot_rows.append((day, code, debit, credit))
+    if snapshot_rows:
+        cur = conn.cursor()
+        if backend == "postgres":
+            cur.executemany(
+                """
+                INSERT INTO econ_ledger_checkpoints (period_day, account_code, debit_total, credit_total)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (period_day, account_code) DO NOTHING
+                """,
+                snapshot_rows,
+            )
+        else:
+            cur.executemany(
+                """
+                INSERT OR IGNORE INTO econ_ledger_checkpoints (period_day, account_code, debit_total, credit_total)
+                VALUES (?, ?, ?, ?)
+                """,
+                snapshot_rows,
+            )
+        conn.commit()
+    return {"closed_through": through if running else last_day, "days_written": len(days) if running else 0}
+
+
+def _next_day_start(day: str) -> str:
+    return (datetime.strptime(day[:10], "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d 00:00:00")
+
+
+def _account_totals_before(conn, backend: str, cutoff: str) -> Dict[str, Tuple[int, int]]:
+    """Posted (debit, credit) per account for entries created before cutoff: checkpoint + delta."""
+    cp = fetch_one(
+        conn,
+        backend,
+        "SELECT MAX(period_day) AS d FROM econ_ledger_checkpoints WHERE period_day < $1",
+        (cutoff[:10],),
+    )
+    cp_day = str((cp or {}).get("d") or "")
+    totals: Dict[str, List[int]] = {}
+    params: List[object] = []
+    where = ["e.status='posted'"]
+    if cp_day:
+        for r in fetch_all(
+            conn,
+            backend,
+            "SELECT account_code, debit_total, credit_total FROM econ_ledger_checkpoints WHERE period_day=$1",
+            (cp_day,),
+        ):
+            totals[str(r["account_code"])] = [int(r["debit_total"] or 0), int(r["credit_total"] or 0)]
+        params.append(_next_day_start(cp_day))
+        where.append(f"e.created_at >= ${len(params)}")
+    params.append(cutoff)
+    where.append(f"e.created_at < ${len(params)}")
+    for r in fetch_all(
+        conn,
+        backend,
+        f"""
+        SELECT l.account_code,
+               COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE 0 END),0) AS debit_total,
+               COALESCE(SUM(CASE WHEN l.side='credit' THEN l.amount ELSE 0 END),0) AS credit_total
+        FROM econ_journal_lines l
+        JOIN econ_journal_entries e ON e.id = l.entry_id
+        WHERE {" AND ".join(where)}
+        GROUP BY l.account_code
+        """,
+        tuple(params),
+    ):
+        bucket = totals.setdefault(str(r["account_code"]), [0, 0])
+        bucket[0] += int(r["debit_total"] or 0)
+        bucket[1] += int(r["credit_total"] or 0)
+    return {code: (d, c) for code, (d, c) in totals.items()}
+
+
+def _account_totals_current(conn, backend: str) -> Dict[str, Tuple[int, int]]:
+    rows = fetch_all(conn, backend, "SELECT account_code, debit_total, credit_total FROM econ_account_balances", ())
+    return {str(r["account_code"]): (int(r["debit_total"] or 0), int(r["credit_total"] or 0)) for r in rows}
+
+
+def _range_totals(conn, backend: str, days: int, as_of: Optional[str]) -> Dict[str, Tuple[int, int]]:
+    """Posted movement per account over the `days` before as_of (default now), as end - start totals."""
+    if as_of:
+        end_cutoff = _as_of_cutoff(as_of)
+        end = _account_totals_before(conn, backend, end_cutoff)
+        end_dt = datetime.strptime(end_cutoff, "%Y-%m-%d %H:%M:%S")
+    else:
+        end = _account_totals_current(conn, backend)
+        end_dt = datetime.utcnow()
+    start = _account_totals_before(conn, backend, (end_dt - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S"))
+    out: Dict[str, Tuple[int, int]] = {}
+    for code in set(end) | set(start):
+        ed, ec = end.get(code, (0, 0))
+        sd, sc = start.get(code, (0, 0))
+        out[code] = (ed - sd, ec - sc)
+    return out
+
+
+def pnl_summary(conn, backend: str, days: int = 30, as_of: Optional[str] = None) -> dict:
+    ndays = max(1, min(int(days), 365))
+    movement = _range_totals(conn, backend, ndays, as_of)
+    kinds = {str(r["code"]): str(r.get("kind") or "") for r in fetch_all(conn, backend, "SELECT code, kind FROM econ_accounts", ())}
     income_total = 0
     expense_total = 0
-    for row in rows:
-        kind = str(row.get("kind") or "")
-        debit_total = int(row.get("debit_total") or 0)
-        credit_total = int(row.get("credit_total") or 0)
+    for code, (debit_total, credit_total) in movement.items():
+        kind = kinds.get(code, "")
         if kind == "income":
             income_total += credit_total - debit_total
         if kind == "expense":
@@ -2692,47 +3959,81 @@ def pnl_summary(conn, backend: str, days: int = 30) -> dict:
     return {"days": ndays, "income_total": income_total, "expense_total": expense_total, "net_profit": income_total - expense_total}
 
 
-def cashflow_summary(conn, backend: str, days: int = 30) -> dict:
+def cashflow_summary(conn, backend: str, days: int = 30, as_of: Optional[str] = None) -> dict:
     ndays = max(1, min(int(days), 365))
-    row = None
-    if backend == "postgres":
-        row = fetch_one(
-            conn,
-            backend,
-            """
-            SELECT COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE -l.amount END),0) AS net_cash
-            FROM econ_journal_lines l
-            JOIN econ_journal_entries e ON e.id = l.entry_id
-            WHERE l.account_code='1000' AND e.status='posted' AND e.created_at >= (CURRENT_TIMESTAMP - ($1 * INTERVAL '1 day'))
-            """,
-            (ndays,),
-        )
-    else:
-        row = fetch_one(
-            conn,
-            backend,
-            """
-            SELECT COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE -l.amount END),0) AS net_cash
-            FROM econ_journal_lines l
-            JOIN econ_journal_entries e ON e.id = l.entry_id
-            WHERE l.account_code='1000' AND e.status='posted' AND e.created_at >= datetime('now', '-' || $1 || ' day')
-            """,
-            (ndays,),
-        )
-    net_cash = int((row or {}).get("net_cash") or 0)
+    debit_total, credit_total = _range_totals(conn, backend, ndays, as_of).get("1000", (0, 0))
+    net_cash = int(debit_total - credit_total)
     return {"days": ndays, "net_cash": net_cash, "avg_daily_cashflow": round(net_cash / float(ndays), 2)}
 
 
-def forecast_summary(conn, backend: str) -> dict:
+# Days of daily cash history fed to the forecast models.
+FORECAST_HISTORY_DAYS = 180
+_forecast_cache = GenerationCache(max_entries=8)
+
+
+def _daily_cash_series(conn, backend: str, first_day: datetime, last_day: datetime) -> List[int]:
+    """Net posted movement of account 1000 per UTC day in [first_day, last_day], zero-filled."""
+    day_expr = _checkpoint_day_expr(backend)
+    rows = fetch_all(
+        conn,
+        backend,
+        f"""
+        SELECT {day_expr} AS day,
+               COALESCE(SUM(CASE WHEN l.side='debit' THEN l.amount ELSE -l.amount END),0) AS net
+        FROM econ_journal_entries e
+        JOIN econ_journal_lines l ON l.entry_id = e.id
+        WHERE e.status='posted' AND e.created_at >= $1 AND e.created_at < $2 AND l.account_code='1000'
+        GROUP BY {day_expr}
+        """,
+        (first_day.strftime("%Y-%m-%d %H:%M:%S"), (last_day + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")),
+    )
+    series = [0] * ((last_day - first_day).days + 1)
+    for r in rows:
+        try:
+            idx = (datetime.strptime(str(r["day"])[:10], "%Y-%m-%d") - first_day).days
+        except ValueError:
+            continue
+        if 0 <= idx < len(series):
+            series[idx] = int(r.get("net") or 0)
+    return series
+
+
+def _compute_forecast(conn, backend: str, today: datetime) -> dict:
+    # Complete days only: today's partial flow would drag every model down.
+    last_day = today - timedelta(days=1)
+    first_day = today - timedelta(days=FORECAST_HISTORY_DAYS)
+    series = _daily_cash_series(conn, backend, first_day, last_day)
+    # Trim leading empty days so a young ledger is not modelled as months of zero flow.
+    lead = next((i for i, v in enumerate(series) if v), len(series))
+    series = series[lead:]
+    first_day = first_day + timedelta(days=lead)
     cash_now = int(balance_snapshot(conn, backend).get("cash_balance") or 0)
-    cf7 = cashflow_summary(conn, backend, days=7)
-    cf30 = cashflow_summary(conn, backend, days=30)
-    return {
-        "cash_now": cash_now,
-        "forecast_7d": int(round(cash_now + (float(cf7.get("avg_daily_cashflow") or 0) * 7))),
-        "forecast_30d": int(round(cash_now + (float(cf30.get("avg_daily_cashflow") or 0) * 30))),
-        "basis": {"avg_daily_7d": cf7.get("avg_daily_cashflow"), "avg_daily_30d": cf30.get("avg_daily_cashflow")},
+    out = forecast_cash(series, first_day=first_day.date(), cash_now=cash_now)
+    by_days = {p["days"]: p["cash"] for p in out["projections"]}
+    out["forecast_7d"] = by_days.get(7)
+    out["forecast_30d"] = by_days.get(30)
+    out["forecast_90d"] = by_days.get(90)
+    out["basis"] = {
+        "avg_daily_7d": round(sum(series[-7:]) / 7.0, 2),
+        "avg_daily_30d": round(sum(series[-30:]) / 30.0, 2),
     }
+    return out
+
+
+def forecast_summary(conn, backend: str) -> dict:
+    """
+    Cash projections (7/30/90 days) from several models with error bands and backtest error.
+    Cached per process until the ledger generation or the UTC day changes.
+    """
+    today = datetime.strptime(_utc_now()[:10], "%Y-%m-%d")
+    gens = {**get_generations(conn, backend), "day": today.toordinal()}
+    return _forecast_cache.get_or_compute(
+        "forecast",
+        lambda: _compute_forecast(conn, backend, today),
+        generations=gens,
+        domains=("ledger", "day"),
+        params=(backend,),
+    )
 
 
 def fetch_market_price(item_id: str, location: str, quality: int) -> dict:
@@ -2741,8 +4042,88 @@ def fetch_market_price(item_id: str, location: str, quality: int) -> dict:
 
 
 def suggest_item_ids(query: str, limit: int = 20) -> dict:
+    """Answered from the local item catalog once it is loaded (price prefetch thread), else from the remote search."""
+    catalog = get_item_catalog()
+    if catalog is not None:
+        matches = catalog.search(query, limit=limit) if len(str(query or "").strip()) >= 2 else []
+        return {"ok": True, "items": [m["item_id"] for m in matches], "matches": matches, "error": None, "source": "catalog"}
     items, err = search_item_ids(query, limit=limit)
-    return {"ok": err is None, "items": items, "error": err}
+    return {"ok": err is None, "items": items, "error": err, "source": "remote"}
+
+
+LOOT_QUOTE_MAX_ITEMS = 200
+_LOOT_LINE_RE = re.compile(r"^(?:(\d+)\s*[x*]?\s+)?([A-Za-z0-9_@]+)(?:\s*[x*,;:\t ]\s*(\d+))?$", re.IGNORECASE)
+
+
+def parse_loot_list(text: str) -> List[dict]:
+    """
+    One item per line: "T4_BAG 3", "T4_BAG x3", "T4_BAG,3", "3x T4_BAG" or a bare id (quantity 1).
+    Repeated ids are summed, first-seen order kept.
+    """
+    merged: Dict[str, int] = {}
+    for lineno, raw in enumerate(str(text or "").splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        m = _LOOT_LINE_RE.match(line)
+        if not m or (m.group(1) and m.group(3)):
+            raise ValueError(f"Line {lineno}: expected '<item_id> <quantity>'")
+        qty = int(m.group(1) or m.group(3) or 1)
+        if qty <= 0:
+            raise ValueError(f"Line {lineno}: quantity must be positive")
+        item_id = m.group(2).upper()
+        merged[item_id] = merged.get(item_id, 0) + qty
+    return [{"item_id": k, "quantity": v} for k, v in merged.items()]
+
+
+def quote_loot_list(items: List[dict]) -> dict:
+    """Buyback quote (80% of the 24h trimmed market price) for a whole loot list, priced in one batched pass."""
+    merged: Dict[str, int] = {}
+    for it in items or []:
+        item_id = str((it or {}).get("item_id") or "").strip().upper()
+        if not item_id:
+            raise ValueError("item_id is required")
+        qty = int((it or {}).get("quantity") or 0)
+        if qty <= 0:
+            raise ValueError(f"quantity must be positive for {item_id}")
+        merged[item_id] = merged.get(item_id, 0) + qty
+    if not merged:
+        raise ValueError("Loot list is empty")
+    if len(merged) > LOOT_QUOTE_MAX_ITEMS:
+        raise ValueError(f"Too many distinct items (max {LOOT_QUOTE_MAX_ITEMS})")
+
+    prices = get_items_price_24h_trimmed_mean(merged.keys())
+    lines = []
+    market_total = 0
+    payout_total = 0
+    for item_id, qty in merged.items():
+        res = prices.get(item_id) or {"data": None, "error": "No market data for item", "stale": False}
+        unit = int((res.get("data") or {}).get("market_unit_price") or 0)
+        line_market = unit * qty
+        line_payout = int(round(unit * qty * 0.8))
+        market_total += line_market
+        payout_total += line_payout
+        lines.append(
+            {
+                "item_id": item_id,
+                "quantity": qty,
+                "ok": unit > 0,
+                "market_unit_price": unit or None,
+                "market_total": line_market,
+                "payout_total": line_payout,
+                "stale": bool(res.get("stale")),
+                "error": res.get("error"),
+            }
+        )
+    return {
+        "items": lines,
+        "discount_percent": 20,
+        "market_total": market_total,
+        "payout_total": payout_total,
+        "priced_count": sum(1 for x in lines if x["ok"]),
+        "missing_count": sum(1 for x in lines if not x["ok"]),
+        "stale_count": sum(1 for x in lines if x["stale"]),
+    }
 
 
 def list_armory_stock(conn, backend: str, limit: int = 500) -> List[dict]:
@@ -2761,8 +4142,251 @@ def list_armory_stock(conn, backend: str, limit: int = 500) -> List[dict]:
     return [dict(r) for r in rows]
 
 
-def list_armory_movements(conn, backend: str, limit: int = 500) -> List[dict]:
-    lim = max(1, min(int(limit), 2000))
+_ALBION_ITEM_ID_RE = re.compile(r"^T[1-8]_[A-Z0-9_]+(@[1-4])?$")
+
+
+def _albion_item_id(item_name: str, enchant: object = "") -> Optional[str]:
+    """Armory/request item as an Albion Data id (T4_BAG, T6_CAPE@2), or None for free-text names."""
+    item_id = str(item_name or "").strip().upper()
+    if not _ALBION_ITEM_ID_RE.match(item_id):
+        return None
+    level = str(enchant or "").strip()
+    if "@" not in item_id and level.isdigit() and 1 <= int(level) <= 4:
+        item_id = f"{item_id}@{level}"
+    return item_id
+
+
+def list_prefetch_item_ids(conn, backend: str, *, recent_days: int = 14, limit: int = 1000) -> List[str]:
+    """
+    Items worth keeping warm in the price cache: armory stock on hand plus items of
+    buyback/regear requests from the last ``recent_days``. Rows whose name is not an
+    Albion item id (free-text sheet names) are skipped.
+    """
+    since = (datetime.utcnow() - timedelta(days=max(1, int(recent_days)))).strftime("%Y-%m-%d %H:%M:%S")
+    out: Dict[str, None] = {}
+    for r in fetch_all(conn, backend, "SELECT item_name, enchant FROM econ_armory_stock WHERE quantity > 0 ORDER BY updated_at DESC", ()):
+        item_id = _albion_item_id(r["item_name"], r["enchant"])
+        if item_id:
+            out[item_id] = None
+    for table in ("econ_loot_buyback_requests", "econ_regear_requests"):
+        rows = fetch_all(
+            conn,
+            backend,
+            f"SELECT item_id, MAX(created_at) AS last_at FROM {table} WHERE created_at >= $1 GROUP BY item_id ORDER BY last_at DESC",
+            (since,),
+        )
+        for r in rows:
+            item_id = _albion_item_id(r["item_id"])
+            if item_id:
+                out[item_id] = None
+    return list(out)[: max(1, int(limit))]
+
+
+PRICE_HISTORY_FIELDS = ("sell_min", "buy_max")
+_QUALITY_NAMES = {"normal": 1, "good": 2, "outstanding": 3, "excellent": 4, "masterpiece": 5}
+
+
+def record_price_observations(conn, backend: str, rows: List[dict]) -> int:
+    """Append market observations to econ_price_history; repeats of a (item, quality, ts, city) are ignored."""
+    params = [
+        (str(r["item_id"]), int(r.get("quality") or 1), str(r["ts"])[:19], str(r["city"]), r.get("sell_min"), r.get("buy_max"))
+        for r in rows
+        if r.get("item_id") and r.get("city") and r.get("ts")
+    ]
+    if not params:
+        return 0
+    cur = conn.cursor()
+    if backend == "postgres":
+        cur.executemany(
+            """
+            INSERT INTO econ_price_history (item_id, quality, ts, city, sell_min, buy_max)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (item_id, quality, ts, city) DO NOTHING
+            """,
+            params,
+        )
+    else:
+        cur.executemany(
+            """
+            INSERT OR IGNORE INTO econ_price_history (item_id, quality, ts, city, sell_min, buy_max)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            params,
+        )
+    conn.commit()
+    return len(params)
+
+
+def _history_epoch(ts: object) -> float:
+    return datetime.strptime(str(ts)[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+
+def _history_label(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def price_history_series(
+    conn,
+    backend: str,
+    item_id: str,
+    *,
+    city: str = "",
+    quality: int = 1,
+    start: str = "",
+    end: str = "",
+    buckets: int = 60,
+    points: int = 200,
+    field: str = "sell_min",
+) -> dict:
+    """
+    Downsampled price history of one item, per city: ``buckets`` min/max/mean envelopes
+    over [start, end] plus an LTTB-reduced line of at most ``points`` observations.
+    start/end accept the as_of formats (default: the last 30 days).
+    """
+    item = str(item_id or "").strip().upper()
+    if not item:
+        raise ValueError("item_id is required")
+    if field not in PRICE_HISTORY_FIELDS:
+        raise ValueError(f"field must be one of {', '.join(PRICE_HISTORY_FIELDS)}")
+    end_cut = _as_of_cutoff(end) if end else (datetime.utcnow() + timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S")
+    start_cut = (
+        _as_of_cutoff(start, inclusive_label=True)[:10] + " 00:00:00"
+        if start
+        else (datetime.strptime(end_cut, "%Y-%m-%d %H:%M:%S") - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+    )
+    if start_cut >= end_cut:
+        raise ValueError("from must be before to")
+    nb = max(1, min(int(buckets), 500))
+    npts = max(3, min(int(points), 2000))
+
+    params: List[object] = [item, int(quality), start_cut, end_cut]
+    city_sql = ""
+    if city:
+        params.append(str(city).strip())
+        city_sql = "AND city = $5"
+    rows = fetch_all(
+        conn,
+        backend,
+        f"""
+        SELECT city, ts, {field} AS price
+        FROM econ_price_history
+        WHERE item_id = $1 AND quality = $2 AND ts >= $3 AND ts < $4 AND {field} IS NOT NULL {city_sql}
+        ORDER BY city ASC, ts ASC
+        """,
+        tuple(params),
+    )
+    per_city: Dict[str, List[Tuple[float, float]]] = {}
+    for r in rows:
+        per_city.setdefault(str(r["city"]), []).append((_history_epoch(r["ts"]), float(r["price"])))
+
+    lo, hi = _history_epoch(start_cut), _history_epoch(end_cut)
+    series = []
+    for name, pts in per_city.items():
+        series.append(
+            {
+                "city": name,
+                "observations": len(pts),
+                "buckets": [
+                    {"t": _history_label(b["t"]), "min": int(b["min"]), "max": int(b["max"]), "mean": round(b["mean"], 2), "count": b["count"]}
+                    for b in bucket_stats(pts, nb, lo, hi)
+                ],
+                "line": [{"t": _history_label(t), "price": int(v)} for t, v in lttb(pts, npts)],
+            }
+        )
+    return {
+        "item_id": item,
+        "quality": int(quality),
+        "field": field,
+        "from": start_cut,
+        "to": _history_label(hi - 1),
+        "bucket_seconds": round((hi - lo) / nb, 2),
+        "series": series,
+    }
+
+
+def price_at(conn, backend: str, item_ids: List[str], as_of: str, *, quality: int = 1, lookback_days: int = 7) -> Dict[str, dict]:
+    """
+    Point-in-time unit price per item: the latest observation per city in the
+    ``lookback_days`` before as_of, combined with the same trimmed city mean as live quotes.
+    """
+    cutoff = _as_of_cutoff(as_of)
+    since = (datetime.strptime(cutoff, "%Y-%m-%d %H:%M:%S") - timedelta(days=max(1, int(lookback_days)))).strftime("%Y-%m-%d %H:%M:%S")
+    ids = sorted({str(i) for i in item_ids if i})
+    latest: Dict[str, Dict[str, Tuple[str, int]]] = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i : i + 500]
+        placeholders = ", ".join(f"${n + 4}" for n in range(len(chunk)))
+        rows = fetch_all(
+            conn,
+            backend,
+            f"""
+            SELECT item_id, city, ts, sell_min, buy_max
+            FROM econ_price_history
+            WHERE quality = $1 AND ts >= $2 AND ts < $3 AND item_id IN ({placeholders})
+            ORDER BY ts ASC
+            """,
+            (int(quality), since, cutoff, *chunk),
+        )
+        for r in rows:
+            price = int(r.get("sell_min") or r.get("buy_max") or 0)
+            if price > 0:
+                latest.setdefault(str(r["item_id"]), {})[str(r["city"])] = (str(r["ts"])[:19], price)
+    out: Dict[str, dict] = {}
+    for item_id, cities in latest.items():
+        stats = trimmed_city_mean(p for _, p in cities.values())
+        if stats:
+            out[item_id] = dict(stats, observed_at=max(ts for ts, _ in cities.values()))
+    return out
+
+
+def _quality_level(quality: object) -> int:
+    raw = str(quality or "").strip().lower()
+    if raw.isdigit() and 1 <= int(raw) <= 5:
+        return int(raw)
+    return _QUALITY_NAMES.get(raw, 1)
+
+
+def armory_valuation_as_of(conn, backend: str, as_of: str, *, lookback_days: int = 7) -> dict:
+    """Armory stock at as_of valued with market prices recorded before as_of (econ_price_history)."""
+    stock = armory_stock_as_of(conn, backend, as_of)
+    by_quality: Dict[int, List[str]] = {}
+    for row in stock["items"]:
+        item_id = _albion_item_id(row["item_name"], row["enchant"])
+        row["price_item_id"] = item_id
+        row["price_quality"] = _quality_level(row["quality"])
+        if item_id:
+            by_quality.setdefault(row["price_quality"], []).append(item_id)
+    prices: Dict[Tuple[str, int], dict] = {}
+    for q, ids in by_quality.items():
+        for item_id, p in price_at(conn, backend, ids, as_of, quality=q, lookback_days=lookback_days).items():
+            prices[(item_id, q)] = p
+    items, unpriced, total = [], [], 0
+    for row in stock["items"]:
+        p = prices.get((row["price_item_id"], row["price_quality"])) if row["price_item_id"] else None
+        if not p:
+            unpriced.append(row)
+            continue
+        value = int(p["market_unit_price"]) * int(row["quantity"])
+        total += value
+        items.append(dict(row, unit_price=int(p["market_unit_price"]), price_observed_at=p["observed_at"], value=value))
+    items.sort(key=lambda r: -r["value"])
+    return {
+        "as_of": stock["as_of"],
+        "lookback_days": max(1, int(lookback_days)),
+        "total_value": total,
+        "priced_count": len(items),
+        "unpriced_count": len(unpriced),
+        "items": items,
+        "unpriced": unpriced,
+    }
+
+
+def list_armory_movements(
+    conn, backend: str, limit: int = 500, *, before_id: Optional[int] = None, after_id: Optional[int] = None
+) -> List[dict]:
+    lim = clamp_page_limit("armory_movements", limit)
+    params: List[object] = []
+    bound, direction, reverse = _keyset_clause("id", params, before_id, after_id)
     rows = fetch_all(
         conn,
         backend,
@@ -2770,12 +4394,233 @@ def list_armory_movements(conn, backend: str, limit: int = 500) -> List[dict]:
         SELECT id, created_at, occurred_at, action, item_key, item_name, category, tier, enchant, quality,
                quantity, officer, notes, source, journal_entry_id
         FROM econ_armory_movements
-        ORDER BY id DESC
+        {"WHERE " + bound if bound else ""}
+        ORDER BY id {direction}
         LIMIT {lim}
         """,
-        (),
+        tuple(params),
     )
-    return [dict(r) for r in rows]
+    out = [dict(r) for r in rows]
+    return out[::-1] if reverse else out
+
+
+# econ_armory_snapshots: stock per item after all movements created before the day after
+# period_day (a Sunday, weekly). Only non-zero quantities are stored; the '' row marks the
+# snapshot itself so an empty armory still has one. Movements are always stamped with the
+# server clock (created_at), so closed weeks never change and need no invalidation.
+_ARMORY_SNAPSHOT_MARKER = ""
+
+
+def _week_end(day: str) -> str:
+    d = datetime.strptime(str(day)[:10], "%Y-%m-%d").date()
+    return (d + timedelta(days=6 - d.weekday())).isoformat()
+
+
+def _apply_armory_action(state: Dict[str, int], key: str, action: str, qty: int) -> Tuple[int, int]:
+    """Replay one movement onto state; returns (before, after). Never raises on history."""
+    before = int(state.get(key, 0))
+    if action == "ADD":
+        after = before + qty
+    elif action == "REMOVE":
+        after = before - qty
+    else:
+        after = qty
+    state[key] = after
+    return before, after
+
+
+def _armory_movements_between(conn, backend: str, start: str, end: str, item_key: str = "") -> List[dict]:
+    params: List[object] = []
+    where = []
+    if item_key:
+        params.append(item_key)
+        where.append(f"item_key = ${len(params)}")
+    if start:
+        params.append(start)
+        where.append(f"created_at >= ${len(params)}")
+    params.append(end)
+    where.append(f"created_at < ${len(params)}")
+    return fetch_all(
+        conn,
+        backend,
+        f"""
+        SELECT id, created_at, action, item_key, item_name, quantity
+        FROM econ_armory_movements
+        WHERE {" AND ".join(where)}
+        ORDER BY created_at, id
+        """,
+        tuple(params),
+    )
+
+
+def _armory_snapshot(conn, backend: str, period_day: str, item_key: str = "") -> Dict[str, int]:
+    if item_key:
+        rows = fetch_all(
+            conn,
+            backend,
+            "SELECT item_key, quantity FROM econ_armory_snapshots WHERE period_day=$1 AND item_key=$2",
+            (period_day, item_key),
+        )
+    else:
+        rows = fetch_all(
+            conn,
+            backend,
+            "SELECT item_key, quantity FROM econ_armory_snapshots WHERE period_day=$1 AND item_key <> ''",
+            (period_day,),
+        )
+    return {str(r["item_key"]): int(r["quantity"] or 0) for r in rows}
+
+
+def close_armory_snapshots(conn, backend: str, through_day: Optional[str] = None) -> dict:
+    """
+    Write weekly armory snapshots up to the week ending through_day (default: the last
+    completed week, UTC). Weeks without movements are skipped, like ledger checkpoints.
+    """
+    today = datetime.utcnow().date()
+    through = _week_end(through_day) if through_day else (today - timedelta(days=today.weekday() + 1)).isoformat()
+    last = fetch_one(conn, backend, "SELECT MAX(period_day) AS d FROM econ_armory_snapshots", ())
+    last_day = str((last or {}).get("d") or "")
+    if last_day and last_day >= through:
+        return {"closed_through": last_day, "weeks_written": 0}
+
+    state = _armory_snapshot(conn, backend, last_day) if last_day else {}
+    movements = _armory_movements_between(
+        conn, backend, _next_day_start(last_day) if last_day else "", _next_day_start(through)
+    )
+    snapshots: List[Tuple[str, Dict[str, int]]] = []
+    week = ""
+    for mv in movements:
+        mv_week = _week_end(str(mv["created_at"]))
+        if week and mv_week != week:
+            snapshots.append((week, dict(state)))
+        week = mv_week
+        _apply_armory_action(state, str(mv["item_key"]), str(mv["action"] or "").upper(), int(mv["quantity"] or 0))
+    if week and week != through:
+        snapshots.append((week, dict(state)))
+    snapshots.append((through, state))
+
+    rows: List[tuple] = []
+    for day, quantities in snapshots:
+        live = [(day, key, qty) for key, qty in quantities.items() if qty]
+        rows.append((day, _ARMORY_SNAPSHOT_MARKER, len(live)))
+        rows.extend(live)
+    cur = conn.cursor()
+    if backend == "postgres":
+        cur.executemany(
+            """
+            INSERT INTO econ_armory_snapshots (period_day, item_key, quantity) VALUES (%s, %s, %s)
+            ON CONFLICT (period_day, item_key) DO NOTHING
+            """,
+            rows,
+        )
+    else:
+        cur.executemany("INSERT OR IGNORE INTO econ_armory_snapshots (period_day, item_key, quantity) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    return {"closed_through": through, "weeks_written": len(snapshots)}
+
+
+def _armory_quantities_before(conn, backend: str, cutoff: str, item_key: str = "") -> Tuple[Dict[str, int], str, int]:
+    """Stock per item after all movements created before cutoff: nearest snapshot + replay."""
+    cp = fetch_one(
+        conn,
+        backend,
+        "SELECT MAX(period_day) AS d FROM econ_armory_snapshots WHERE period_day < $1",
+        (cutoff[:10],),
+    )
+    cp_day = str((cp or {}).get("d") or "")
+    state = _armory_snapshot(conn, backend, cp_day, item_key) if cp_day else {}
+    movements = _armory_movements_between(conn, backend, _next_day_start(cp_day) if cp_day else "", cutoff, item_key)
+    for mv in movements:
+        _apply_armory_action(state, str(mv["item_key"]), str(mv["action"] or "").upper(), int(mv["quantity"] or 0))
+    return state, cp_day, len(movements)
+
+
+def armory_stock_as_of(conn, backend: str, as_of: str, *, item_key: str = "") -> dict:
+    """Armory stock as it was at as_of (UTC), optionally for one item_key."""
+    cutoff = _as_of_cutoff(as_of)
+    key = str(item_key or "").strip()
+    state, cp_day, replayed = _armory_quantities_before(conn, backend, cutoff, key)
+    live = {k: q for k, q in state.items() if q}
+    meta = _armory_stock_rows(conn, backend, sorted(live))
+    items = []
+    for k, qty in live.items():
+        m = meta.get(k) or {}
+        items.append(
+            {
+                "item_key": k,
+                "item_name": m.get("item_name") or k.split("|")[0],
+                "category": m.get("category") or "",
+                "tier": m.get("tier") or "",
+                "enchant": m.get("enchant") or "",
+                "quality": m.get("quality") or "",
+                "quantity": int(qty),
+            }
+        )
+    items.sort(key=lambda r: (r["category"], r["item_name"], r["tier"], r["enchant"], r["quality"]))
+    return {
+        "as_of": _as_of_cutoff(as_of, inclusive_label=True),
+        "snapshot_day": cp_day or None,
+        "movements_replayed": replayed,
+        "items_count": len(items),
+        "total_quantity": sum(r["quantity"] for r in items),
+        "items": items,
+    }
+
+
+def armory_item_velocity(conn, backend: str, *, weeks: int = 12, limit: int = 20) -> dict:
+    """
+    Top consumed items per ISO week over the last `weeks` weeks (current week included).
+    Consumption is REMOVE quantity plus stock drops recorded by SET (sheet imports).
+    """
+    nweeks = max(1, min(int(weeks), 104))
+    lim = max(1, min(int(limit), 200))
+    today = datetime.utcnow().date()
+    start_day = today - timedelta(days=today.weekday()) - timedelta(weeks=nweeks - 1)
+    start = start_day.strftime("%Y-%m-%d 00:00:00")
+    end = (today + timedelta(days=1)).strftime("%Y-%m-%d 00:00:00")
+    state, _, _ = _armory_quantities_before(conn, backend, start)
+    labels = []
+    for i in range(nweeks):
+        iso = (start_day + timedelta(weeks=i)).isocalendar()
+        labels.append(f"{iso[0]}-W{iso[1]:02d}")
+    week_index = {label: i for i, label in enumerate(labels)}
+
+    consumed: Dict[str, List[int]] = {}
+    added: Dict[str, int] = {}
+    names: Dict[str, str] = {}
+    day_week: Dict[str, Optional[int]] = {}
+    for mv in _armory_movements_between(conn, backend, start, end):
+        key = str(mv["item_key"])
+        before, after = _apply_armory_action(state, key, str(mv["action"] or "").upper(), int(mv["quantity"] or 0))
+        names[key] = str(mv.get("item_name") or "")
+        if after < before:
+            day = str(mv["created_at"])[:10]
+            if day not in day_week:
+                iso = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+                day_week[day] = week_index.get(f"{iso[0]}-W{iso[1]:02d}")
+            idx = day_week[day]
+            if idx is not None:
+                consumed.setdefault(key, [0] * nweeks)[idx] += before - after
+        elif after > before:
+            added[key] = added.get(key, 0) + after - before
+
+    ranked = sorted(consumed.items(), key=lambda kv: (-sum(kv[1]), kv[0]))[:lim]
+    items = []
+    for key, per_week in ranked:
+        total = sum(per_week)
+        items.append(
+            {
+                "item_key": key,
+                "item_name": names.get(key) or key.split("|")[0],
+                "consumed_total": total,
+                "avg_per_week": round(total / float(nweeks), 2),
+                "peak_week": labels[max(range(nweeks), key=lambda i: per_week[i])],
+                "added_total": added.get(key, 0),
+                "stock_now": int(state.get(key, 0)),
+                "weekly": [{"week": labels[i], "consumed": per_week[i]} for i in range(nweeks)],
+            }
+        )
+    return {"weeks": nweeks, "since": start_day.isoformat(), "week_labels": labels, "items": items}
 
 
 def _armory_item_key(item_name: str, tier: str, enchant: str, quality: str) -> str:
@@ -2793,9 +4638,7 @@ def _armory_row_get(row: dict, *names: str) -> str:
     return ""
 
 
-def record_armory_movement(
-    conn,
-    backend: str,
+def _normalize_armory_movement(
     *,
     action: str,
     item_name: str,
@@ -2810,7 +4653,6 @@ def record_armory_movement(
     source: str = "armory_web",
     item_key: str = "",
     unit_cost: int = 0,
-    auto_commit: bool = True,
 ) -> dict:
     action_norm = str(action or "").strip().upper()
     if action_norm not in ("ADD", "REMOVE", "SET"):
@@ -2824,23 +4666,99 @@ def record_armory_movement(
     if not key:
         raise ValueError("item key is required")
     name_s = str(item_name or "").strip() or key.split("|")[0]
-    cat_s = str(category or "").strip() or name_s
-    tier_s = str(tier or "").strip()
-    ench_s = str(enchant or "").strip()
-    qual_s = str(quality or "").strip()
-    occ_s = str(occurred_at or "").strip() or _utc_now()
-    unit_cost_i = max(0, int(unit_cost or 0))
+    return {
+        "action": action_norm,
+        "qty": qty,
+        "key": key,
+        "name": name_s,
+        "category": str(category or "").strip() or name_s,
+        "tier": str(tier or "").strip(),
+        "enchant": str(enchant or "").strip(),
+        "quality": str(quality or "").strip(),
+        "officer": str(officer or "").strip(),
+        "notes": str(notes or "").strip(),
+        "occurred_at": str(occurred_at or "").strip() or _utc_now(),
+        "source": str(source or "armory_web").strip(),
+        "unit_cost": max(0, int(unit_cost or 0)),
+    }
 
-    existing = fetch_one(conn, backend, "SELECT quantity FROM econ_armory_stock WHERE item_key=$1", (key,))
-    cur_qty = int((existing or {}).get("quantity") or 0)
-    if action_norm == "ADD":
-        new_qty = cur_qty + qty
-    elif action_norm == "REMOVE":
+
+def _armory_quantity_after(action: str, cur_qty: int, qty: int) -> int:
+    if action == "ADD":
+        return cur_qty + qty
+    if action == "REMOVE":
         if cur_qty < qty:
             raise ValueError(f"Not enough stock ({cur_qty}) for remove {qty}")
-        new_qty = cur_qty - qty
-    else:
-        new_qty = qty
+        return cur_qty - qty
+    return qty
+
+
+def _post_armory_movement_cost(conn, backend: str, mv: dict, movement_id: int) -> Optional[int]:
+    """Routed journal entry for ADD/REMOVE with a unit cost; links it on the movement row."""
+    if mv["action"] not in ("ADD", "REMOVE") or mv["unit_cost"] <= 0:
+        return None
+    amount = int(mv["qty"]) * int(mv["unit_cost"])
+    if amount <= 0:
+        return None
+    op = create_routed_operation(
+        conn,
+        backend,
+        category="armory_add" if mv["action"] == "ADD" else "armory_remove",
+        amount=amount,
+        description=f"{mv['action']} {mv['name']} x{mv['qty']} @ {mv['unit_cost']}",
+        actor=mv["officer"] or "dashboard_admin",
+        source="armory_auto_posting",
+    )
+    journal_entry_id = int((op or {}).get("entry_id") or 0) or None
+    if journal_entry_id:
+        cur = conn.cursor()
+        if backend == "postgres":
+            cur.execute("UPDATE econ_armory_movements SET journal_entry_id=%s WHERE id=%s", (journal_entry_id, movement_id))
+        else:
+            cur.execute("UPDATE econ_armory_movements SET journal_entry_id=? WHERE id=?", (journal_entry_id, movement_id))
+    return journal_entry_id
+
+
+def record_armory_movement(
+    conn,
+    backend: str,
+    *,
+    action: str,
+    item_name: str,
+    category: str,
+    tier: str,
+    enchant: str,
+    quality: str,
+    quantity: int,
+    officer: str = "",
+    notes: str = "",
+    occurred_at: str = "",
+    source: str = "armory_web",
+    item_key: str = "",
+    unit_cost: int = 0,
+    auto_commit: bool = True,
+) -> dict:
+    mv = _normalize_armory_movement(
+        action=action,
+        item_name=item_name,
+        category=category,
+        tier=tier,
+        enchant=enchant,
+        quality=quality,
+        quantity=quantity,
+        officer=officer,
+        notes=notes,
+        occurred_at=occurred_at,
+        source=source,
+        item_key=item_key,
+        unit_cost=unit_cost,
+    )
+    action_norm, qty, key = mv["action"], mv["qty"], mv["key"]
+    name_s, cat_s, tier_s, ench_s, qual_s = mv["name"], mv["category"], mv["tier"], mv["enchant"], mv["quality"]
+    occ_s, unit_cost_i = mv["occurred_at"], mv["unit_cost"]
+
+    existing = fetch_one(conn, backend, "SELECT quantity FROM econ_armory_stock WHERE item_key=$1", (key,))
+    new_qty = _armory_quantity_after(action_norm, int((existing or {}).get("quantity") or 0), qty)
 
     cur = conn.cursor()
     if backend == "postgres":
@@ -2896,25 +4814,8 @@ def record_armory_movement(
             (occ_s, action_norm, key, name_s, cat_s, tier_s, ench_s, qual_s, int(qty), str(officer or "").strip(), str(notes or "").strip(), str(source or "armory_web").strip()),
         )
         movement_id = int(cur.lastrowid)
-    journal_entry_id = None
-    if action_norm in ("ADD", "REMOVE") and unit_cost_i > 0:
-        amount = int(qty) * int(unit_cost_i)
-        if amount > 0:
-            op = create_routed_operation(
-                conn,
-                backend,
-                category="armory_add" if action_norm == "ADD" else "armory_remove",
-                amount=amount,
-                description=f"{action_norm} {name_s} x{qty} @ {unit_cost_i}",
-                actor=str(officer or "dashboard_admin").strip() or "dashboard_admin",
-                source="armory_auto_posting",
-            )
-            journal_entry_id = int((op or {}).get("entry_id") or 0) or None
-            if journal_entry_id:
-                if backend == "postgres":
-                    cur.execute("UPDATE econ_armory_movements SET journal_entry_id=%s WHERE id=%s", (journal_entry_id, movement_id))
-                else:
-                    cur.execute("UPDATE econ_armory_movements SET journal_entry_id=? WHERE id=?", (journal_entry_id, movement_id))
+    journal_entry_id = _post_armory_movement_cost(conn, backend, mv, movement_id)
+    _bump_generation(conn, backend, "armory")
     _log_audit(
         conn,
         backend,
@@ -2929,6 +4830,174 @@ def record_armory_movement(
     return {"ok": True, "movement_id": movement_id, "item_key": key, "quantity_after": int(new_qty), "journal_entry_id": journal_entry_id}
 
 
+def _armory_stock_rows(conn, backend: str, keys: List[str]) -> Dict[str, dict]:
+    out: Dict[str, dict] = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i : i + 500]
+        placeholders = ", ".join(f"${n + 1}" for n in range(len(chunk)))
+        rows = fetch_all(
+            conn,
+            backend,
+            f"""
+            SELECT item_key, item_name, category, tier, enchant, quality, quantity
+            FROM econ_armory_stock
+            WHERE item_key IN ({placeholders})
+            """,
+            tuple(chunk),
+        )
+        for r in rows:
+            out[str(r["item_key"])] = dict(r)
+    return out
+
+
+def _armory_stock_quantities(conn, backend: str, keys: List[str]) -> Dict[str, int]:
+    return {k: int(r.get("quantity") or 0) for k, r in _armory_stock_rows(conn, backend, keys).items()}
+
+
+def record_armory_movements_batch(conn, backend: str, movements: List[dict], *, auto_commit: bool = True) -> List[dict]:
+    """
+    Apply many movements (record_armory_movement keyword dicts) in order, with the same
+    validation: current stock is read once for all keys, quantities are computed in memory,
+    and stock / movement / audit rows are written in batches. Nothing is written if any
+    movement is invalid.
+    """
+    mvs = [_normalize_armory_movement(**m) for m in movements]
+    if not mvs:
+        return []
+    stock = _armory_stock_quantities(conn, backend, list(dict.fromkeys(mv["key"] for mv in mvs)))
+    final: Dict[str, dict] = {}
+    for mv in mvs:
+        mv["new_qty"] = _armory_quantity_after(mv["action"], stock.get(mv["key"], 0), mv["qty"])
+        stock[mv["key"]] = mv["new_qty"]
+        final[mv["key"]] = mv
+    # Last movement per key wins, exactly like the per-row upserts would.
+    stock_rows = [
+        (mv["key"], mv["name"], mv["category"], mv["tier"], mv["enchant"], mv["quality"], int(mv["new_qty"]), mv["notes"] or None)
+        for mv in final.values()
+    ]
+    movement_rows = [
+        (
+            mv["occurred_at"],
+            mv["action"],
+            mv["key"],
+            mv["name"],
+            mv["category"],
+            mv["tier"],
+            mv["enchant"],
+            mv["quality"],
+            int(mv["qty"]),
+            mv["officer"],
+            mv["notes"],
+            mv["source"],
+        )
+        for mv in mvs
+    ]
+    cur = conn.cursor()
+    if backend == "postgres":
+        import psycopg2.extras
+
+        psycopg2.extras.execute_values(
+            cur,
+            """
+            INSERT INTO econ_armory_stock (item_key, item_name, category, tier, enchant, quality, quantity, notes, updated_at)
+            VALUES %s
+            ON CONFLICT (item_key) DO UPDATE SET
+              item_name=EXCLUDED.item_name,
+              category=EXCLUDED.category,
+              tier=EXCLUDED.tier,
+              enchant=EXCLUDED.enchant,
+              quality=EXCLUDED.quality,
+              quantity=EXCLUDED.quantity,
+              notes=EXCLUDED.notes,
+              updated_at=CURRENT_TIMESTAMP
+            """,
+            stock_rows,
+            template="(%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)",
+            page_size=500,
+        )
+        id_rows = psycopg2.extras.execute_values(
+            cur,
+            """
+            INSERT INTO econ_armory_movements
+            (occurred_at, action, item_key, item_name, category, tier, enchant, quality, quantity, officer, notes, source)
+            VALUES %s
+            RETURNING id
+            """,
+            movement_rows,
+            page_size=500,
+            fetch=True,
+        )
+        movement_ids = [int(r[0]) for r in id_rows]
+    else:
+        cur.executemany(
+            """
+            INSERT INTO econ_armory_stock (item_key, item_name, category, tier, enchant, quality, quantity, notes, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(item_key) DO UPDATE SET
+              item_name=excluded.item_name,
+              category=excluded.category,
+              tier=excluded.tier,
+              enchant=excluded.enchant,
+              quality=excluded.quality,
+              quantity=excluded.quantity,
+              notes=excluded.notes,
+              updated_at=CURRENT_TIMESTAMP
+            """,
+            stock_rows,
+        )
+        # The stock upsert took the write lock, so ids above the current max are ours.
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM econ_armory_movements")
+        max_before = int(cur.fetchone()[0])
+        cur.executemany(
+            """
+            INSERT INTO econ_armory_movements
+            (occurred_at, action, item_key, item_name, category, tier, enchant, quality, quantity, officer, notes, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            movement_rows,
+        )
+        cur.execute("SELECT id FROM econ_armory_movements WHERE id > ? ORDER BY id", (max_before,))
+        movement_ids = [int(r[0]) for r in cur.fetchall()]
+    if len(movement_ids) != len(mvs):
+        raise RuntimeError("armory batch: inserted movement ids do not match the batch")
+
+    results: List[dict] = []
+    audit_rows: List[Tuple[str, str, str, str, dict]] = []
+    for mv, movement_id in zip(mvs, movement_ids):
+        journal_entry_id = _post_armory_movement_cost(conn, backend, mv, movement_id)
+        audit_rows.append(
+            (
+                "armory_movement",
+                "armory_item",
+                mv["key"],
+                mv["officer"] or "dashboard_admin",
+                {
+                    "movement_id": movement_id,
+                    "action": mv["action"],
+                    "qty": int(mv["qty"]),
+                    "new_qty": int(mv["new_qty"]),
+                    "occurred_at": mv["occurred_at"],
+                    "unit_cost": mv["unit_cost"],
+                    "journal_entry_id": journal_entry_id,
+                },
+            )
+        )
+        results.append(
+            {
+                "ok": True,
+                "movement_id": movement_id,
+                "item_key": mv["key"],
+                "quantity_after": int(mv["new_qty"]),
+                "journal_entry_id": journal_entry_id,
+            }
+        )
+    _bump_generation(conn, backend, "armory")
+    _log_audit_many(conn, backend, audit_rows)
+    if auto_commit:
+        conn.commit()
+    return results
+
+
 def import_armory_table_markdown(conn, backend: str, *, content: str, actor: str = "dashboard_admin") -> dict:
     def _split_md_row(line: str) -> List[str]:
         raw = str(line or "").strip().strip("|")
@@ -2954,8 +5023,8 @@ def import_armory_table_markdown(conn, backend: str, *, content: str, actor: str
     txt = str(content or "").strip()
     if not txt:
         raise ValueError("content is required")
-    added = 0
-    touched = 0
+    # Parsed rows are applied together by record_armory_movements_batch.
+    pending: List[dict] = []
 
     def _parse_qty(raw: str) -> Optional[int]:
         s = str(raw or "").strip()
@@ -3009,7 +5078,6 @@ def import_armory_table_markdown(conn, backend: str, *, content: str, actor: str
         return s
 
     def _import_row(parts: List[str], source: str) -> None:
-        nonlocal added, touched
         if len(parts) < 8:
             return
         raw_item_key = parts[0].strip() if len(parts) > 0 else ""
@@ -3040,25 +5108,21 @@ def import_armory_table_markdown(conn, backend: str, *, content: str, actor: str
         qty = _parse_qty(qty_s)
         if qty is None or qty < 0:
             return
-        rec = record_armory_movement(
-            conn,
-            backend,
-            action="SET",
-            item_key=item_key,
-            item_name=item_name,
-            category=category,
-            tier=tier,
-            enchant=enchant,
-            quality=quality,
-            quantity=qty,
-            officer=actor,
-            notes=notes,
-            source=source,
-            auto_commit=False,
-        )
-        touched += 1
-        if int(rec.get("movement_id") or 0) > 0:
-            added += 1
+        pending.append(
+            {
+                "action": "SET",
+                "item_key": item_key,
+                "item_name": item_name,
+                "category": category,
+                "tier": tier,
+                "enchant": enchant,
+                "quality": quality,
+                "quantity": qty,
+                "officer": actor,
+                "notes": notes,
+                "source": source,
+            }
+        )
 
     simple_key_re = re.compile(r"^(?P<key>.+\|T\d+\|[^|]+\|[^|\s]+)(?:\s*[xX*;,:-]\s*(?P<qty>\d+)|\s+(?P<qty2>\d+))?\s*$")
 
@@ -3148,6 +5212,9 @@ def import_armory_table_markdown(conn, backend: str, *, content: str, actor: str
             if hdr0 in ("item id", "item_id") or hdr1 in ("item name", "item_name"):
                 continue
             _import_row(raw_parts[:8], "armory_import_text")
+        results = record_armory_movements_batch(conn, backend, pending, auto_commit=False)
+        touched = len(results)
+        added = sum(1 for rec in results if int(rec.get("movement_id") or 0) > 0)
         conn.commit()
     except Exception:
         try:
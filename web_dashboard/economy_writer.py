@@ -0,0 +1,240 @@
+"""
+Single writer thread for the SQLite economy DB.
+
+SQLite allows one writer at a time; with every waitress thread opening its own
+connection, concurrent imports / armory moves used to fail with "database is
+locked". Mutations are instead submitted as callables ``fn(conn, backend)`` to one
+queue per database file and executed by one thread that owns the only writing
+connection. Reads keep using their own connections in parallel (WAL mode).
+
+Group commit: the writer drains whatever is queued (up to ``max_group`` jobs),
+runs them inside one ``BEGIN IMMEDIATE`` transaction with a SAVEPOINT per job and
+commits once. A job that raises is rolled back to its savepoint and gets its own
+exception; the other jobs of the group still commit. Service code calls
+``conn.commit()`` / ``conn.rollback()`` as usual: inside a job they are deferred to
+the group commit / mapped to the job savepoint.
+"""
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+_JOB_SAVEPOINT = "econ_write_job"
+_SAMPLE_WINDOW = 1024
+# Upper bound for a blocking run(): a stuck writer surfaces as an error instead of a hung request.
+RUN_TIMEOUT_S = 120.0
+
+
+class _JobConnection:
+    """Writer connection as seen by one job: commit is deferred, rollback undoes the job only."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        self._conn.execute(f"ROLLBACK TO SAVEPOINT {_JOB_SAVEPOINT}")
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+def _percentiles_ms(samples: Deque[float]) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000.0, 2)
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1] * 1000.0, 2)}
+
+
+class EconomyWriter:
+    def __init__(self, connect: Callable[[], sqlite3.Connection], *, max_group: int = 32, name: str = "economy-writer"):
+        self._connect = connect
+        self._max_group = max(1, int(max_group))
+        self._name = name
+        self._queue: "queue.Queue[Tuple[Callable, Future, float]]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._job_conn: Optional[_JobConnection] = None
+        self._stats_lock = threading.Lock()
+        self._queue_wait: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._lock_wait: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._commit_time: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._jobs = 0
+        self._groups = 0
+        self._job_errors = 0
+        self._group_errors = 0
+        self._max_group_seen = 0
+
+    def submit(self, fn: Callable[[Any, str], Any]) -> Future:
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("submit() from the writer thread would deadlock; use run()")
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((fn, fut, time.monotonic()))
+        return fut
+
+    def run(self, fn: Callable[[Any, str], Any], timeout: Optional[float] = RUN_TIMEOUT_S) -> Any:
+        """Run fn(conn, "sqlite") on the writer and return its result (re-raising its exception)."""
+        if threading.current_thread() is self._thread and self._job_conn is not None:
+            # Nested write from inside a job: same transaction, same savepoint.
+            return fn(self._job_conn, "sqlite")
+        return self.submit(fn).result(timeout=timeout)
+
+    def _ensure_started(self) -> None:
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                thread = threading.Thread(target=self._loop, name=self._name, daemon=True)
+                self._thread = thread
+                thread.start()
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        while True:
+            try:
+                _, fut, _ = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(exc)
+
+    def _loop(self) -> None:
+        try:
+            conn = self._connect()
+            # Explicit transaction control: BEGIN IMMEDIATE / SAVEPOINT / COMMIT below.
+            conn.isolation_level = None
+        except Exception as e:
+            # The thread exits; queued writes fail now and the next submit() starts a new thread.
+            with self._stats_lock:
+                self._group_errors += 1
+            with self._start_lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+            self._fail_pending(e)
+            return
+        while True:
+            group = [self._queue.get()]
+            while len(group) < self._max_group:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_group(conn, group)
+
+    def _run_group(self, conn: sqlite3.Connection, group: List[Tuple[Callable, Future, float]]) -> None:
+        started = time.monotonic()
+        outcomes: List[Tuple[Future, bool, Any]] = []
+        job_conn = _JobConnection(conn)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            for _, fut, _ in group:
+                fut.set_exception(e)
+            self._record(group, started, None, None, job_errors=len(group), group_error=True)
+            return
+        locked = time.monotonic()
+        self._job_conn = job_conn
+        try:
+            for fn, fut, _ in group:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                conn.execute(f"SAVEPOINT {_JOB_SAVEPOINT}")
+                try:
+                    result = fn(job_conn, "sqlite")
+                except BaseException as e:
+                    conn.execute(f"ROLLBACK TO SAVEPOINT {_JOB_SAVEPOINT}")
+                    conn.execute(f"RELEASE SAVEPOINT {_JOB_SAVEPOINT}")
+                    outcomes.append((fut, False, e))
+                    continue
+                conn.execute(f"RELEASE SAVEPOINT {_JOB_SAVEPOINT}")
+                outcomes.append((fut, True, result))
+            conn.execute("COMMIT")
+        except Exception as e:
+            # Commit (or savepoint bookkeeping) failed: nothing of this group is durable.
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            failed = {id(fut): (e if ok else err) for fut, ok, err in outcomes}
+            self._job_conn = None
+            for _, fut, _ in group:
+                # Includes the job that was running and the ones not started yet.
+                if fut.done():
+                    continue
+                if fut.running() or fut.set_running_or_notify_cancel():
+                    fut.set_exception(failed.get(id(fut), e))
+            self._record(group, started, locked, None, job_errors=len(group), group_error=True)
+            return
+        self._job_conn = None
+        committed = time.monotonic()
+        errors = 0
+        for fut, ok, value in outcomes:
+            if ok:
+                fut.set_result(value)
+            else:
+                errors += 1
+                fut.set_exception(value)
+        self._record(group, started, locked, committed, job_errors=errors, group_error=False)
+
+    def _record(self, group, started: float, locked: Optional[float], committed: Optional[float], *, job_errors: int, group_error: bool) -> None:
+        with self._stats_lock:
+            for _, _, enqueued in group:
+                self._queue_wait.append(max(0.0, started - enqueued))
+            if locked is not None:
+                self._lock_wait.append(locked - started)
+            if committed is not None and locked is not None:
+                self._commit_time.append(committed - locked)
+            self._jobs += len(group)
+            self._groups += 1
+            self._job_errors += job_errors
+            self._group_errors += 1 if group_error else 0
+            self._max_group_seen = max(self._max_group_seen, len(group))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize(),
+                "jobs": self._jobs,
+                "groups": self._groups,
+                "avg_group_size": round(self._jobs / float(self._groups), 2) if self._groups else None,
+                "max_group_size": self._max_group_seen,
+                "job_errors": self._job_errors,
+                "group_errors": self._group_errors,
+                # Time a mutation sat in the queue behind other writes of this process.
+                "queue_wait_ms": _percentiles_ms(self._queue_wait),
+                # BEGIN IMMEDIATE: waiting for the file write lock (other processes, e.g. the bot).
+                "lock_wait_ms": _percentiles_ms(self._lock_wait),
+                "transaction_ms": _percentiles_ms(self._commit_time),
+            }
+
+
+_writers: Dict[str, EconomyWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(path: str, connect: Callable[[], sqlite3.Connection]) -> EconomyWriter:
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = EconomyWriter(connect)
+            _writers[path] = writer
+        return writer
+
+
+def writer_stats() -> Dict[str, dict]:
+    with _writers_lock:
+        writers = dict(_writers)
+    return {path: w.stats() for path, w in writers.items()}
@@ -0,0 +1,114 @@
+"""Price history recorder: every fetched market price is appended to econ_price_history in batches."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from services.pricing_client import add_price_observer, remove_price_observer
+from web_dashboard.economy_db_sync import submit_economy_write
+from web_dashboard.economy_service import record_price_observations
+
+logger = logging.getLogger("price_history")
+
+
+def _flush_rows() -> int:
+    try:
+        return max(1, int(os.environ.get("ALBION_PRICE_HISTORY_FLUSH_ROWS", "200")))
+    except ValueError:
+        return 200
+
+
+def _flush_interval_seconds() -> float:
+    try:
+        return max(1.0, float(os.environ.get("ALBION_PRICE_HISTORY_FLUSH_SEC", "30")))
+    except ValueError:
+        return 30.0
+
+
+class PriceHistoryRecorder:
+    """
+    Price observer that buffers rows and writes them through the economy writer once
+    ``flush_rows`` are pending or ``flush_interval`` seconds passed since the last flush,
+    so quote requests never wait on the history insert.
+    """
+
+    def __init__(self, *, flush_rows: int = 200, flush_interval: float = 30.0, clock=time.monotonic):
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = float(flush_interval)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: List[dict] = []
+        self._flushed_at = clock()
+        self.recorded = 0
+        self.failed = 0
+
+    def __call__(self, rows: List[dict]) -> None:
+        with self._lock:
+            self._pending.extend(rows)
+            due = len(self._pending) >= self.flush_rows or self._clock() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Queue pending rows for writing; returns the write Future (None when nothing was pending)."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._flushed_at = self._clock()
+        if not rows:
+            return None
+        fut = submit_economy_write(lambda conn, backend: record_price_observations(conn, backend, rows))
+        fut.add_done_callback(lambda f: self._done(f, len(rows)))
+        return fut
+
+    def _done(self, fut, count: int) -> None:
+        err = fut.exception()
+        with self._lock:
+            if err is None:
+                self.recorded += count
+            else:
+                self.failed += count
+        if err is not None:
+            logger.error("Price history write failed (%s rows): %s", count, err)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._pending), "recorded": self.recorded, "failed": self.failed}
+
+
+_recorder: Optional[PriceHistoryRecorder] = None
+_install_lock = threading.Lock()
+
+
+def install_price_history_recorder() -> bool:
+    """Register the recorder as a price observer once per process (ALBION_PRICE_HISTORY=0 disables it)."""
+    global _recorder
+    if (os.environ.get("ALBION_PRICE_HISTORY") or "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    with _install_lock:
+        if _recorder is not None:
+            return False
+        _recorder = PriceHistoryRecorder(flush_rows=_flush_rows(), flush_interval=_flush_interval_seconds())
+        add_price_observer(_recorder)
+        return True
+
+
+def uninstall_price_history_recorder() -> None:
+    global _recorder
+    with _install_lock:
+        rec, _recorder = _recorder, None
+    if rec is not None:
+        remove_price_observer(rec)
+        rec.flush()
+
+
+def flush_price_history():
+    rec = _recorder
+    return rec.flush() if rec is not None else None
+
+
+def price_history_stats() -> dict:
+    rec = _recorder
+    return dict(rec.stats(), installed=True) if rec is not None else {"installed": False}
@@ -0,0 +1,137 @@
+"""Background price prefetcher: keeps armory / recent buyback and regear items warm in the price cache."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from services.item_catalog import load_item_catalog, refresh_item_dump
+from services.pricing_client import prefetch_items_24h_trimmed_mean
+from web_dashboard.economy_db_sync import ensure_economy_ready, get_economy_sync_connection
+from web_dashboard.economy_service import list_prefetch_item_ids
+from web_dashboard.price_history import flush_price_history
+
+logger = logging.getLogger("price_prefetch")
+
+_start_lock = threading.Lock()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _interval_seconds() -> float:
+    try:
+        return max(15.0, float(os.environ.get("ALBION_PRICING_PREFETCH_INTERVAL_SEC", "60")))
+    except ValueError:
+        return 60.0
+
+
+def _budget_per_minute() -> float:
+    try:
+        return max(1.0, float(os.environ.get("ALBION_PRICING_PREFETCH_BUDGET_PER_MIN", "10")))
+    except ValueError:
+        return 10.0
+
+
+def _recent_days() -> int:
+    try:
+        return max(1, int(os.environ.get("ALBION_PRICING_PREFETCH_RECENT_DAYS", "14")))
+    except ValueError:
+        return 14
+
+
+class RequestBudget:
+    """Token bucket: ``per_minute`` requests refill continuously, at most one minute's worth banked."""
+
+    def __init__(self, per_minute: float, *, clock=time.monotonic):
+        self.per_minute = float(per_minute)
+        self._clock = clock
+        self._tokens = self.per_minute
+        self._at = clock()
+        self._lock = threading.Lock()
+
+    def take(self, wanted: int) -> int:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.per_minute, self._tokens + (now - self._at) * self.per_minute / 60.0)
+            self._at = now
+            granted = max(0, min(int(wanted), int(self._tokens)))
+            self._tokens -= granted
+            return granted
+
+    def refund(self, unused: int) -> None:
+        with self._lock:
+            self._tokens = min(self.per_minute, self._tokens + max(0, int(unused)))
+
+
+_budget = RequestBudget(_budget_per_minute())
+_last_run: dict = {}
+
+
+def prefetch_once(budget: Optional[RequestBudget] = None) -> dict:
+    budget = budget or _budget
+    with get_economy_sync_connection() as (conn, backend):
+        item_ids = list_prefetch_item_ids(conn, backend, recent_days=_recent_days())
+    granted = budget.take(len(item_ids))
+    out = prefetch_items_24h_trimmed_mean(item_ids, max_requests=granted)
+    budget.refund(granted - out["requests"])
+    return out
+
+
+def _run() -> None:
+    global _last_run
+    while not _stop.is_set():
+        if (os.environ.get("ALBION_ITEMS_DUMP_REFRESH") or "1").strip().lower() not in ("0", "false", "no", "off"):
+            try:
+                # Autocomplete dump; only downloads when missing or older than ALBION_ITEMS_DUMP_MAX_AGE_H.
+                if refresh_item_dump():
+                    logger.info("Item catalog dump refreshed")
+            except Exception:
+                logger.exception("Item catalog dump refresh failed")
+        try:
+            # Index is built here, never inside an autocomplete request.
+            if load_item_catalog():
+                logger.info("Item catalog loaded")
+        except Exception:
+            logger.exception("Item catalog load failed")
+        try:
+            ensure_economy_ready()
+            out = prefetch_once()
+            _last_run = dict(out, at=time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()))
+            if out["requests"]:
+                logger.info("Price prefetch: %s", out)
+        except Exception:
+            logger.exception("Price prefetch failed")
+        try:
+            # Observations of quiet periods would otherwise sit in the buffer until the next burst.
+            flush_price_history()
+        except Exception:
+            logger.exception("Price history flush failed")
+        _stop.wait(_interval_seconds())
+
+
+def start_price_prefetcher() -> bool:
+    """Start the daemon thread once per process (ALBION_PRICING_PREFETCH=0 disables it)."""
+    global _thread
+    if (os.environ.get("ALBION_PRICING_PREFETCH") or "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    with _start_lock:
+        if _thread is not None and _thread.is_alive():
+            return False
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="price-prefetcher", daemon=True)
+        _thread.start()
+        return True
+
+
+def stop_price_prefetcher() -> None:
+    _stop.set()
+
+
+def prefetch_stats() -> dict:
+    return {
+        "running": _thread is not None and _thread.is_alive(),
+        "budget_per_minute": _budget.per_minute,
+        "last_run": dict(_last_run),
+    }
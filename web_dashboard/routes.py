@@ -13,8 +13,10 @@ from flask import (
     url_for,
 )
 
-import urllib.request
-
+from db_engine import engine_stats
+from services.http_client import http_client, http_client_stats
+from services.pricing_client import breaker_stats as pricing_breaker_stats
+from services.pricing_client import cache_stats as pricing_cache_stats
 from utils.command_permissions_catalog import get_role_assist_catalog
 from utils.role_config import parse_discord_snowflake_string, parse_single_snowflake
 
@@ -41,8 +43,16 @@ from web_dashboard.data_service import (
 )
 from web_dashboard.db_sync import fetch_all, get_sync_connection
 from web_dashboard.discord_roles_client import fetch_discord_guild_roles
-from web_dashboard.economy_db_sync import economy_db_meta, get_economy_sync_connection
+from web_dashboard.economy_cache import economy_data_cache
+from web_dashboard.economy_db_sync import (
+    economy_db_meta,
+    economy_writer_stats,
+    ensure_economy_ready,
+    get_economy_sync_connection,
+    run_economy_write,
+)
 from web_dashboard.economy_service import (
+    ECON_GENERATION_DOMAINS,
     create_manual_loot_buyback_from_price,
     create_regear_request,
     issue_regear_request,
@@ -50,14 +60,20 @@ from web_dashboard.economy_service import (
     csv_treasury_snapshot,
     cashflow_summary,
     create_routed_operation,
+    create_routed_operations_batch,
     economy_kpis,
+    clamp_page_limit,
     ensure_economy_schema,
     economy_db_counts,
     fetch_market_price,
+    parse_loot_list,
+    quote_loot_list,
     suggest_item_ids,
     forecast_summary,
     import_game_log_csv,
+    get_alert_state,
     get_config,
+    get_generations,
     set_config_values,
     apply_treasury_snapshot,
     list_alerts,
@@ -72,17 +88,23 @@ from web_dashboard.economy_service import (
     list_loot_buyback_requests,
     list_regear_requests,
     list_armory_stock,
+    armory_item_velocity,
+    armory_stock_as_of,
+    armory_valuation_as_of,
+    price_history_series,
     list_armory_movements,
+    keyset_page,
     record_armory_movement,
     import_armory_table_markdown,
     resolve_discrepancy,
     acknowledge_alert,
     pnl_summary,
     review_pending_entry,
-    run_alert_threshold_checks,
     upsert_routing_rule,
     reset_economy_data,
 )
+from web_dashboard.price_history import price_history_stats
+from web_dashboard.price_prefetch import prefetch_stats
 
 from event_templates_store import read_raw_text, save_raw_text, templates_file_path
 
@@ -93,6 +115,9 @@ def register_dashboard(app: Flask) -> None:
     def _econ_err(e: Exception) -> str:
         return f"{type(e).__name__}: {e}"
 
+    def _utc_hour() -> str:
+        return time.strftime("%Y-%m-%d %H", time.gmtime())
+
     def dashboard_secret() -> str:
         return (os.environ.get("DASHBOARD_SECRET") or "").strip()
 
@@ -211,6 +236,8 @@ def register_dashboard(app: Flask) -> None:
         system = get_system_snapshot(bot_meta)
         system.update(db_storage)
         system["db_query_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        system["db_engine"] = engine_stats()
+        system["http_client"] = http_client_stats()
         try:
             from keep_alive import get_http_uptime_s
 
@@ -619,10 +646,22 @@ def register_dashboard(app: Flask) -> None:
         entry_status = str(request.args.get("entry_status", "") or "").strip().lower()
         category_q = str(request.args.get("category", "") or "").strip()
         source_q = str(request.args.get("source", "") or "").strip()
+        cache = economy_data_cache()
         try:
+            ensure_economy_ready()
             with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
-                alert_state = run_alert_threshold_checks(conn, backend)
+                # Each section is recomputed only when a domain it reads from was written
+                # (generation bumped); time-windowed reports also roll over every UTC hour.
+                gens = {**get_generations(conn, backend), "hour": _utc_hour()}
+
+                def section(name, domains, compute, params=()):
+                    return cache.get_or_compute(name, compute, generations=gens, domains=domains, params=params)
+
+                def snapshot_section(name, domains, compute):
+                    # An unchanged generation means the cached totals are still current: stamp read time, not compute time.
+                    return dict(section(name, domains, compute), as_of_utc=time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()))
+
+                entry_filters = (entry_status, category_q, source_q)
                 payload = {
                     "ok": True,
                     "filters": {
@@ -631,38 +670,49 @@ def register_dashboard(app: Flask) -> None:
                         "category": category_q,
                         "source": source_q,
                     },
-                    "kpis": economy_kpis(conn, backend),
-                    "entries": list_recent_entries(
-                        conn,
-                        backend,
-                        160,
-                        status=entry_status,
-                        category_like=category_q,
-                        source_like=source_q,
+                    "kpis": section("kpis", ("ledger", "discrepancies", "alerts"), lambda: economy_kpis(conn, backend)),
+                    "entries": section(
+                        "entries",
+                        ("ledger",),
+                        lambda: list_recent_entries(
+                            conn,
+                            backend,
+                            160,
+                            status=entry_status,
+                            category_like=category_q,
+                            source_like=source_q,
+                        ),
+                        entry_filters,
                     ),
-                    "routing_rules": list_routing_rules(conn, backend),
-                    "loot_buybacks": list_loot_buyback_requests(conn, backend, 80),
-                    "regear_requests": list_regear_requests(conn, backend, 80),
-                    "armory_stock": list_armory_stock(conn, backend, 600),
-                    "armory_movements": list_armory_movements(conn, backend, 600),
-                    "imports": list_game_log_imports(conn, backend, 40),
-                    "pending_approvals": list_pending_approvals(conn, backend, 120),
-                    "audit_trail": list_audit_trail(conn, backend, 180),
-                    "discrepancies": list_discrepancy_queue(conn, backend, 180),
-                    "alerts": list_alerts(conn, backend, 100),
-                    "alert_state": alert_state,
-                    "config": get_config(conn, backend),
+                    "routing_rules": section("routing_rules", ("config",), lambda: list_routing_rules(conn, backend)),
+                    "loot_buybacks": section("loot_buybacks", ("ledger",), lambda: list_loot_buyback_requests(conn, backend, 80)),
+                    "regear_requests": section("regear_requests", ("ledger",), lambda: list_regear_requests(conn, backend, 80)),
+                    "armory_stock": section("armory_stock", ("armory",), lambda: list_armory_stock(conn, backend, 600)),
+                    "armory_movements": section("armory_movements", ("armory",), lambda: list_armory_movements(conn, backend, 600)),
+                    "imports": section("imports", ("imports",), lambda: list_game_log_imports(conn, backend, 40)),
+                    "pending_approvals": section("pending_approvals", ("ledger",), lambda: list_pending_approvals(conn, backend, 120)),
+                    "audit_trail": section("audit_trail", ECON_GENERATION_DOMAINS, lambda: list_audit_trail(conn, backend, 180)),
+                    "discrepancies": section("discrepancies", ("discrepancies",), lambda: list_discrepancy_queue(conn, backend, 180)),
+                    "alerts": section("alerts", ("alerts",), lambda: list_alerts(conn, backend, 100)),
+                    # Evaluated by the background alert evaluator; GET only reads the stored state.
+                    "alert_state": get_alert_state(conn, backend),
+                    "config": section("config", ("config",), lambda: get_config(conn, backend)),
                     "reports": {
-                        "balance_snapshot": balance_snapshot(conn, backend),
-                        "csv_treasury_snapshot": csv_treasury_snapshot(conn, backend),
-                        "pnl_summary": pnl_summary(conn, backend, days),
-                        "cashflow_summary": cashflow_summary(conn, backend, days),
+                        "balance_snapshot": snapshot_section("balance_snapshot", ("ledger",), lambda: balance_snapshot(conn, backend)),
+                        "csv_treasury_snapshot": snapshot_section(
+                            "csv_treasury_snapshot", ("imports",), lambda: csv_treasury_snapshot(conn, backend)
+                        ),
+                        "pnl_summary": section("pnl_summary", ("ledger", "hour"), lambda: pnl_summary(conn, backend, days), days),
+                        "cashflow_summary": section(
+                            "cashflow_summary", ("ledger", "hour"), lambda: cashflow_summary(conn, backend, days), days
+                        ),
                     },
-                    "forecast": forecast_summary(conn, backend),
+                    "forecast": section("forecast", ("ledger", "hour"), lambda: forecast_summary(conn, backend)),
                     "db_info": economy_db_meta(),
                 }
-            # Player nickname suggestions come from the main bot DB.
-            try:
+
+            # Player nickname suggestions come from the main bot DB (no generation counter there).
+            def _player_suggestions():
                 with get_sync_connection() as (main_conn, main_backend):
                     player_rows = fetch_all(
                         main_conn,
@@ -676,9 +726,12 @@ def register_dashboard(app: Flask) -> None:
                         """,
                         (),
                     )
-                    payload["player_suggestions"] = [
-                        str(r.get("nickname") or "").strip() for r in player_rows if str(r.get("nickname") or "").strip()
-                    ]
+                return [str(r.get("nickname") or "").strip() for r in player_rows if str(r.get("nickname") or "").strip()]
+
+            try:
+                payload["player_suggestions"] = cache.get_or_compute_ttl(
+                    "player_suggestions", _player_suggestions, ttl_seconds=300
+                )
             except Exception:
                 payload["player_suggestions"] = []
         except Exception as e:
@@ -693,8 +746,8 @@ def register_dashboard(app: Flask) -> None:
     @login_required
     def dashboard_economy_health():
         try:
+            ensure_economy_ready()
             with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
                 counts = economy_db_counts(conn, backend)
                 return app.response_class(
                     response=json.dumps(
@@ -703,6 +756,15 @@ def register_dashboard(app: Flask) -> None:
                             "backend": backend,
                             "db_info": economy_db_meta(),
                             "counts": counts,
+                            "generations": get_generations(conn, backend),
+                            "data_cache": economy_data_cache().stats(),
+                            "sqlite_writer": economy_writer_stats(),
+                            "db_engine": engine_stats(),
+                            "price_cache": pricing_cache_stats(),
+                            "price_breaker": pricing_breaker_stats(),
+                            "price_prefetch": prefetch_stats(),
+                            "price_history": price_history_stats(),
+                            "http_client": http_client_stats(),
                         },
                         default=str,
                     ),
@@ -722,14 +784,16 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_loot_buyback():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = create_manual_loot_buyback_from_price(
+                return create_manual_loot_buyback_from_price(
                     conn,
                     backend,
                     buyback_price=int(body.get("buyback_price") or 0),
                     actor=str(body.get("approved_by") or "dashboard_admin").strip(),
                 )
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -752,7 +816,7 @@ def register_dashboard(app: Flask) -> None:
         body = request.get_json(silent=True) or {}
         action = str(body.get("action") or "create").strip().lower()
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
                 if action == "issue":
                     out = issue_regear_request(
@@ -784,6 +848,9 @@ def register_dashboard(app: Flask) -> None:
                         screenshot_url=screenshot_url,
                         note=str(body.get("note") or "").strip(),
                     )
+                return out
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -805,9 +872,9 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_award():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = create_routed_operation(
+                return create_routed_operation(
                     conn,
                     backend,
                     category="reward_payout",
@@ -816,6 +883,8 @@ def register_dashboard(app: Flask) -> None:
                     actor=str(body.get("approved_by") or "dashboard_admin").strip(),
                     source="economy_dashboard",
                 )
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -837,9 +906,9 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_route_op():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = create_routed_operation(
+                return create_routed_operation(
                     conn,
                     backend,
                     category=str(body.get("category") or "").strip(),
@@ -848,6 +917,8 @@ def register_dashboard(app: Flask) -> None:
                     actor=str(body.get("actor") or "dashboard").strip(),
                     source=str(body.get("source") or "dashboard").strip(),
                 )
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -864,14 +935,53 @@ def register_dashboard(app: Flask) -> None:
             )
         return app.response_class(response=json.dumps({"ok": True, "result": out}, default=str), mimetype="application/json")
 
+    @app.route("/dashboard/api/economy/route-op/batch", methods=["POST"])
+    @login_required
+    def dashboard_economy_route_op_batch():
+        body = request.get_json(silent=True) or {}
+        try:
+            operations = body.get("operations")
+            if not isinstance(operations, list):
+                raise ValueError("operations must be a list")
+            def _write(conn, backend):
+                ensure_economy_schema(conn, backend)
+                return create_routed_operations_batch(
+                    conn,
+                    backend,
+                    operations,
+                    actor=str(body.get("actor") or "dashboard").strip(),
+                    source=str(body.get("source") or "dashboard").strip(),
+                )
+
+            out = run_economy_write(_write)
+        except ValueError as e:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=400,
+                mimetype="application/json",
+            )
+        except Exception as e:
+            app.logger.exception("Economy route-op batch failed")
+            print("Economy route-op batch failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(
+            response=json.dumps(out, default=str),
+            status=200 if out["ok"] else 400,
+            mimetype="application/json",
+        )
+
     @app.route("/dashboard/api/economy/review-entry", methods=["POST"])
     @login_required
     def dashboard_economy_review_entry():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = review_pending_entry(
+                return review_pending_entry(
                     conn,
                     backend,
                     entry_id=int(body.get("entry_id") or 0),
@@ -879,6 +989,8 @@ def register_dashboard(app: Flask) -> None:
                     reviewed_by=str(body.get("reviewed_by") or "dashboard_admin").strip(),
                     note=str(body.get("note") or "").strip(),
                 )
+
+            out = run_economy_write(_write)
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": str(e)}, default=str),
@@ -892,15 +1004,17 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_resolve_discrepancy():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                updated = resolve_discrepancy(
+                return resolve_discrepancy(
                     conn,
                     backend,
                     discrepancy_id=int(body.get("id") or 0),
                     resolved_by=str(body.get("resolved_by") or "dashboard_admin").strip(),
                     note=str(body.get("note") or "").strip(),
                 )
+
+            updated = run_economy_write(_write)
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": str(e)}, default=str),
@@ -915,7 +1029,7 @@ def register_dashboard(app: Flask) -> None:
         body = request.get_json(silent=True) or {}
         try:
             values = body.get("values")
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
                 set_config_values(
                     conn,
@@ -923,7 +1037,9 @@ def register_dashboard(app: Flask) -> None:
                     values=values,
                     actor=str(body.get("updated_by") or "dashboard_admin").strip(),
                 )
-                cfg = get_config(conn, backend)
+                return get_config(conn, backend)
+
+            cfg = run_economy_write(_write)
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": str(e)}, default=str),
@@ -940,9 +1056,11 @@ def register_dashboard(app: Flask) -> None:
             cash = int(body.get("cash") or 0)
             energy = int(body.get("energy") or 0)
             actor = str(body.get("actor") or "dashboard_admin").strip() or "dashboard_admin"
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = apply_treasury_snapshot(conn, backend, cash=cash, energy=energy, actor=actor)
+                return apply_treasury_snapshot(conn, backend, cash=cash, energy=energy, actor=actor)
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -971,8 +1089,10 @@ def register_dashboard(app: Flask) -> None:
                 mimetype="application/json",
             )
         try:
-            with get_economy_sync_connection() as (conn, backend):
-                out = reset_economy_data(conn, backend)
+            def _write(conn, backend):
+                return reset_economy_data(conn, backend)
+
+            out = run_economy_write(_write)
         except Exception as e:
             app.logger.exception("Economy reset-all failed")
             print("Economy reset-all failed:", _econ_err(e), flush=True)
@@ -991,15 +1111,17 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_ack_alert():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                updated = acknowledge_alert(
+                return acknowledge_alert(
                     conn,
                     backend,
                     alert_id=int(body.get("id") or 0),
                     acknowledged_by=str(body.get("acknowledged_by") or "dashboard_admin").strip(),
                     note=str(body.get("note") or "").strip(),
                 )
+
+            updated = run_economy_write(_write)
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": str(e)}, default=str),
@@ -1013,7 +1135,7 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_routing_rule():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
                 upsert_routing_rule(
                     conn,
@@ -1024,6 +1146,8 @@ def register_dashboard(app: Flask) -> None:
                     require_approval=bool(body.get("require_approval", False)),
                     tag=str(body.get("tag") or "").strip(),
                 )
+
+            run_economy_write(_write)
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": str(e)}, default=str),
@@ -1040,9 +1164,11 @@ def register_dashboard(app: Flask) -> None:
             log_type = str(body.get("log_type") or "").strip().lower()
             content = str(body.get("content") or "")
             smart_merge = bool(body.get("smart_merge", True))
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = import_game_log_csv(conn, backend, log_type=log_type, content=content, smart_merge=smart_merge)
+                return import_game_log_csv(conn, backend, log_type=log_type, content=content, smart_merge=smart_merge)
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -1076,6 +1202,31 @@ def register_dashboard(app: Flask) -> None:
             mimetype="application/json",
         )
 
+    @app.route("/dashboard/api/economy/loot-quote", methods=["POST"])
+    @login_required
+    def dashboard_economy_loot_quote():
+        body = request.get_json(silent=True) or {}
+        try:
+            items = body.get("items")
+            if not isinstance(items, list):
+                items = parse_loot_list(str(body.get("text") or ""))
+            out = quote_loot_list(items)
+        except ValueError as e:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=400,
+                mimetype="application/json",
+            )
+        except Exception as e:
+            app.logger.exception("Economy loot-quote failed")
+            print("Economy loot-quote failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(response=json.dumps({"ok": True, "quote": out}, default=str), mimetype="application/json")
+
     @app.route("/dashboard/api/economy/item-suggest", methods=["GET"])
     @login_required
     def dashboard_economy_item_suggest():
@@ -1121,8 +1272,8 @@ def register_dashboard(app: Flask) -> None:
         date_from = str(request.args.get("date_from") or "").strip() or None
         date_to = str(request.args.get("date_to") or "").strip() or None
         try:
+            ensure_economy_ready()
             with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
                 if scope == "current" or import_id_raw == "__current":
                     rows = list_current_player_totals(
                         conn,
@@ -1173,18 +1324,26 @@ def register_dashboard(app: Flask) -> None:
         except ValueError:
             days = 30
         days = max(1, min(days, 365))
+        as_of = str(request.args.get("as_of") or "").strip() or None
         try:
+            ensure_economy_ready()
             with get_economy_sync_connection() as (conn, backend):
-                ensure_economy_schema(conn, backend)
                 out = {
                     "ok": True,
-                    "balance_snapshot": balance_snapshot(conn, backend),
-                    "pnl_summary": pnl_summary(conn, backend, days),
-                    "cashflow_summary": cashflow_summary(conn, backend, days),
+                    "as_of": as_of,
+                    "balance_snapshot": balance_snapshot(conn, backend, as_of=as_of),
+                    "pnl_summary": pnl_summary(conn, backend, days, as_of=as_of),
+                    "cashflow_summary": cashflow_summary(conn, backend, days, as_of=as_of),
                     "forecast": forecast_summary(conn, backend),
                     "db_counts": economy_db_counts(conn, backend),
                     "db_info": economy_db_meta(),
                 }
+        except ValueError as e:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=400,
+                mimetype="application/json",
+            )
         except Exception as e:
             app.logger.exception("Economy reports failed")
             print("Economy reports failed:", _econ_err(e), flush=True)
@@ -1200,9 +1359,9 @@ def register_dashboard(app: Flask) -> None:
     def dashboard_economy_armory_move():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = record_armory_movement(
+                return record_armory_movement(
                     conn,
                     backend,
                     action=str(body.get("action") or "").strip().upper(),
@@ -1219,6 +1378,8 @@ def register_dashboard(app: Flask) -> None:
                     unit_cost=int(body.get("unit_cost") or 0),
                     source="armory_web",
                 )
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -1233,19 +1394,220 @@ def register_dashboard(app: Flask) -> None:
             )
         return app.response_class(response=json.dumps(out, default=str), mimetype="application/json")
 
+    @app.route("/dashboard/api/economy/armory-stock-as-of", methods=["GET"])
+    @login_required
+    def dashboard_economy_armory_stock_as_of():
+        as_of = str(request.args.get("as_of") or "").strip()
+        item_key = str(request.args.get("item_key") or "").strip()
+        try:
+            if not as_of:
+                raise ValueError("as_of is required (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS UTC)")
+            ensure_economy_ready()
+            with get_economy_sync_connection() as (conn, backend):
+                out = armory_stock_as_of(conn, backend, as_of, item_key=item_key)
+        except ValueError as e:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=400,
+                mimetype="application/json",
+            )
+        except Exception as e:
+            app.logger.exception("Economy armory stock-as-of failed")
+            print("Economy armory stock-as-of failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(response=json.dumps({"ok": True, **out}, default=str), mimetype="application/json")
+
+    @app.route("/dashboard/api/economy/armory-valuation", methods=["GET"])
+    @login_required
+    def dashboard_economy_armory_valuation():
+        as_of = str(request.args.get("as_of") or "").strip()
+        try:
+            if not as_of:
+                raise ValueError("as_of is required (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS UTC)")
+            lookback_days = int(request.args.get("lookback_days", 7))
+            ensure_economy_ready()
+            with get_economy_sync_connection() as (conn, backend):
+                out = armory_valuation_as_of(conn, backend, as_of, lookback_days=lookback_days)
+        except ValueError as e:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=400,
+                mimetype="application/json",
+            )
+        except Exception as e:
+            app.logger.exception("Economy armory valuation failed")
+            print("Economy armory valuation failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(response=json.dumps({"ok": True, **out}, default=str), mimetype="application/json")
+
+    @app.route("/dashboard/api/economy/price-history", methods=["GET"])
+    @login_required
+    def dashboard_economy_price_history():
+        args = request.args
+        try:
+            ensure_economy_ready()
+            with get_economy_sync_connection() as (conn, backend):
+                out = price_history_series(
+                    conn,
+                    backend,
+                    str(args.get("item_id") or ""),
+                    city=str(args.get("city") or "").strip(),
+                    quality=int(args.get("quality", 1)),
+                    start=str(args.get("from") or "").strip(),
+                    end=str(args.get("to") or "").strip(),
+                    buckets=int(args.get("buckets", 60)),
+                    points=int(args.get("points", 200)),
+                    field=str(args.get("field") or "sell_min").strip(),
+                )
+        except ValueError as e:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=400,
+                mimetype="application/json",
+            )
+        except Exception as e:
+            app.logger.exception("Economy price history failed")
+            print("Economy price history failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(response=json.dumps({"ok": True, **out}, default=str), mimetype="application/json")
+
+    @app.route("/dashboard/api/economy/armory-velocity", methods=["GET"])
+    @login_required
+    def dashboard_economy_armory_velocity():
+        try:
+            weeks = int(request.args.get("weeks", 12))
+        except ValueError:
+            weeks = 12
+        try:
+            limit = int(request.args.get("limit", 20))
+        except ValueError:
+            limit = 20
+        try:
+            ensure_economy_ready()
+            with get_economy_sync_connection() as (conn, backend):
+                out = armory_item_velocity(conn, backend, weeks=weeks, limit=limit)
+        except Exception as e:
+            app.logger.exception("Economy armory velocity failed")
+            print("Economy armory velocity failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(response=json.dumps({"ok": True, **out}, default=str), mimetype="application/json")
+
+    def _economy_history_page(kind: str, default_limit: int, load):
+        """Keyset-paged history listing: ?before_id= pages back, ?after_id= pages forward."""
+        label = kind.replace("_", " ")
+        try:
+            # Same clamp as the service reader, so next_before_id is computed against the real page size.
+            limit = clamp_page_limit(kind, int(request.args.get("limit", default_limit)))
+            before_id = int(request.args["before_id"]) if str(request.args.get("before_id") or "").strip() else None
+            after_id = int(request.args["after_id"]) if str(request.args.get("after_id") or "").strip() else None
+        except ValueError:
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": "limit, before_id and after_id must be integers"}),
+                status=400,
+                mimetype="application/json",
+            )
+        try:
+            ensure_economy_ready()
+            with get_economy_sync_connection() as (conn, backend):
+                rows = load(conn, backend, limit, before_id, after_id)
+        except Exception as e:
+            app.logger.exception("Economy %s page failed", label)
+            print(f"Economy {label} page failed:", _econ_err(e), flush=True)
+            return app.response_class(
+                response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
+                status=500,
+                mimetype="application/json",
+            )
+        return app.response_class(
+            response=json.dumps({"ok": True, **keyset_page(rows, limit)}, default=str),
+            mimetype="application/json",
+        )
+
+    @app.route("/dashboard/api/economy/entries", methods=["GET"])
+    @login_required
+    def dashboard_economy_entries_page():
+        args = request.args
+        return _economy_history_page(
+            "entries",
+            120,
+            lambda conn, backend, limit, before_id, after_id: list_recent_entries(
+                conn,
+                backend,
+                limit,
+                status=str(args.get("status") or "").strip(),
+                category_like=str(args.get("category") or ""),
+                source_like=str(args.get("source") or ""),
+                search=str(args.get("q") or ""),
+                before_id=before_id,
+                after_id=after_id,
+            ),
+        )
+
+    @app.route("/dashboard/api/economy/audit", methods=["GET"])
+    @login_required
+    def dashboard_economy_audit_page():
+        return _economy_history_page(
+            "audit",
+            250,
+            lambda conn, backend, limit, before_id, after_id: list_audit_trail(
+                conn, backend, limit, before_id=before_id, after_id=after_id
+            ),
+        )
+
+    @app.route("/dashboard/api/economy/armory-movements", methods=["GET"])
+    @login_required
+    def dashboard_economy_armory_movements_page():
+        return _economy_history_page(
+            "armory_movements",
+            500,
+            lambda conn, backend, limit, before_id, after_id: list_armory_movements(
+                conn, backend, limit, before_id=before_id, after_id=after_id
+            ),
+        )
+
+    @app.route("/dashboard/api/economy/discrepancies", methods=["GET"])
+    @login_required
+    def dashboard_economy_discrepancies_page():
+        status = str(request.args.get("status") or "").strip()
+        return _economy_history_page(
+            "discrepancies",
+            200,
+            lambda conn, backend, limit, before_id, after_id: list_discrepancy_queue(
+                conn, backend, limit, status=status, before_id=before_id, after_id=after_id
+            ),
+        )
+
     @app.route("/dashboard/api/economy/armory-import", methods=["POST"])
     @login_required
     def dashboard_economy_armory_import():
         body = request.get_json(silent=True) or {}
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = import_armory_table_markdown(
+                return import_armory_table_markdown(
                     conn,
                     backend,
                     content=str(body.get("content") or ""),
                     actor=str(body.get("actor") or "dashboard_admin").strip() or "dashboard_admin",
                 )
+
+            out = run_economy_write(_write)
         except ValueError as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -1301,16 +1663,15 @@ def register_dashboard(app: Flask) -> None:
 
         export_url = _to_csv_export(sheet_url)
         try:
-            req = urllib.request.Request(
+            content = http_client().request(
+                "GET",
                 export_url,
                 headers={
                     "User-Agent": "albion-analytics-dashboard/1.0",
                     "Accept": "text/csv,text/plain,*/*",
                 },
-                method="GET",
-            )
-            with urllib.request.urlopen(req, timeout=12) as resp:
-                content = resp.read().decode("utf-8", errors="replace")
+                timeout=12,
+            ).text()
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": f"Failed to fetch sheet: {_econ_err(e)}"}, default=str),
@@ -1318,9 +1679,11 @@ def register_dashboard(app: Flask) -> None:
                 mimetype="application/json",
             )
         try:
-            with get_economy_sync_connection() as (conn, backend):
+            def _write(conn, backend):
                 ensure_economy_schema(conn, backend)
-                out = import_armory_table_markdown(conn, backend, content=content, actor=actor)
+                return import_armory_table_markdown(conn, backend, content=content, actor=actor)
+
+            out = run_economy_write(_write)
         except Exception as e:
             return app.response_class(
                 response=json.dumps({"ok": False, "error": _econ_err(e)}, default=str),
@@ -441,7 +441,7 @@ function MainDashboard() {
     }
     if (active === "tickets") return html`<${DataTable} columns=${["ID", "Status", "Player", "Mentor", "Created"]} rows=${ticketsRows} />`;
     if (active === "events") return html`<${DataTable} columns=${["Content", "Events", "Avg players", "Unique players"]} rows=${eventsRows} />`;
-    if (active === "system") return html`<div className="grid gap-4 md:grid-cols-2 xl:grid-cols-4"><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">Bot signal</p><p className="mt-2 text-2xl font-medium">${botHealth.signal_status || "unknown"}</p></div><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">DB latency</p><p className="mt-2 text-2xl font-medium">${fmt(data.system?.db_query_ms)} ms</p></div><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">HTTP uptime</p><p className="mt-2 text-2xl font-medium">${fmt(data.system?.http_server_uptime_s)} s</p></div><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">Python</p><p className="mt-2 text-2xl font-medium">${data.system?.python_version || "—"}</p></div></div><div className="mt-4"><${HealthStatusCard} botHealth=${botHealth} /></div>`;
+    if (active === "system") return html`<div className="grid gap-4 md:grid-cols-2 xl:grid-cols-4"><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">Bot signal</p><p className="mt-2 text-2xl font-medium">${botHealth.signal_status || "unknown"}</p></div><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">DB latency</p><p className="mt-2 text-2xl font-medium">${fmt(data.system?.db_query_ms)} ms</p></div><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">HTTP uptime</p><p className="mt-2 text-2xl font-medium">${fmt(data.system?.http_server_uptime_s)} s</p></div><div className="${glass} p-4"><p className="text-xs uppercase tracking-[0.13em] text-slate-300">Python</p><p className="mt-2 text-2xl font-medium">${data.system?.python_version || "—"}</p></div></div><div className="mt-4"><${HealthStatusCard} botHealth=${botHealth} /></div>${Object.keys(data.system?.http_client?.hosts || {}).length ? html`<div className="mt-4 grid gap-4 xl:grid-cols-2">${Object.entries(data.system.http_client.hosts).map(([host, h]) => html`<${ChartShell} key=${host} title=${`API latency · ${host}`} subtitle=${`p50 ${fmt(h.latency_ms?.p50)} ms · p95 ${fmt(h.latency_ms?.p95)} ms · ${h.requests} req · ${h.errors} err · ${h.reused_connections} reused`}><${LineChart} labels=${(h.latency_ms?.recent || []).map((_, i) => String(i + 1))} values=${h.latency_ms?.recent || []} /></${ChartShell}>`)}</div>` : null}`;
     const shownRows = playersRows.slice(0, playersExpanded ? playersRows.length : 5);
     return html`<div className="${glass} p-5"><p className="mb-3 text-sm font-medium">Register player</p><div className="grid gap-3 md:grid-cols-2"><input id="reg-nick" className="apple-control-input rounded-xl px-3 py-2 text-sm" placeholder="Nickname" /><input id="reg-username" className="apple-control-input rounded-xl px-3 py-2 text-sm" placeholder="Discord username" /><input id="reg-discord-id" className="apple-control-input rounded-xl px-3 py-2 text-sm" type="number" min="1" placeholder="Discord ID" /><select id="reg-status" className="apple-control-input apple-select-contrast rounded-xl px-3 py-2 text-sm"><option value="pending">pending</option><option value="active">active</option><option value="mentor">mentor</option><option value="founder">founder</option></select><button className="apple-control-btn rounded-xl px-3 py-2 text-sm" onClick=${async () => { const nick = document.getElementById("reg-nick")?.value || ""; const user = document.getElementById("reg-username")?.value || ""; const did = Number(document.getElementById("reg-discord-id")?.value || 0); const status = document.getElementById("reg-status")?.value || "pending"; const gid = Number(guildId || data.guilds?.[0]?.id || 0); await fetch("/dashboard/api/players/register", { method: "POST", credentials: "same-origin", headers: { "Content-Type": "application/json" }, body: JSON.stringify({ nickname: nick, discord_username: user, discord_id: did, guild_id: gid, status }) }); load({ force: true }); }}>Register player</button></div></div><div className="${glass} mt-4 p-4"><button className="flex w-full items-center justify-between rounded-xl bg-white/5 px-3 py-2 text-left text-sm" onClick=${() => setPlayersExpanded((v) => !v)}><span>Players list (${playersRows.length})</span><span className=${`transition-transform duration-300 ${playersExpanded ? "rotate-180" : "rotate-0"}`}>⌄</span></button></div><${DataTable} columns=${["Nickname", "Guild", "Status", "Sessions", "Avg", "Open tickets"]} rows=${shownRows} />`;
   }, [active, data, loading, playersExpanded, guildId]);
@@ -466,6 +466,8 @@ function EconomyDashboard() {
   const [armorySheetUrl, setArmorySheetUrl] = useState("");
   const [buybackPrice, setBuybackPrice] = useState("");
   const [regear, setRegear] = useState({ player_name: "", content_type: "", unit_cost: "", note: "" });
+  const [lootList, setLootList] = useState("");
+  const [lootQuote, setLootQuote] = useState(null);
   const preload = readPreload();
 
   const load = async ({ force = false } = {}) => {
@@ -527,6 +529,24 @@ function EconomyDashboard() {
     }
   };
 
+  const quoteLootList = async () => {
+    setOpMsg("Pricing loot list...");
+    try {
+      const out = await fetch("/dashboard/api/economy/loot-quote", {
+        method: "POST",
+        credentials: "same-origin",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ text: lootList }),
+      }).then((r) => r.json());
+      if (!out.ok) throw new Error(out.error || "Quote failed");
+      setLootQuote(out.quote);
+      setOpMsg(out.quote.stale_count ? `Quoted (${out.quote.stale_count} stale price(s)).` : "Quoted.");
+    } catch (e) {
+      setLootQuote(null);
+      setOpMsg(String(e.message || e));
+    }
+  };
+
   const k = data.kpis || {};
   const rep = data.reports || {};
   const entriesRows = (data.entries || []).slice(0, 80).map((e) => [e.id, e.category || e.entry_type || "—", e.amount ?? "—", e.status || "—", e.created_at || e.ts || "—"]);
@@ -604,6 +624,10 @@ function EconomyDashboard() {
         <h3 className="text-sm font-medium">Loot buyback</h3>
         <input className="apple-control-input mt-3 w-full rounded-xl px-3 py-2 text-sm" type="number" min="1" placeholder="Buyback price" value=${buybackPrice} onChange=${(e) => setBuybackPrice(e.target.value)} />
         <button className="apple-control-btn mt-3 rounded-xl px-3 py-2 text-sm" onClick=${() => post("/dashboard/api/economy/loot-buyback", { buyback_price: Number(buybackPrice || 0), approved_by: "dashboard_admin" })}>Create buyback</button>
+        <h3 className="mt-6 text-sm font-medium">Quote a loot list</h3>
+        <textarea className="apple-control-input mt-3 w-full rounded-xl px-3 py-2 text-sm" rows="4" placeholder=${"T4_BAG 3\nT6_CAPE x2"} value=${lootList} onChange=${(e) => setLootList(e.target.value)}></textarea>
+        <button className="apple-control-btn mt-3 rounded-xl px-3 py-2 text-sm" onClick=${quoteLootList}>Quote</button>
+        ${lootQuote ? html`<div className="mt-3"><${DataTable} columns=${["Item", "Qty", "Unit", "Payout", "Note"]} rows=${lootQuote.items.map((q) => [q.item_id, q.quantity, q.market_unit_price ?? "—", q.payout_total, q.error ? (q.stale ? "stale" : q.error) : "—"])} /><p className="apple-muted mt-2 text-sm">Payout ${lootQuote.payout_total} (market ${lootQuote.market_total}, -${lootQuote.discount_percent}%)</p></div>` : null}
         <h3 className="mt-6 text-sm font-medium">Regear request</h3>
         <input className="apple-control-input mt-3 w-full rounded-xl px-3 py-2 text-sm" placeholder="Player nickname" value=${regear.player_name} onChange=${(e) => setRegear((v) => ({ ...v, player_name: e.target.value }))} />
         <input className="apple-control-input mt-2 w-full rounded-xl px-3 py-2 text-sm" placeholder="Content type" value=${regear.content_type} onChange=${(e) => setRegear((v) => ({ ...v, content_type: e.target.value }))} />
@@ -638,7 +662,7 @@ function EconomyDashboard() {
         ${opMsg ? html`<p className="apple-muted mt-3 text-sm">${opMsg}</p>` : null}
       </${PreviewModal}>
     </div>`;
-  }, [active, data, loading, opMsg, buybackPrice, regear]);
+  }, [active, data, loading, opMsg, buybackPrice, regear, lootList, lootQuote]);
 
   return html`<div className="apple-shell min-h-screen"><header className=${`${glass} mb-4 p-4`}><h1 className="apple-kern-title text-3xl font-medium">Economy Dashboard</h1><p className="apple-muted text-sm">Design QA pass</p></header><div className=${`${glass} mb-4 flex flex-wrap items-center gap-3 p-4`}><label className="text-sm">Days <input className="ml-2 apple-control-input w-20 rounded-xl px-2 py-1" type="number" min="1" max="365" value=${days} onChange=${(e) => setDays(Number(e.target.value || 7))} /></label><label className="text-sm">Status <input className="ml-2 apple-control-input w-32 rounded-xl px-2 py-1" value=${entryStatus} onChange=${(e) => setEntryStatus(e.target.value)} placeholder="pending/posted" /></label><label className="text-sm">Category <input className="ml-2 apple-control-input w-36 rounded-xl px-2 py-1" value=${category} onChange=${(e) => setCategory(e.target.value)} placeholder="regear" /></label><label className="text-sm">Source <input className="ml-2 apple-control-input w-36 rounded-xl px-2 py-1" value=${source} onChange=${(e) => setSource(e.target.value)} placeholder="dashboard" /></label><button className="apple-control-btn rounded-xl px-3 py-2 text-sm" onClick=${() => load({ force: true })}>Refresh</button><div className="ml-auto flex gap-2"><a className="apple-control-btn rounded-xl px-3 py-2 text-sm text-white no-underline" href="/dashboard">Picker</a><a className="apple-control-btn rounded-xl px-3 py-2 text-sm text-white no-underline" href="/dashboard/main">Main</a></div></div><div className="grid gap-4 lg:grid-cols-[260px_minmax(0,1fr)]"><${Sidebar} items=${[{ id: "overview", label: "Overview" }, { id: "entries", label: "Entries" }, { id: "operations", label: "Operations" }, { id: "armory", label: "Armory" }, { id: "reports", label: "Reports" }, { id: "alerts", label: "Alerts" }, { id: "routing", label: "Routing" }, { id: "imports", label: "Imports" }, { id: "approvals", label: "Approvals" }, { id: "discrepancies", label: "Discrepancies" }, { id: "audit", label: "Audit" }]} active=${active} setActive=${setActive} /><section className="space-y-4">${panel}</section></div><${PreviewModal} open=${preview} close=${() => setPreview(false)} title="Economy detailed overview"><p className="apple-muted text-sm">Overview contains main customizable graph and priority heatmaps for speed and control-plane clarity.</p></${PreviewModal}></div>`;
 }